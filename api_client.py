@@ -0,0 +1,291 @@
+"""Minimal asyncio HTTP/1.1 client for the backend API.
+
+Keeps a pool of keep-alive connections per client and authenticates the way
+src/services/api.js does (POST /login/, then `Authorization: Token <token>`).
+Only the standard library is used so the scripts run anywhere.
+"""
+import asyncio
+import json as jsonlib
+import ssl
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+DEFAULT_BASE_URL = 'http://127.0.0.1:8000/api'
+
+
+class ApiError(Exception):
+    def __init__(self, status, reason, body=b''):
+        super().__init__(f'API Error: {status} {reason}')
+        self.status = status
+        self.reason = reason
+        self.body = body
+
+
+class Response:
+    def __init__(self, method, path, status, reason, headers, body, elapsed):
+        self.method = method
+        self.path = path
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+    def json(self):
+        return jsonlib.loads(self.body) if self.body else None
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise ApiError(self.status, self.reason, self.body)
+        return self
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.reusable = True
+        self.fresh = False
+
+    def close(self):
+        self.reusable = False
+        self.writer.close()
+
+
+class StreamResponse(Response):
+    """Response whose body is read incrementally with iter_chunks()."""
+
+    def __init__(self, client, conn, method, path, status, reason, headers, started):
+        super().__init__(method, path, status, reason, headers, None, None)
+        self._client = client
+        self._conn = conn
+        self._started = started
+        self._done = False
+
+    async def iter_chunks(self, size=65536):
+        if self.method == 'HEAD' or self.status in (204, 304):
+            self._done = True
+            return
+        try:
+            async for chunk in _read_body(self._conn, self.headers, size):
+                yield chunk
+            self._done = True
+        finally:
+            self.elapsed = time.perf_counter() - self._started
+
+    async def read(self):
+        parts = [chunk async for chunk in self.iter_chunks()]
+        self.body = b''.join(parts)
+        return self.body
+
+    def release(self):
+        # A body that was not read to the end leaves the connection in an
+        # unknown state, so it is closed instead of going back to the pool.
+        if not self._done:
+            self._conn.close()
+        self._client._release(self._conn)
+
+
+async def _read_body(conn, headers, size=65536):
+    reader = conn.reader
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            line = await reader.readline()
+            length = int(line.split(b';', 1)[0].strip() or b'0', 16)
+            if length == 0:
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return
+            remaining = length
+            while remaining:
+                chunk = await reader.read(min(size, remaining))
+                if not chunk:
+                    raise ConnectionError('connection closed mid-chunk')
+                remaining -= len(chunk)
+                yield chunk
+            await reader.readexactly(2)
+    elif 'content-length' in headers:
+        remaining = int(headers['content-length'])
+        while remaining:
+            chunk = await reader.read(min(size, remaining))
+            if not chunk:
+                raise ConnectionError('connection closed mid-body')
+            remaining -= len(chunk)
+            yield chunk
+    else:
+        conn.reusable = False
+        while True:
+            chunk = await reader.read(size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class Client:
+    def __init__(self, base_url=DEFAULT_BASE_URL, limit=100, timeout=30.0, token=None):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or 'http'
+        self.host = parts.hostname or '127.0.0.1'
+        self.port = parts.port or (443 if self.scheme == 'https' else 80)
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.token = token
+        self._idle = deque()
+        self._slots = asyncio.Semaphore(limit)
+        self.connections_opened = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+    async def _acquire(self, fresh=False):
+        await self._slots.acquire()
+        while self._idle and not fresh:
+            conn = self._idle.pop()
+            if not conn.reader.at_eof():
+                return conn
+            conn.close()
+        try:
+            ctx = ssl.create_default_context() if self.scheme == 'https' else None
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl=ctx, limit=2 ** 20), self.timeout)
+        except BaseException:
+            self._slots.release()
+            raise
+        self.connections_opened += 1
+        conn = _Connection(reader, writer)
+        conn.fresh = True
+        return conn
+
+    def _release(self, conn):
+        if conn.reusable:
+            self._idle.append(conn)
+        else:
+            conn.writer.close()
+        self._slots.release()
+
+    def _headers(self, headers, body):
+        out = {
+            'Host': self.host if self.port in (80, 443) else f'{self.host}:{self.port}',
+            'Accept': 'application/json',
+            'Connection': 'keep-alive',
+        }
+        if self.token:
+            out['Authorization'] = f'Token {self.token}'
+        if body is not None:
+            out['Content-Type'] = 'application/json'
+            out['Content-Length'] = str(len(body))
+        if headers:
+            out.update(headers)
+        return out
+
+    async def _send(self, method, path, json, headers):
+        body = None if json is None else jsonlib.dumps(json).encode('utf-8')
+        head = [f'{method} {self.prefix}{path} HTTP/1.1']
+        head.extend(f'{k}: {v}' for k, v in self._headers(headers, body).items())
+        payload = ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + (body or b'')
+        for attempt in range(2):
+            conn = await self._acquire(fresh=attempt > 0)
+            try:
+                conn.writer.write(payload)
+                await conn.writer.drain()
+                status_line = await asyncio.wait_for(conn.reader.readline(), self.timeout)
+                if not status_line:
+                    raise ConnectionError('server closed the connection')
+                break
+            except asyncio.TimeoutError:
+                conn.close()
+                self._release(conn)
+                raise
+            except (ConnectionError, OSError):
+                conn.close()
+                self._release(conn)
+                # An idle keep-alive connection the server already dropped
+                # is retried once on a new socket.
+                if conn.fresh:
+                    raise
+            except BaseException:
+                conn.close()
+                self._release(conn)
+                raise
+        try:
+            _, status, *reason = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+            resp_headers = {}
+            while True:
+                line = await conn.reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                key, _, value = line.decode('latin-1').partition(':')
+                resp_headers[key.strip().lower()] = value.strip()
+            if resp_headers.get('connection', '').lower() == 'close':
+                conn.reusable = False
+        except BaseException:
+            conn.close()
+            self._release(conn)
+            raise
+        return conn, int(status), reason[0] if reason else '', resp_headers
+
+    async def request(self, method, path, json=None, headers=None):
+        started = time.perf_counter()
+        conn, status, reason, resp_headers = await self._send(method, path, json, headers)
+        try:
+            if method == 'HEAD' or status in (204, 304):
+                body = b''
+            else:
+                body = b''.join([chunk async for chunk in _read_body(conn, resp_headers)])
+        except BaseException:
+            conn.close()
+            raise
+        finally:
+            self._release(conn)
+        return Response(method, path, status, reason, resp_headers, body, time.perf_counter() - started)
+
+    def stream(self, method, path, json=None, headers=None):
+        """`async with client.stream('GET', path) as resp:` then `resp.iter_chunks()`."""
+        return _StreamContext(self, method, path, json, headers)
+
+    async def get(self, path, **kw):
+        return await self.request('GET', path, **kw)
+
+    async def post(self, path, json=None, **kw):
+        return await self.request('POST', path, json=json if json is not None else {}, **kw)
+
+    async def patch(self, path, json=None, **kw):
+        return await self.request('PATCH', path, json=json, **kw)
+
+    async def delete(self, path, **kw):
+        return await self.request('DELETE', path, **kw)
+
+    async def login(self, username, password):
+        resp = await self.request('POST', '/login/', json={'username': username, 'password': password})
+        if not resp.ok:
+            raise ApiError(resp.status, 'Invalid credentials', resp.body)
+        self.token = resp.json()['token']
+        return self.token
+
+
+class _StreamContext:
+    def __init__(self, client, method, path, json, headers):
+        self.client = client
+        self.args = (method, path, json, headers)
+        self.resp = None
+
+    async def __aenter__(self):
+        started = time.perf_counter()
+        conn, status, reason, headers = await self.client._send(*self.args)
+        self.resp = StreamResponse(self.client, conn, self.args[0], self.args[1], status, reason, headers, started)
+        return self.resp
+
+    async def __aexit__(self, *exc):
+        self.resp.release()
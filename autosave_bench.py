@@ -0,0 +1,331 @@
+"""Autosave write amplification: full-content PATCH vs note_delta PATCH.
+
+NotesView.jsx and CommunityView.jsx save 1.5 s after the last keystroke by
+PATCHing the whole `{title, content}` HTML.  This replays editing sessions
+through the same debounce and compares, per save and per keystroke, what the
+current payload costs against a content_delta payload (note_delta.py):
+bytes each way, client-side encode time, and latency -- modeled for a slow
+uplink, and measured against the API with --live.
+
+A session is JSONL of editor snapshots, one per TiptapEditor onUpdate:
+`{"t": <seconds>, "html": "<editor.getHTML()>"}`, optionally preceded by
+`{"title": ..., "html": <content before editing>}`.  Without session files,
+synthetic typing sessions are generated on documents of --doc-bytes.
+
+    python autosave_bench.py --doc-bytes 2000 --doc-bytes 20000 --doc-bytes 200000
+    python autosave_bench.py --record session.jsonl --doc-bytes 50000
+    python autosave_bench.py session.jsonl --live --base-url http://127.0.0.1:8000/api
+    python autosave_bench.py --doc-bytes 50000 --live --shared --refetch
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+
+import dataset
+import note_delta
+from api_client import DEFAULT_BASE_URL, Client
+from loadtest import percentile
+
+DEBOUNCE_S = 1.5
+
+
+def body_bytes(payload):
+    # What JSON.stringify sends.
+    return len(json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+class Session:
+    def __init__(self, name, title, initial, snapshots):
+        self.name = name
+        self.title = title
+        self.initial = initial
+        # Callable returning a fresh iterator of (t, html), so a long session
+        # on a big document is never held in memory all at once.
+        self.snapshots = snapshots
+
+    def saves(self, delay=DEBOUNCE_S):
+        """Yield (t, html, keystrokes) for each save the debounce fires."""
+        burst = 0
+        prev = None
+        for t, html in self.snapshots():
+            if prev is not None and t - prev[0] >= delay:
+                yield prev[0] + delay, prev[1], burst
+                burst = 0
+            burst += 1
+            prev = (t, html)
+        if prev is not None:
+            yield prev[0] + delay, prev[1], burst
+
+
+def load_session(path):
+    title, initial, first = 'Untitled', None, None
+
+    def snapshots():
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                item = json.loads(line) if line.strip() else {}
+                if 't' in item:
+                    yield float(item['t']), item['html']
+
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            item = json.loads(line) if line.strip() else {}
+            if 't' in item:
+                first = item['html']
+                break
+            if 'html' in item:
+                title, initial = item.get('title', title), item['html']
+    return Session(path, title, initial if initial is not None else first or '', snapshots)
+
+
+def synthetic_session(doc_bytes, keystrokes, seed=0):
+    """Someone typing into a long note: bursts of words, pauses, new paragraphs, jumps."""
+    note = dataset.Dataset(notes=1, content_bytes=doc_bytes, seed=seed).note(0)
+    return Session(f'synthetic {doc_bytes / 1000:g} KB', note['title'], note['content'],
+                   lambda: _typing(note['content'], keystrokes, seed))
+
+
+def _typing(html, keystrokes, seed):
+    rng = random.Random(seed)
+    ends = [m.start() for m in re.finditer('</p>', html)]
+    cursor = ends[len(ends) // 2] if ends else len(html)
+    typed = 0       # characters typed at the cursor that backspace may remove
+    t = 0.0
+    pending = ''
+    count = 0
+    while count < keystrokes:
+        for _ in range(min(keystrokes - count, max(1, int(rng.expovariate(1 / 30))))):
+            t += rng.uniform(0.08, 0.3)
+            if typed and rng.random() < 0.06:
+                html = html[:cursor - 1] + html[cursor:]
+                cursor -= 1
+                typed -= 1
+            else:
+                if not pending:
+                    pending = ' ' + dataset.WORDS[rng.randrange(len(dataset.WORDS))]
+                ch, pending = pending[0], pending[1:]
+                html = html[:cursor] + ch + html[cursor:]
+                cursor += 1
+                typed += 1
+            count += 1
+            yield t, html
+        t += rng.uniform(2.0, 12.0) if rng.random() < 0.35 else rng.uniform(0.3, 1.3)
+        roll = rng.random()
+        if roll < 0.15:
+            # Enter: a new paragraph after the current one.
+            end = html.find('</p>', cursor)
+            end = len(html) if end < 0 else end + 4
+            html = html[:end] + '<p></p>' + html[end:]
+            cursor, typed = end + 3, 0
+        elif roll < 0.25:
+            ends = [m.start() for m in re.finditer('</p>', html)]
+            if ends:
+                cursor, typed = ends[rng.randrange(len(ends))], 0
+
+
+def replay(session, fields, delay=DEBOUNCE_S):
+    """Offline accounting of both strategies, one row per save.
+
+    Both send the title plus the content or its delta, as live() does; the
+    note's other `fields` only come back in the full response.
+    """
+    rows = {'full': [], 'delta': []}
+    base = session.initial
+    for t, html, keys in session.saves(delay):
+        full = {'title': session.title, 'content': html}
+        started = time.perf_counter()
+        delta = note_delta.encode(base, html)
+        encode_s = time.perf_counter() - started
+        started = time.perf_counter()
+        if note_delta.apply(base, delta) != html:
+            raise RuntimeError(f'delta does not reproduce save at t={t:.1f}s')
+        apply_s = time.perf_counter() - started
+        record = dict(full, **fields, id=1, created_at='2026-01-01T00:00:00Z', updated_at='2026-01-01T00:00:00Z')
+        rows['full'].append({'keys': keys, 'sent': body_bytes(full), 'received': body_bytes(record)})
+        rows['delta'].append({'keys': keys, 'sent': body_bytes({'title': session.title, 'content_delta': delta}),
+                              'received': body_bytes({'id': 1, 'updated_at': record['updated_at'],
+                                                      'content_hash': delta['hash']}),
+                              'encode_s': encode_s, 'apply_s': apply_s})
+        base = html
+    return rows
+
+
+def modeled_ms(sent, received, args):
+    return args.rtt_ms + sent * 8 / args.uplink_kbps + received * 8 / args.downlink_kbps
+
+
+async def live(session, fields, args):
+    """PATCH every save for real, once per strategy; returns latencies (s) per strategy.
+
+    Works on a scratch note that is deleted afterwards, unless --note-id
+    names an existing one (whose content is then overwritten).
+    """
+    kind = 'shared-notes' if args.shared else 'notes'
+    out = {'full': [], 'delta': [], 'refetch': [], 'refetch_bytes': 0, 'conflicts': 0, 'verified': None}
+    async with Client(args.base_url) as client:
+        await client.login(args.username, args.password)
+        note_id = args.note_id
+        if note_id is None:
+            resp = await client.post(f'/{kind}/', json={'title': session.title, 'content': session.initial, **fields})
+            note_id = resp.raise_for_status().json()['id']
+        path = f'/{kind}/{note_id}/'
+        try:
+            for mode in ('full', 'delta'):
+                resp = await client.patch(path, json={'title': session.title, 'content': session.initial})
+                resp.raise_for_status()
+                base = session.initial
+                for _, html, _ in session.saves(args.debounce):
+                    headers = None
+                    if mode == 'full':
+                        payload = {'title': session.title, 'content': html}
+                    else:
+                        payload = {'title': session.title, 'content_delta': note_delta.encode(base, html)}
+                        headers = {'Prefer': 'return=minimal'}
+                    resp = await client.patch(path, json=payload, headers=headers)
+                    if resp.status == 409:
+                        # Someone else saved in between: resend the whole content.
+                        out['conflicts'] += 1
+                        resp = await client.patch(path, json={'title': session.title, 'content': html}, headers=headers)
+                    resp.raise_for_status()
+                    out[mode].append(resp.elapsed)
+                    base = html
+                    if args.refetch:
+                        # CommunityView's onUpdate(true) after each save.
+                        refetch = await client.get('/communities/')
+                        out['refetch'].append(refetch.elapsed)
+                        out['refetch_bytes'] += len(refetch.body)
+                if mode == 'delta' and base is not session.initial:
+                    out['verified'] = resp.json().get('content_hash') == note_delta.content_hash(base)
+        finally:
+            if args.note_id is None:
+                await client.delete(path)
+    return out
+
+
+def summarize(session, rows, args, measured=None):
+    keys = sum(row['keys'] for row in rows['full'])
+    report = {'session': session.name, 'doc_bytes': len(session.initial.encode('utf-8')),
+              'keystrokes': keys, 'saves': len(rows['full']), 'strategies': {}}
+    for mode, items in rows.items():
+        sent = sum(r['sent'] for r in items)
+        received = sum(r['received'] for r in items)
+        model = sorted(modeled_ms(r['sent'], r['received'], args) for r in items)
+        entry = {'sent_bytes': sent, 'received_bytes': received,
+                 'sent_per_save': sent / len(items) if items else 0.0,
+                 'sent_per_keystroke': sent / keys if keys else 0.0,
+                 'modeled_ms': {'p50': percentile(model, 50), 'p95': percentile(model, 95)}}
+        if mode == 'delta':
+            enc = sorted(r['encode_s'] * 1000 for r in items)
+            entry['encode_ms'] = {'p50': percentile(enc, 50), 'p99': percentile(enc, 99)}
+        if measured is not None:
+            ms = sorted(v * 1000 for v in measured[mode])
+            entry['live_ms'] = {'p50': percentile(ms, 50), 'p95': percentile(ms, 95)}
+        report['strategies'][mode] = entry
+    if measured is not None:
+        report['live'] = {'conflicts': measured['conflicts'], 'verified': measured['verified']}
+        if measured['refetch']:
+            ms = sorted(v * 1000 for v in measured['refetch'])
+            report['live']['refetch'] = {'bytes_per_save': measured['refetch_bytes'] / len(measured['refetch']),
+                                         'p50_ms': percentile(ms, 50), 'p95_ms': percentile(ms, 95)}
+    return report
+
+
+def format_report(report, args):
+    full, delta = report['strategies']['full'], report['strategies']['delta']
+    saves = report['saves']
+
+    def saved(a, b):
+        return f'{(1 - b / a):.1%}' if a else '-'
+
+    lines = [f"{report['session']}: {report['doc_bytes']:,} bytes, {report['keystrokes']} keystrokes, "
+             f"{saves} saves ({report['keystrokes'] / max(1, saves):.1f} keystrokes/save)",
+             f"  {'':<40} {'full':>12} {'delta':>12} {'saved':>8}"]
+
+    def row(label, a, b, fmt='{:,.0f}', pct=True):
+        lines.append(f'  {label:<40} {fmt.format(a):>12} {fmt.format(b):>12} {saved(a, b) if pct else "":>8}')
+
+    row('bytes sent', full['sent_bytes'], delta['sent_bytes'])
+    row('bytes sent per save', full['sent_per_save'], delta['sent_per_save'])
+    row('bytes sent per keystroke', full['sent_per_keystroke'], delta['sent_per_keystroke'], '{:,.1f}')
+    row('bytes received', full['received_bytes'], delta['received_bytes'])
+    link = f'{args.uplink_kbps:g}/{args.downlink_kbps:g} kbps, {args.rtt_ms:g} ms'
+    row(f'modeled p50 ms ({link})', full['modeled_ms']['p50'], delta['modeled_ms']['p50'], '{:,.0f}')
+    row('modeled p95 ms', full['modeled_ms']['p95'], delta['modeled_ms']['p95'], '{:,.0f}')
+    encode = f"{delta['encode_ms']['p50']:.2f}/{delta['encode_ms']['p99']:.2f}"
+    lines.append(f"  {'delta encode p50/p99 ms':<40} {'':>12} {encode:>12}")
+    if 'live_ms' in full:
+        row('live PATCH p50 ms', full['live_ms']['p50'], delta['live_ms']['p50'], '{:,.1f}')
+        row('live PATCH p95 ms', full['live_ms']['p95'], delta['live_ms']['p95'], '{:,.1f}')
+        live_info = report['live']
+        lines.append(f"  live: {live_info['conflicts']} conflict(s), final content "
+                     f"{'verified' if live_info['verified'] else 'MISMATCH'}")
+        if 'refetch' in live_info:
+            r = live_info['refetch']
+            lines.append(f"  refetch after each save: {r['bytes_per_save']:,.0f} bytes, "
+                         f"p50 {r['p50_ms']:.1f} ms, p95 {r['p95_ms']:.1f} ms")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('sessions', nargs='*', help='recorded session JSONL files')
+    parser.add_argument('--doc-bytes', type=int, action='append', default=[],
+                        help='synthetic document size (repeatable; default 2000, 20000, 200000)')
+    parser.add_argument('--keystrokes', type=int, default=1500, help='keystrokes per synthetic session')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--record', help='write the first synthetic session here as JSONL and exit')
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE_S)
+    parser.add_argument('--uplink-kbps', type=float, default=1000.0)
+    parser.add_argument('--downlink-kbps', type=float, default=5000.0)
+    parser.add_argument('--rtt-ms', type=float, default=80.0)
+    parser.add_argument('--live', action='store_true', help='also PATCH every save against the API')
+    parser.add_argument('--shared', action='store_true', help='use /shared-notes/ like CommunityView')
+    parser.add_argument('--refetch', action='store_true', help='GET /communities/ after each live save')
+    parser.add_argument('--note-id', type=int,
+                        help='PATCH this existing note with --live (default: a scratch note, deleted afterwards)')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    parser.add_argument('--username', default='volcan')
+    parser.add_argument('--password', default='123')
+    parser.add_argument('--json', help='write the reports here')
+    args = parser.parse_args(argv)
+
+    sessions = [load_session(p) for p in args.sessions]
+    synthetic = []
+    if not sessions or args.doc_bytes:
+        synthetic = [synthetic_session(n, args.keystrokes, args.seed) for n in args.doc_bytes or (2000, 20000, 200000)]
+        sessions += synthetic
+    if args.record:
+        if not synthetic:
+            parser.error('--record writes a synthetic session; give --doc-bytes')
+        s = synthetic[0]
+        with open(args.record, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'title': s.title, 'html': s.initial}, ensure_ascii=False) + '\n')
+            count = 0
+            for t, html in s.snapshots():
+                f.write(json.dumps({'t': round(t, 3), 'html': html}, ensure_ascii=False) + '\n')
+                count += 1
+        print(f'wrote {count} snapshots to {args.record}', file=sys.stderr)
+        return 0
+
+    fields = {'project': 1} if args.shared else {'note_type': 'Personal'}
+
+    reports = []
+    for session in sessions:
+        rows = replay(session, fields, args.debounce)
+        measured = asyncio.run(live(session, fields, args)) if args.live else None
+        report = summarize(session, rows, args, measured)
+        reports.append(report)
+        print(format_report(report, args))
+        print()
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
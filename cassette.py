@@ -0,0 +1,537 @@
+"""Record/replay layer for api_client with conditional-request revalidation.
+
+Responses are stored on disk keyed by method, path and a hash of the JSON
+body.  In live mode a stored GET is revalidated with If-None-Match /
+If-Modified-Since, so an unchanged listing costs a 304 instead of the whole
+payload; other methods go to the server and are recorded.  In replay mode
+nothing touches the network: recorded responses are served and anything
+else raises CassetteMiss.  A recorded login is reused instead of logging in
+again (in live mode a 401 logs in for real and retries once).
+
+client.stream() goes through the cassette too: a replayed or revalidated
+body is read back in chunks from a memory map of its file, and a live body
+is written to disk as the caller reads it.  What the caller leaves unread
+is drained into the recording when the block exits, so the next run can
+revalidate it.
+
+The store is size-bounded and evicts least recently used entries.  Its index
+is a memory-mapped file of fixed-size slots updated in place, so a lookup
+or touch does not rewrite anything; bodies live in one file per entry.  One
+process at a time should use a directory.
+
+    async with CassetteClient(base_url, Cassette('.api-cassette'), mode='live') as client:
+        await client.login('volcan', '123')
+        async with client.stream('GET', '/communities/') as resp:
+            async for chunk in resp.iter_chunks():
+                ...
+    print(client.stats_line())
+
+    python cassette.py .api-cassette              # list entries
+    python cassette.py .api-cassette --max-mb 64  # shrink the store
+    python cassette.py .api-cassette --clear
+"""
+import argparse
+import hashlib
+import json as jsonlib
+import mmap
+import os
+import struct
+import sys
+import time
+
+from api_client import DEFAULT_BASE_URL, ApiError, Client, Response
+
+MAGIC = b'CAS1'
+HEADER = struct.Struct('<4sIQ')     # magic, slot count, last use tick
+SLOT = struct.Struct('<16sQQ')      # key, last use tick, bytes on disk (0 = free)
+INITIAL_SLOTS = 1024
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class CassetteMiss(ApiError):
+    """A replay-mode request that was never recorded."""
+
+    def __init__(self, method, path):
+        super().__init__(0, f'not recorded: {method} {path}')
+
+
+def request_key(method, path, json=None):
+    body = b'' if json is None else jsonlib.dumps(json, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f'{method.upper()} {path}\n'.encode('utf-8'))
+    h.update(hashlib.sha256(body).digest())
+    return h.digest()
+
+
+class Entry:
+    def __init__(self, path, meta, offset, size, validated):
+        self.path = path
+        self.meta = meta
+        self.offset = offset            # where the body starts in the file
+        self.size = size                # body bytes
+        self.validated = validated      # when the server last confirmed it (file mtime)
+        self._body = None
+
+    @property
+    def body(self):
+        if self._body is None:
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                self._body = f.read()
+        return self._body
+
+    def iter_chunks(self, size=65536):
+        if self._body is not None:
+            for pos in range(0, len(self._body), size):
+                yield self._body[pos:pos + size]
+            return
+        if not self.size:
+            return
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for pos in range(self.offset, len(mm), size):
+                yield mm[pos:pos + size]
+
+    @property
+    def status(self):
+        return self.meta['status']
+
+    @property
+    def headers(self):
+        return self.meta['headers']
+
+    def response(self, elapsed=0.0):
+        m = self.meta
+        return Response(m['method'], m['path'], m['status'], m['reason'], dict(m['headers']), self.body, elapsed)
+
+
+class ReplayResponse(Response):
+    """A recorded response for client.stream(), read in chunks from the cassette."""
+
+    def __init__(self, entry, elapsed=0.0):
+        m = entry.meta
+        super().__init__(m['method'], m['path'], m['status'], m['reason'], dict(m['headers']), None, elapsed)
+        self._entry = entry
+
+    async def iter_chunks(self, size=65536):
+        for chunk in self._entry.iter_chunks(size):
+            yield chunk
+
+    async def read(self):
+        self.body = self._entry.body
+        return self.body
+
+    def release(self):
+        pass
+
+
+class Recording:
+    """An entry being written; it only replaces the stored one on commit()."""
+
+    def __init__(self, cassette, key, meta):
+        self.cassette = cassette
+        self.key = key
+        self.tmp = cassette._path(key) + '.tmp'
+        self.file = open(self.tmp, 'wb')
+        self.size = self.file.write(jsonlib.dumps(meta, separators=(',', ':')).encode('utf-8') + b'\n')
+
+    def write(self, chunk):
+        self.size += self.file.write(chunk)
+
+    def abort(self):
+        self.file.close()
+        os.remove(self.tmp)
+
+    def commit(self):
+        self.file.close()
+        if self.size > self.cassette.max_bytes:
+            os.remove(self.tmp)
+            return False
+        os.replace(self.tmp, self.cassette._path(self.key))
+        self.cassette._stored(self.key, self.size)
+        return True
+
+
+class Cassette:
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, 'index')
+        if not os.path.exists(self._index_path):
+            with open(self._index_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, INITIAL_SLOTS, 0) + bytes(SLOT.size * INITIAL_SLOTS))
+        self._file = open(self._index_path, 'r+b')
+        self._map()
+
+    def _map(self):
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        magic, self._capacity, self._tick = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{self._index_path} is not a cassette index')
+        self._slots = {}
+        self._free = []
+        self.total_bytes = 0
+        for i in range(self._capacity):
+            key, _, size = SLOT.unpack_from(self._mm, HEADER.size + i * SLOT.size)
+            if size:
+                self._slots[key] = i
+                self.total_bytes += size
+            else:
+                self._free.append(i)
+        self._free.reverse()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key.hex())
+
+    def _slot(self, i):
+        return SLOT.unpack_from(self._mm, HEADER.size + i * SLOT.size)
+
+    def _write_slot(self, i, key, tick, size):
+        SLOT.pack_into(self._mm, HEADER.size + i * SLOT.size, key, tick, size)
+
+    def _next_tick(self):
+        self._tick += 1
+        HEADER.pack_into(self._mm, 0, MAGIC, self._capacity, self._tick)
+        return self._tick
+
+    def _grow(self):
+        old = self._capacity
+        self._mm.flush()
+        self._mm.close()
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(bytes(SLOT.size * old))
+        self._file.flush()
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        self._capacity = old * 2
+        HEADER.pack_into(self._mm, 0, MAGIC, self._capacity, self._tick)
+        self._free.extend(range(self._capacity - 1, old - 1, -1))
+
+    def get(self, key):
+        """The stored Entry (marked as just used), or None."""
+        i = self._slots.get(key)
+        if i is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                meta = jsonlib.loads(f.readline())
+                offset = f.tell()
+                st = os.fstat(f.fileno())
+        except (OSError, ValueError):
+            self._drop(key)
+            return None
+        self.touch(key)
+        return Entry(path, meta, offset, st.st_size - offset, st.st_mtime)
+
+    def revalidated(self, key):
+        """Record that the server confirmed the entry is current."""
+        os.utime(self._path(key))
+
+    def touch(self, key):
+        i = self._slots.get(key)
+        if i is not None:
+            _, _, size = self._slot(i)
+            self._write_slot(i, key, self._next_tick(), size)
+
+    def record(self, key, meta):
+        """A Recording to write the body into, chunk by chunk."""
+        return Recording(self, key, meta)
+
+    def put(self, key, meta, body):
+        """Store body (bytes or an iterable of chunks) under key."""
+        recording = self.record(key, meta)
+        try:
+            for chunk in ([body] if isinstance(body, bytes) else body):
+                recording.write(chunk)
+        except BaseException:
+            recording.abort()
+            raise
+        return recording.commit()
+
+    def _stored(self, key, size):
+        i = self._slots.get(key)
+        if i is None:
+            if not self._free:
+                self._grow()
+            i = self._slots[key] = self._free.pop()
+        else:
+            self.total_bytes -= self._slot(i)[2]
+        self._write_slot(i, key, self._next_tick(), size)
+        self.total_bytes += size
+        self.evict(self.max_bytes, keep=key)
+
+    def _drop(self, key):
+        i = self._slots.pop(key)
+        self.total_bytes -= self._slot(i)[2]
+        self._write_slot(i, bytes(16), 0, 0)
+        self._free.append(i)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def evict(self, max_bytes, keep=None):
+        """Drop least recently used entries until the store fits in max_bytes."""
+        if self.total_bytes <= max_bytes:
+            return
+        by_age = sorted((self._slot(i)[1], key) for key, i in self._slots.items() if key != keep)
+        for _, key in by_age:
+            if self.total_bytes <= max_bytes:
+                break
+            self._drop(key)
+            self.evictions += 1
+
+    def clear(self):
+        for key in list(self._slots):
+            self._drop(key)
+
+    def entries(self):
+        """(key, last use tick, bytes on disk) for every entry, most recent first."""
+        out = [(key,) + self._slot(i)[1:] for key, i in self._slots.items()]
+        return sorted(out, key=lambda e: -e[1])
+
+
+class CassetteClient(Client):
+    """api_client.Client that records to, replays from and revalidates against a Cassette.
+
+    mode is 'live' (network, conditional GETs, record everything) or
+    'replay' (offline).  With fresh_for > 0, live GETs recorded less than
+    that many seconds ago are served without asking the server.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, cassette=None, mode='live', fresh_for=0.0, **kw):
+        super().__init__(base_url, **kw)
+        if mode not in ('live', 'replay'):
+            raise ValueError(f'unknown cassette mode {mode!r}')
+        self.cassette = cassette
+        self.mode = mode
+        self.fresh_for = fresh_for
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'uncached': 0,
+                      'bytes_downloaded': 0, 'bytes_saved': 0, 'logins_reused': 0}
+        self._credentials = None
+
+    async def request(self, method, path, json=None, headers=None):
+        if self.cassette is None:
+            return await super().request(method, path, json, headers)
+        key = request_key(method, path, json)
+        entry = self._lookup(key, method, path)
+        if entry is not None and (self.mode == 'replay' or self._fresh(entry, method)):
+            return self._served(entry).response()
+        conditional = self._conditional(entry, method)
+        resp = await self._request_with_relogin(method, path, json, {**(headers or {}), **conditional})
+        self.stats['bytes_downloaded'] += len(resp.body)
+        if resp.status == 304 and conditional:
+            return self._revalidated(key, entry, resp).response(resp.elapsed)
+        if resp.ok:
+            self.stats['misses' if method == 'GET' else 'uncached'] += 1
+            self.cassette.put(key, _meta(method, path, resp), resp.body)
+        else:
+            self.stats['uncached'] += 1
+        return resp
+
+    def stream(self, method, path, json=None, headers=None):
+        if self.cassette is None:
+            return super().stream(method, path, json, headers)
+        return _CassetteStream(self, method, path, json, headers)
+
+    def _lookup(self, key, method, path):
+        entry = self.cassette.get(key)
+        if entry is None and self.mode == 'replay':
+            self.stats['misses'] += 1
+            raise CassetteMiss(method, path)
+        return entry
+
+    def _fresh(self, entry, method):
+        return method == 'GET' and self.fresh_for and time.time() - entry.validated < self.fresh_for
+
+    def _served(self, entry):
+        self.stats['hits'] += 1
+        self.stats['bytes_saved'] += entry.size
+        return entry
+
+    @staticmethod
+    def _conditional(entry, method):
+        conditional = {}
+        if entry is not None and method == 'GET':
+            if 'etag' in entry.headers:
+                conditional['If-None-Match'] = entry.headers['etag']
+            if 'last-modified' in entry.headers:
+                conditional['If-Modified-Since'] = entry.headers['last-modified']
+        return conditional
+
+    def _revalidated(self, key, entry, resp):
+        """Account for a 304 and return the (possibly re-stamped) entry."""
+        self.stats['revalidated'] += 1
+        self.stats['bytes_saved'] += entry.size
+        validators = {k: v for k, v in resp.headers.items() if k in ('etag', 'last-modified')}
+        if any(entry.headers.get(k) != v for k, v in validators.items()):
+            entry.meta['headers'].update(validators)
+            self.cassette.put(key, entry.meta, entry.iter_chunks())
+            return self.cassette.get(key)
+        self.cassette.revalidated(key)
+        return entry
+
+    async def _request_with_relogin(self, method, path, json, headers):
+        resp = await super().request(method, path, json, headers)
+        if resp.status == 401 and self._credentials and path != '/login/':
+            # The reused token has expired (or the server restarted).
+            await self.login(*self._credentials, reuse=False)
+            resp = await super().request(method, path, json, headers)
+        return resp
+
+    async def login(self, username, password, reuse=True):
+        self._credentials = (username, password)
+        if self.cassette is not None and reuse:
+            entry = self.cassette.get(request_key('POST', '/login/', {'username': username, 'password': password}))
+            if entry is not None and entry.status == 200:
+                self.stats['logins_reused'] += 1
+                self.token = jsonlib.loads(entry.body)['token']
+                return self.token
+        if self.mode == 'replay':
+            raise CassetteMiss('POST', '/login/')
+        return await super().login(username, password)
+
+    def stats_line(self):
+        s = self.stats
+        return (f"cassette: {s['hits']} hits, {s['revalidated']} revalidated, {s['misses']} misses, "
+                f"{s['uncached']} uncached, {s['logins_reused']} logins reused; "
+                f"{s['bytes_downloaded'] / 1e6:.2f} MB downloaded, {s['bytes_saved'] / 1e6:.2f} MB saved")
+
+
+def _meta(method, path, resp):
+    return {'method': method, 'path': path, 'status': resp.status, 'reason': resp.reason,
+            'headers': resp.headers, 'recorded_at': time.time()}
+
+
+class _RecordingResponse(Response):
+    """A live streamed response that is copied into a Recording as it is read."""
+
+    def __init__(self, resp, recording, stats):
+        super().__init__(resp.method, resp.path, resp.status, resp.reason, resp.headers, None, None)
+        self._resp = resp
+        self._recording = recording
+        self._stats = stats
+        self._chunks = None
+
+    def iter_chunks(self, size=65536):
+        # One generator for the whole body, so finish() can resume where the
+        # caller stopped.
+        if self._chunks is None:
+            self._chunks = self._tee(size)
+        return self._chunks
+
+    async def _tee(self, size):
+        async for chunk in self._resp.iter_chunks(size):
+            self._recording.write(chunk)
+            self._stats['bytes_downloaded'] += len(chunk)
+            yield chunk
+
+    async def read(self):
+        self.body = b''.join([chunk async for chunk in self.iter_chunks()])
+        return self.body
+
+    async def finish(self, ok):
+        if ok:
+            async for _ in self.iter_chunks():
+                pass
+        self.elapsed = self._resp.elapsed
+        if ok and self._resp._done:
+            self._recording.commit()
+        else:
+            self._recording.abort()
+
+
+class _CassetteStream:
+    def __init__(self, client, method, path, json, headers):
+        self.client = client
+        self.method = method
+        self.path = path
+        self.json = json
+        self.headers = headers or {}
+        self._inner = None
+        self.resp = None
+
+    async def _open(self, headers):
+        self._inner = Client.stream(self.client, self.method, self.path, self.json, headers)
+        return await self._inner.__aenter__()
+
+    async def _close(self, drain=True):
+        if self._inner is not None:
+            if drain:
+                await self._inner.resp.read()
+            await self._inner.__aexit__(None, None, None)
+            self._inner = None
+
+    async def __aenter__(self):
+        c = self.client
+        key = request_key(self.method, self.path, self.json)
+        entry = c._lookup(key, self.method, self.path)
+        if entry is not None and (c.mode == 'replay' or c._fresh(entry, self.method)):
+            return ReplayResponse(c._served(entry))
+        conditional = c._conditional(entry, self.method)
+        headers = {**self.headers, **conditional}
+        resp = await self._open(headers)
+        if resp.status == 401 and c._credentials and self.path != '/login/':
+            await self._close()
+            await c.login(*c._credentials, reuse=False)
+            resp = await self._open(headers)
+        if resp.status == 304 and conditional:
+            await self._close()
+            return ReplayResponse(c._revalidated(key, entry, resp), resp.elapsed)
+        if not resp.ok:
+            c.stats['uncached'] += 1
+            return resp
+        c.stats['misses' if self.method == 'GET' else 'uncached'] += 1
+        self.resp = _RecordingResponse(resp, c.cassette.record(key, _meta(self.method, self.path, resp)), c.stats)
+        return self.resp
+
+    async def __aexit__(self, exc_type, *exc):
+        try:
+            if self.resp is not None:
+                await self.resp.finish(exc_type is None)
+        finally:
+            await self._close(drain=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', nargs='?', default='.api-cassette')
+    parser.add_argument('--max-mb', type=float, help='evict least recently used entries down to this size')
+    parser.add_argument('--clear', action='store_true', help='remove every entry')
+    args = parser.parse_args(argv)
+    if not os.path.exists(os.path.join(args.directory, 'index')):
+        print(f'no cassette in {args.directory}', file=sys.stderr)
+        return 1
+    with Cassette(args.directory) as cassette:
+        if args.clear:
+            cassette.clear()
+        if args.max_mb is not None:
+            cassette.evict(int(args.max_mb * 1024 * 1024))
+        for key, tick, size in cassette.entries():
+            with open(cassette._path(key), 'rb') as f:
+                meta = jsonlib.loads(f.readline())
+            print(f"{tick:>8} {size:>12,} {meta['status']:>4} {meta['method']:<6} {meta['path']}")
+        print(f'{len(cassette)} entries, {cassette.total_bytes / 1e6:.2f} MB'
+              + (f', {cassette.evictions} evicted' if cassette.evictions else ''))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
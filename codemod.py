@@ -0,0 +1,320 @@
+"""Single-pass multi-pattern rewriting for the refactor scripts.
+
+Literal rules are compiled into one Aho-Corasick automaton and regex rules
+into one alternation, so a file is scanned once no matter how many rules
+there are.  Matches are resolved leftmost-longest across all rules (ties go
+to the rule that was declared first) and the output is assembled with a
+single join.
+"""
+import re
+import time
+from collections import deque
+
+
+class Rule:
+    def __init__(self, pattern, replacement, regex=False, flags=0, count=None, expect=1, name=None):
+        # `replacement` is a string (expanded like re.sub for regex rules) or a
+        # callable taking the match text (literal) or re.Match (regex).
+        # `expect` is the minimum number of matches; fewer is reported as a miss.
+        self.pattern = pattern
+        self.replacement = replacement
+        self.regex = regex
+        self.flags = flags
+        self.count = count
+        self.expect = expect
+        if name is None:
+            name = pattern.strip().splitlines()[0] if pattern.strip() else repr(pattern)
+            if len(name) > 60 or name != pattern.strip():
+                name = name[:57] + '...'
+        self.name = name
+        self.compiled = re.compile(pattern, flags) if regex else None
+
+    def expand(self, text, start, end, match=None):
+        if self.regex:
+            if match is None:
+                match = self.compiled.match(text, start)
+            if callable(self.replacement):
+                return self.replacement(match)
+            return match.expand(self.replacement)
+        if callable(self.replacement):
+            return self.replacement(text[start:end])
+        return self.replacement
+
+    def __repr__(self):
+        kind = 'regex' if self.regex else 'literal'
+        return f'Rule({kind}, {self.name!r})'
+
+
+class RuleStats:
+    def __init__(self, rule):
+        self.rule = rule
+        self.matches = 0
+        self.skipped = 0
+        self.guarded = 0
+        self.seconds = 0.0
+
+    @property
+    def missed(self):
+        # A guarded match was already applied, so it does not count as a miss.
+        return self.matches + self.guarded < self.rule.expect
+
+
+class Result:
+    def __init__(self, text, stats, scan_seconds, changed, edits=()):
+        self.text = text
+        self.stats = stats
+        self.scan_seconds = scan_seconds
+        self.changed = changed
+        # (start, end, rule index, replacement) in the coordinates of the input.
+        self.edits = list(edits)
+
+    @property
+    def missed(self):
+        return [st for st in self.stats if st.missed]
+
+    def report(self):
+        lines = [f'scan {self.scan_seconds * 1000:.2f} ms, {sum(st.matches for st in self.stats)} edits']
+        for st in self.stats:
+            flag = '  MISSED' if st.missed else ''
+            extra = f' ({st.skipped} over count)' if st.skipped else ''
+            extra += f' ({st.guarded} already applied)' if st.guarded else ''
+            lines.append(f'  {st.matches:4d}x {st.seconds * 1000:7.3f} ms  {st.rule.name}{extra}{flag}')
+        return '\n'.join(lines)
+
+
+class Automaton:
+    """Aho-Corasick automaton over the literal rules."""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for idx, pat in patterns:
+            if not pat:
+                raise ValueError('empty literal pattern')
+            node = 0
+            for ch in pat:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = nxt
+            self.out[node].append((idx, len(pat)))
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                cand = self.goto[f].get(ch, 0)
+                self.fail[nxt] = cand
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def scan(self, text, start=0, end=None):
+        goto, fail, out = self.goto, self.fail, self.out
+        end = len(text) if end is None else end
+        node = 0
+        for pos in range(start, end):
+            ch = text[pos]
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                for idx, length in out[node]:
+                    yield pos + 1 - length, pos + 1, idx
+
+
+def already_applied(text, start, end, repl):
+    """True if text[start:end] sits inside a copy of its own replacement.
+
+    Catches rules whose replacement keeps the matched text (appending or
+    wrapping), which would otherwise apply again on every run.
+    """
+    match = text[start:end]
+    k = repl.find(match)
+    while k != -1:
+        if start >= k and text.startswith(repl, start - k):
+            return True
+        k = repl.find(match, k + 1)
+    return False
+
+
+def _rank(hit):
+    """Sort key: leftmost, then longest, then first declared."""
+    s, e, idx = hit
+    return s, s - e, idx
+
+
+def _scoped(rule):
+    inline = rule.compiled.flags & (re.I | re.M | re.S | re.X)
+    letters = ''.join(c for flag, c in ((re.I, 'i'), (re.M, 'm'), (re.S, 's'), (re.X, 'x')) if inline & flag)
+    return f'(?{letters}:{rule.pattern})' if letters else f'(?:{rule.pattern})'
+
+
+class Engine:
+    """Compiled rule set.  Build once, apply to as many texts as needed."""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        literals = [(i, r.pattern) for i, r in enumerate(self.rules) if not r.regex]
+        self.automaton = Automaton(literals) if literals else None
+        self.max_literal = max((len(p) for _, p in literals), default=0)
+        self.regex_rules = [i for i, r in enumerate(self.rules) if r.regex]
+        self.combined = None
+        if self.regex_rules:
+            # One group per rule; the rule's own groups are recovered by
+            # re-matching it at the hit position, so numbering never clashes.
+            # Patterns that cannot share one alternation (duplicate group
+            # names, numeric backreferences) are scanned on their own.
+            try:
+                self.combined = re.compile('|'.join(f'(?P<_r{i}>{_scoped(self.rules[i])})' for i in self.regex_rules))
+            except re.error:
+                self.combined = None
+
+    def _first_regex(self, pattern, idx, text, pos, end):
+        """Leftmost non-empty regex hit at or after pos, longest at its start.
+
+        idx is the rule pattern belongs to, or None for the combined pattern.
+        """
+        while pos <= end:
+            m = pattern.search(text, pos, end)
+            if m is None:
+                return None
+            s = m.start()
+            if idx is None:
+                # The alternation stops at the first rule matching here; a
+                # later one may match longer, and longest wins.
+                first = int(m.lastgroup[2:])
+                hit = (s, m.end(), first)
+                for j in self.regex_rules[self.regex_rules.index(first) + 1:]:
+                    mj = self.rules[j].compiled.match(text, s, end)
+                    if mj is not None and mj.end() > hit[1]:
+                        hit = (s, mj.end(), j)
+            else:
+                hit = (s, m.end(), idx)
+            if hit[1] > s:
+                return hit
+            pos = s + 1
+        return None
+
+    def _regex_scanner(self, text, end):
+        """next(pos) -> the regex hit the resolution would take at or after pos.
+
+        Searches restart from the cursor, so a regex match that overlaps a
+        chosen literal does not hide a later one; each pattern's last result
+        is kept while it still lies ahead of the cursor.
+        """
+        if self.combined is not None:
+            patterns = [(self.combined, None)]
+        else:
+            patterns = [(self.rules[i].compiled, i) for i in self.regex_rules]
+        ahead = [()] * len(patterns)
+
+        def next_hit(pos):
+            best = None
+            for k, (pattern, idx) in enumerate(patterns):
+                hit = ahead[k]
+                if hit == () or (hit is not None and hit[0] < pos):
+                    hit = ahead[k] = self._first_regex(pattern, idx, text, pos, end)
+                if hit is not None and (best is None or _rank(hit) < _rank(best)):
+                    best = hit
+            return best
+        return next_hit
+
+    def _resync(self, text, start, end, pos):
+        """Nearest point at or left of pos that no literal match crosses.
+
+        Resolution from there picks the same hits as resolution from start,
+        since every earlier hit ends at or before it.
+        """
+        while pos > start:
+            crossing = [s for s, e, _ in self.automaton.scan(text, max(start, pos - self.max_literal + 1),
+                                                              min(end, pos + self.max_literal - 1))
+                        if s < pos < e]
+            if not crossing:
+                return pos
+            pos = min(crossing)
+        return start
+
+    def matches(self, text, start=0, end=None, touching=None):
+        """Non-overlapping (start, end, rule_index) hits in text order.
+
+        Overlaps are resolved leftmost-longest across literal and regex rules
+        alike; a tie in start and length goes to the rule declared first.
+        With touching=(lo, hi) only the resolved hits overlapping or adjacent
+        to text[lo:hi] are returned.  When every rule is literal, resolution
+        starts just left of that range and the automaton scans only up to
+        max_literal past it; regex rules need the whole text.
+        """
+        end = len(text) if end is None else end
+        scan_end = end
+        if touching is not None and not self.regex_rules:
+            lo, hi = touching
+            start = self._resync(text, start, end, max(start, lo - 1))
+            scan_end = min(end, hi + self.max_literal)
+        literals = sorted(self.automaton.scan(text, start, scan_end), key=_rank) if self.automaton else []
+        next_regex = self._regex_scanner(text, end) if self.regex_rules else None
+        chosen = []
+        cursor = start
+        i = 0
+        while True:
+            while i < len(literals) and literals[i][0] < cursor:
+                i += 1
+            best = literals[i] if i < len(literals) else None
+            if next_regex is not None:
+                hit = next_regex(cursor)
+                if hit is not None and (best is None or _rank(hit) < _rank(best)):
+                    best = hit
+            if best is None:
+                break
+            chosen.append(best)
+            cursor = best[1]
+        if touching is not None:
+            lo, hi = touching
+            chosen = [h for h in chosen if h[0] <= hi and h[1] >= lo]
+        return chosen
+
+    def apply(self, text, start=0, end=None, guard=None, touching=None):
+        """Rewrite text[start:end] in one pass and return a Result.
+
+        guard(text, start, end, rule_index, replacement) can veto single edits
+        by returning False (e.g. already_applied); touching is passed on to
+        matches().
+        """
+        stats = [RuleStats(r) for r in self.rules]
+        t0 = time.perf_counter()
+        hits = self.matches(text, start, end, touching)
+        scan = time.perf_counter() - t0
+        edits = []
+        parts = []
+        cursor = 0
+        for s, e, idx in hits:
+            rule, st = self.rules[idx], stats[idx]
+            if rule.count is not None and st.matches >= rule.count:
+                st.skipped += 1
+                continue
+            t1 = time.perf_counter()
+            repl = rule.expand(text, s, e)
+            st.seconds += time.perf_counter() - t1
+            if guard is not None and not guard(text, s, e, idx, repl):
+                st.guarded += 1
+                continue
+            st.matches += 1
+            edits.append((s, e, idx, repl))
+            parts.append(text[cursor:s])
+            parts.append(repl)
+            cursor = e
+        if not parts:
+            return Result(text, stats, scan, False)
+        parts.append(text[cursor:])
+        out = ''.join(parts)
+        return Result(out, stats, scan, out != text, edits)
+
+
+def rewrite(text, rules):
+    return Engine(rules).apply(text)
@@ -0,0 +1,220 @@
+"""Apply a codemod rule set to every .js/.jsx file under src/ in parallel.
+
+    python codemod_runner.py refactor2 --dry-run
+    python codemod_runner.py refactor -j 8 --root src/pages
+
+The rule set is any importable module exposing a RULES list (see refactor.py)
+and a FILES list of glob patterns, relative to the repository root, naming the
+files it was written for.  A rule set without FILES only runs with --include.
+Files whose content and rule set are unchanged since the last run are skipped
+using the hashes stored in .codemod-cache.json.
+"""
+import argparse
+import difflib
+import fnmatch
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from codemod import Engine
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+EXTENSIONS = ('.js', '.jsx')
+SKIP_DIRS = {'node_modules', 'dist', '.git'}
+CACHE_VERSION = 1
+
+_engine = None
+
+
+def discover(root):
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            if name.endswith(EXTENSIONS):
+                found.append(os.path.join(dirpath, name))
+    return found
+
+
+def scope(module, include=None):
+    """Glob patterns a rule set may touch: --include, else the module's FILES."""
+    patterns = include or getattr(module, 'FILES', None)
+    if not patterns:
+        raise ValueError(f'{module.__name__} declares no FILES; pass --include to choose the files it applies to')
+    return list(patterns)
+
+
+def in_scope(path, patterns):
+    rel = os.path.relpath(os.path.abspath(path), ROOT).replace(os.sep, '/')
+    return any(fnmatch.fnmatchcase(rel, pat) for pat in patterns)
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def ruleset_hash(module_name):
+    # Hash the rule module and the engine sources rather than the rule
+    # objects, so callable replacements are covered too.
+    module = importlib.import_module(module_name)
+    h = hashlib.sha256()
+    for path in (module.__file__, os.path.join(ROOT, 'codemod.py')):
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def load_cache(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('version') != CACHE_VERSION:
+        return {}
+    return data.get('entries', {})
+
+
+def save_cache(path, entries):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'entries': entries}, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def is_cached(entry, ruleset, path):
+    if not entry or entry.get('ruleset') != ruleset:
+        return False
+    st = os.stat(path)
+    if entry.get('mtime_ns') == st.st_mtime_ns and entry.get('size') == st.st_size:
+        return True
+    with open(path, 'rb') as f:
+        return content_hash(f.read()) == entry.get('hash')
+
+
+def _init_worker(module_name):
+    global _engine
+    sys.path.insert(0, ROOT)
+    _engine = Engine(importlib.import_module(module_name).RULES)
+
+
+def process_file(path, dry_run):
+    t0 = time.perf_counter()
+    with open(path, 'rb') as f:
+        raw = f.read()
+    text = raw.decode('utf-8')
+    result = _engine.apply(text)
+    diff = None
+    if result.changed:
+        rel = os.path.relpath(path, ROOT)
+        diff = ''.join(difflib.unified_diff(
+            text.splitlines(keepends=True), result.text.splitlines(keepends=True),
+            fromfile='a/' + rel, tofile='b/' + rel))
+        if not dry_run:
+            raw = result.text.encode('utf-8')
+            with open(path, 'wb') as f:
+                f.write(raw)
+    st = os.stat(path)
+    return {
+        'path': path,
+        'changed': result.changed,
+        'diff': diff,
+        'counts': [s.matches for s in result.stats],
+        'hash': content_hash(raw),
+        'mtime_ns': st.st_mtime_ns,
+        'size': st.st_size,
+        'seconds': time.perf_counter() - t0,
+    }
+
+
+def run(module_name, root, jobs=None, dry_run=False, cache_path=None, out=sys.stdout, include=None):
+    """Run the rule set over the files under root in its scope; returns a summary dict."""
+    t0 = time.perf_counter()
+    module = importlib.import_module(module_name)
+    rules = module.RULES
+    patterns = scope(module, include)
+    ruleset = ruleset_hash(module_name)
+    entries = load_cache(cache_path) if cache_path else {}
+    files = [path for path in discover(root) if in_scope(path, patterns)]
+    todo = []
+    skipped = 0
+    for path in files:
+        if is_cached(entries.get(os.path.relpath(path, ROOT)), ruleset, path):
+            skipped += 1
+        else:
+            todo.append(path)
+    # Largest files first so the pool is never left waiting on one straggler.
+    todo.sort(key=os.path.getsize, reverse=True)
+
+    totals = [0] * len(rules)
+    changed = []
+    slowest = 0.0
+    if todo:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(module_name,)) as pool:
+            futures = [pool.submit(process_file, path, dry_run) for path in todo]
+            for fut in as_completed(futures):
+                res = fut.result()
+                rel = os.path.relpath(res['path'], ROOT)
+                slowest = max(slowest, res['seconds'])
+                totals = [a + b for a, b in zip(totals, res['counts'])]
+                if res['changed']:
+                    changed.append(rel)
+                    if dry_run:
+                        out.write(res['diff'])
+                        out.flush()
+                # A dry run leaves changed files as they were, so only
+                # files that are already clean can be remembered.
+                if not (dry_run and res['changed']):
+                    entries[rel] = {'ruleset': ruleset, 'hash': res['hash'],
+                                    'mtime_ns': res['mtime_ns'], 'size': res['size']}
+    if cache_path:
+        save_cache(cache_path, entries)
+
+    # Match counts only cover the files processed on this run.
+    missed = [rule.name for rule, n in zip(rules, totals) if n < rule.expect] if todo else []
+    return {
+        'files': len(files),
+        'skipped': skipped,
+        'processed': len(todo),
+        'changed': sorted(changed),
+        'counts': {rule.name: n for rule, n in zip(rules, totals)},
+        'missed': missed,
+        'slowest_seconds': slowest,
+        'seconds': time.perf_counter() - t0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('ruleset', help='module exposing RULES, e.g. refactor2')
+    parser.add_argument('--root', default=os.path.join(ROOT, 'src'))
+    parser.add_argument('-j', '--jobs', type=int, default=None)
+    parser.add_argument('--dry-run', action='store_true', help='print unified diffs instead of writing')
+    parser.add_argument('--cache', default=os.path.join(ROOT, '.codemod-cache.json'))
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--include', action='append', metavar='GLOB',
+                        help="files to apply the rules to, relative to the repo root (overrides the module's FILES)")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = run(args.ruleset, args.root, jobs=args.jobs, dry_run=args.dry_run,
+                      cache_path=None if args.no_cache else args.cache, include=args.include)
+    except ValueError as e:
+        parser.error(str(e))
+    log = sys.stderr if args.dry_run else sys.stdout
+    print(f"{summary['files']} files, {summary['skipped']} cached, {summary['processed']} processed, "
+          f"{len(summary['changed'])} changed in {summary['seconds'] * 1000:.0f} ms "
+          f"(slowest file {summary['slowest_seconds'] * 1000:.0f} ms)", file=log)
+    for path in summary['changed']:
+        print(f'  {"would change" if args.dry_run else "changed"} {path}', file=log)
+    for name in summary['missed']:
+        print(f'  MISSED {name}', file=log)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
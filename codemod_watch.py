@@ -0,0 +1,350 @@
+"""Watch files and re-apply a codemod rule set to just the regions that change.
+
+Each watched file's text is kept in memory.  When a save lands (inotify on
+Linux, mtime polling elsewhere; bursts are debounced) the changed range is
+found by trimming the common prefix and suffix, and only rule matches
+touching that range are considered.  Overlaps are still resolved as for the
+whole file; with literal rules only, the scan is limited to the range and
+the nearest point before it that no match crosses.
+
+Edits are fingerprinted so nothing applies twice: the spans the watcher
+rewrote, and the matches already present when it started, are remembered
+with a hash of their text and shifted as the file changes.  A match over an
+intact span is skipped, as is one sitting inside a copy of its own
+replacement (codemod.already_applied).  Count limits hold across saves.
+
+Directories are narrowed to the rule set's FILES (or --include); files named
+explicitly are always watched.
+
+    python codemod_watch.py refactor2 src/pages/CommunityView.jsx
+    python codemod_watch.py refactor src/pages --apply-now --dry-run
+    python codemod_watch.py refactor2 src/pages/CommunityView.jsx --bench 500
+"""
+import argparse
+import ctypes
+import ctypes.util
+import difflib
+import hashlib
+import importlib
+import os
+import random
+import select
+import struct
+import sys
+import time
+
+from codemod import Engine, already_applied
+from codemod_runner import ROOT, discover, in_scope, scope
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_NONBLOCK = 0o4000
+EVENT = struct.Struct('iIII')
+
+
+def fingerprint(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+
+
+def changed_range(old, new):
+    """(start, old_end, new_end): old[start:old_end] became new[start:new_end]."""
+    lo, hi = 0, min(len(old), len(new))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[lo:mid] == new[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    prefix = lo
+    lo, hi = 0, min(len(old), len(new)) - prefix
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[len(old) - mid:len(old) - lo] == new[len(new) - mid:len(new) - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return prefix, len(old) - lo, len(new) - lo
+
+
+def shift_spans(spans, start, old_end, new_end):
+    """Move spans past a replacement of [start, old_end); spans it touches are dropped."""
+    delta = new_end - old_end
+    out = []
+    for s, e, idx, digest in spans:
+        if e <= start:
+            out.append((s, e, idx, digest))
+        elif s >= old_end:
+            out.append((s + delta, e + delta, idx, digest))
+    return out
+
+
+class FileState:
+    def __init__(self, path, text):
+        self.path = path
+        self.text = text
+        # (start, end, rule index, fingerprint) of settled matches and edits.
+        self.spans = []
+        self.applied = {}       # rule index -> edits applied so far
+
+
+class Watcher:
+    def __init__(self, engine, dry_run=False, out=sys.stdout):
+        self.engine = engine
+        self.dry_run = dry_run
+        self.out = out
+        self.files = {}
+
+    def load(self, path, apply_now=False):
+        """Start tracking path.  Existing matches count as applied unless apply_now."""
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        state = self.files[path] = FileState(path, text)
+        if apply_now:
+            state.text = ''
+            return self.update(path, text)
+        state.spans = [(s, e, idx, fingerprint(text[s:e])) for s, e, idx in self.engine.matches(text)]
+        return None
+
+    def _guard(self, state, tally):
+        rules = self.engine.rules
+
+        def guard(text, s, e, idx, repl):
+            for lo, hi, _, digest in state.spans:
+                if s < hi and e > lo and fingerprint(text[lo:hi]) == digest:
+                    return False
+            count = rules[idx].count
+            done = state.applied.get(idx, 0) + tally.get(idx, 0)
+            if (count is not None and done >= count) or already_applied(text, s, e, repl):
+                return False
+            tally[idx] = tally.get(idx, 0) + 1
+            return True
+        return guard
+
+    def update(self, path, text=None):
+        """Re-apply the rules around what changed in path; returns the Result or None."""
+        state = self.files[path]
+        if text is None:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    text = f.read()
+            except (OSError, UnicodeDecodeError):
+                return None
+        if text == state.text:
+            return None
+        t0 = time.perf_counter()
+        start, old_end, new_end = changed_range(state.text, text)
+        state.spans = shift_spans(state.spans, start, old_end, new_end)
+        tally = {}
+        result = self.engine.apply(text, guard=self._guard(state, tally), touching=(start, new_end))
+        result.seconds = time.perf_counter() - t0
+        result.window = new_end - start
+        if not result.changed:
+            state.text = text
+            return result
+        if self.dry_run:
+            rel = os.path.relpath(path, ROOT)
+            self.out.write(''.join(difflib.unified_diff(
+                text.splitlines(keepends=True), result.text.splitlines(keepends=True),
+                fromfile='a/' + rel, tofile='b/' + rel)))
+            state.text = text
+            return result
+        # Record the new edits as spans, in the coordinates of the output.
+        shift = 0
+        for s, e, idx, repl in result.edits:
+            state.spans = shift_spans(state.spans, s + shift, e + shift, s + shift + len(repl))
+            if repl:
+                state.spans.append((s + shift, s + shift + len(repl), idx, fingerprint(repl)))
+            shift += len(repl) - (e - s)
+        for idx, n in tally.items():
+            state.applied[idx] = state.applied.get(idx, 0) + n
+        state.text = result.text
+        tmp = path + '.codemod-tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(result.text)
+        os.replace(tmp, path)
+        return result
+
+
+class InotifyWatch:
+    """Changed paths among `paths`, from inotify on their directories."""
+
+    def __init__(self, paths):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.paths = set(paths)
+        self.dirs = {}
+        for d in sorted({os.path.dirname(p) for p in self.paths}):
+            # Editors often save by writing a temp file and renaming it over.
+            wd = libc.inotify_add_watch(self.fd, d.encode(), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {d}')
+            self.dirs[wd] = d
+
+    def wait(self, timeout=None):
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+        data = os.read(self.fd, 65536)
+        changed = set()
+        pos = 0
+        while pos < len(data):
+            wd, _, _, length = EVENT.unpack_from(data, pos)
+            name = data[pos + EVENT.size:pos + EVENT.size + length].rstrip(b'\0').decode()
+            pos += EVENT.size + length
+            path = os.path.join(self.dirs.get(wd, ''), name)
+            if path in self.paths:
+                changed.add(path)
+        return changed
+
+
+class PollWatch:
+    """Fallback for platforms without inotify: compare mtime and size."""
+
+    def __init__(self, paths, interval=0.1):
+        self.interval = interval
+        self.seen = {p: self._stat(p) for p in paths}
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path, before in self.seen.items():
+                now = self._stat(path)
+                if now != before:
+                    self.seen[path] = now
+                    changed.add(path)
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+            time.sleep(self.interval if deadline is None else max(0.0, min(self.interval, deadline - time.monotonic())))
+
+
+def open_watch(paths, poll=None):
+    if poll is None and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatch(paths)
+        except (OSError, AttributeError):
+            pass
+    return PollWatch(paths, poll or 0.1)
+
+
+def describe(path, result):
+    applied = [f'{st.matches}x {st.rule.name}' for st in result.stats if st.matches]
+    guarded = sum(st.guarded for st in result.stats)
+    return (f"{time.strftime('%H:%M:%S')} {os.path.relpath(path, ROOT)}: "
+            f"{len(result.edits)} edit(s) in {result.seconds * 1000:.2f} ms "
+            f"(window {result.window} chars{f', {guarded} already applied' if guarded else ''})"
+            + ''.join(f'\n    {line}' for line in applied))
+
+
+def watch(watcher, source, debounce, log=sys.stdout):
+    while True:
+        changed = source.wait()
+        # Let a burst of saves settle before touching the file.
+        while True:
+            more = source.wait(debounce)
+            if not more:
+                break
+            changed |= more
+        for path in sorted(changed):
+            result = watcher.update(path)
+            if result is not None and result.changed:
+                print(describe(path, result), file=log, flush=True)
+
+
+def bench(watcher, path, edits, seed=0):
+    """Time updates after random one-line edits, without writing anything.
+
+    Returns None for an empty file.  The file's state is restored afterwards.
+    """
+    rng = random.Random(seed)
+    state = watcher.files[path]
+    if not state.text:
+        return None
+    original = state.text, list(state.spans), dict(state.applied)
+    dry_run, watcher.dry_run = watcher.dry_run, True
+    out, watcher.out = watcher.out, open(os.devnull, 'w')
+    times = []
+    try:
+        for _ in range(edits):
+            lines = state.text.splitlines(keepends=True)
+            i = rng.randrange(len(lines))
+            if rng.random() < 0.5:
+                lines.insert(i, lines[i][:len(lines[i]) - len(lines[i].lstrip())] + '// edited\n')
+            else:
+                lines[i] = lines[i].replace(' ', '  ', 1)
+            result = watcher.update(path, ''.join(lines))
+            times.append(result.seconds if result is not None else 0.0)
+    finally:
+        watcher.out.close()
+        watcher.dry_run, watcher.out = dry_run, out
+        state.text, state.spans, state.applied = original
+    times.sort()
+    ms = [t * 1000 for t in times]
+    return {'edits': edits, 'lines': original[0].count('\n'), 'p50_ms': ms[len(ms) // 2],
+            'p95_ms': ms[int(len(ms) * 0.95)], 'max_ms': ms[-1]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('ruleset', help='module exposing RULES, e.g. refactor2')
+    parser.add_argument('paths', nargs='+', help='files or directories to watch')
+    parser.add_argument('--apply-now', action='store_true', help='apply the rules to the current contents first')
+    parser.add_argument('--dry-run', action='store_true', help='print unified diffs instead of writing')
+    parser.add_argument('--debounce', type=float, default=0.05, help='seconds of quiet before applying')
+    parser.add_argument('--poll', type=float, help='poll every N seconds instead of using inotify')
+    parser.add_argument('--include', action='append', metavar='GLOB',
+                        help="files under a directory argument to watch (overrides the module's FILES)")
+    parser.add_argument('--bench', type=int, metavar='N', help='time N simulated edits per file and exit')
+    args = parser.parse_args(argv)
+
+    module = importlib.import_module(args.ruleset)
+    engine = Engine(module.RULES)
+    paths = []
+    for p in args.paths:
+        if os.path.isdir(p):
+            try:
+                patterns = scope(module, args.include)
+            except ValueError as e:
+                parser.error(str(e))
+            paths.extend(path for path in discover(p) if in_scope(path, patterns))
+        else:
+            paths.append(os.path.abspath(p))
+    paths = [os.path.abspath(p) for p in paths]
+    watcher = Watcher(engine, dry_run=args.dry_run)
+    for path in paths:
+        result = watcher.load(path, apply_now=args.apply_now)
+        if result is not None and result.changed:
+            print(describe(path, result), flush=True)
+
+    if args.bench:
+        for path in paths:
+            r = bench(watcher, path, args.bench)
+            if r is None:
+                print(f'{os.path.relpath(path, ROOT)}: empty, skipped')
+                continue
+            print(f"{os.path.relpath(path, ROOT)}: {r['lines']} lines, {r['edits']} edits, "
+                  f"p50 {r['p50_ms']:.2f} ms, p95 {r['p95_ms']:.2f} ms, max {r['max_ms']:.2f} ms")
+        return 0
+
+    source = open_watch(paths, args.poll)
+    print(f'watching {len(paths)} file(s) with {type(source).__name__}; Ctrl-C to stop', flush=True)
+    try:
+        watch(watcher, source, args.debounce)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
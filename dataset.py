@@ -0,0 +1,354 @@
+"""Deterministic synthetic data shaped like the backend's API responses.
+
+Every record is a pure function of (seed, kind, index), so a dataset of a
+million notes or sessions is generated on demand and never held in memory.
+Shared note i belongs to project i % n_projects and project j to community
+j // projects_per_community, so nested listings are plain index arithmetic.
+
+    python dataset.py --notes 1000000 --sessions 1000000 --dump communities > communities.json
+"""
+import argparse
+import datetime
+import json
+import sys
+
+MASK64 = (1 << 64) - 1
+KINDS = {'community': 1, 'project': 2, 'shared_note': 3, 'note': 4, 'session': 5,
+         'task': 6, 'notification': 7, 'user': 8}
+WORDS = (
+    'volcán lava ceniza magma cráter erupción roca fumarola basalto obsidiana '
+    'piroclasto caldera géiser tefra domo sismo ladera cumbre pluma flujo '
+    'proyecto nota tarea idea clase trabajo estudio lectura resumen borrador '
+    'revisar entregar diseño prueba reunión avance bloque capítulo sección lista'
+).split()
+TAGS = ('Trabajo', 'Estudio', 'Ejercicio', 'Lectura', 'Meditación', 'Ocio')
+NOTE_TYPES = ('Personal', 'Clase', 'Trabajo', 'Ideas', 'Otro')
+NOTIFICATION_TYPES = ('community_invite', 'member_joined', 'note_updated', 'task_assigned')
+EPOCH = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def mix(*values):
+    """splitmix64 over the values; cheap, stateless pseudo-randomness."""
+    x = 0x9E3779B97F4A7C15
+    for v in values:
+        x = (x ^ (v & MASK64)) * 0xBF58476D1CE4E5B9 & MASK64
+        x = (x ^ (x >> 27)) * 0x94D049BB133111EB & MASK64
+        x ^= x >> 31
+    return x
+
+
+class _Rand:
+    """Stream of numbers derived from one mix() state."""
+
+    def __init__(self, *key):
+        self.state = mix(*key)
+
+    def next(self):
+        self.state = (self.state + 0x9E3779B97F4A7C15) & MASK64
+        return mix(self.state)
+
+    def below(self, n):
+        return self.next() % n if n > 0 else 0
+
+    def uniform(self):
+        return self.next() / MASK64
+
+    def choice(self, seq):
+        return seq[self.below(len(seq))]
+
+    def words(self, n):
+        return ' '.join(WORDS[self.below(len(WORDS))] for _ in range(n))
+
+
+def _iso(ts):
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+class Dataset:
+    def __init__(self, notes=100, sessions=1000, shared_notes=None, communities=None,
+                 projects_per_community=4, members=5, notifications=20, tasks_per_project=6,
+                 content_bytes=1500, days=365, seed=0, username='volcan', now=None):
+        self.notes = notes
+        self.sessions = sessions
+        self.shared_notes = notes if shared_notes is None else shared_notes
+        self.communities = communities if communities is not None else max(1, self.shared_notes // 500)
+        self.projects_per_community = projects_per_community
+        self.projects = self.communities * projects_per_community
+        self.members = members
+        self.notifications = notifications
+        self.tasks_per_project = tasks_per_project
+        self.content_bytes = content_bytes
+        self.days = days
+        self.seed = seed
+        self.username = username
+        self.now = int(now if now is not None else EPOCH.timestamp() + days * 86400)
+
+    def _rand(self, kind, i):
+        return _Rand(self.seed, KINDS[kind], i)
+
+    def config(self):
+        return {k: getattr(self, k) for k in (
+            'notes', 'sessions', 'shared_notes', 'communities', 'projects_per_community', 'members',
+            'notifications', 'tasks_per_project', 'content_bytes', 'days', 'seed', 'username', 'now')}
+
+    # -- users -------------------------------------------------------------
+
+    def user(self, i):
+        # User 1 is the account the scripts log in with.
+        name = self.username if i == 1 else f'user{i}'
+        return {'id': i, 'username': name, 'display_name': name.capitalize()}
+
+    def member_ids(self, community_id):
+        r = self._rand('community', community_id)
+        ids = {1}
+        while len(ids) < self.members:
+            ids.add(2 + r.below(max(self.members * 4, 8)))
+        return sorted(ids)
+
+    # -- content -----------------------------------------------------------
+
+    def html(self, r, size=None):
+        """Tiptap-style HTML of roughly `size` bytes."""
+        target = self.content_bytes if size is None else size
+        target = max(40, int(target * (0.5 + r.uniform())))
+        parts, total = [], 0
+        while total < target:
+            roll = r.below(10)
+            if roll == 0:
+                block = f'<h2>{r.words(3 + r.below(4)).capitalize()}</h2>'
+            elif roll == 1:
+                items = ''.join(f'<li><p>{r.words(3 + r.below(6))}</p></li>' for _ in range(2 + r.below(3)))
+                block = f'<ul>{items}</ul>'
+            else:
+                block = f'<p>{r.words(12 + r.below(30)).capitalize()}.</p>'
+            parts.append(block)
+            total += len(block.encode('utf-8'))
+        return ''.join(parts)
+
+    # -- communities / projects / shared notes -----------------------------
+
+    def project_note_ids(self, project_id):
+        return range(project_id - 1, self.shared_notes, self.projects)
+
+    def shared_note(self, i):
+        r = self._rand('shared_note', i)
+        project_id = i % self.projects + 1
+        created = self.now - r.below(self.days * 86400)
+        author = self.user(self.choice_member(project_id, r))
+        return {
+            'id': i + 1,
+            'project': project_id,
+            'title': r.words(2 + r.below(4)).capitalize(),
+            'content': self.html(r),
+            'created_by': author['id'],
+            'created_by_name': author['display_name'],
+            'created_at': _iso(created),
+            'updated_at': _iso(min(self.now, created + r.below(30 * 86400))),
+        }
+
+    def choice_member(self, project_id, r):
+        return r.choice(self.member_ids((project_id - 1) // self.projects_per_community + 1))
+
+    def shared_task(self, project_id, k):
+        r = self._rand('task', project_id * 1000 + k)
+        author = self.user(self.choice_member(project_id, r))
+        return {'id': project_id * 1000 + k, 'project': project_id, 'title': r.words(3 + r.below(5)).capitalize(),
+                'completed': r.below(3) == 0, 'created_by_name': author['display_name']}
+
+    def project(self, project_id, notes=True):
+        r = self._rand('project', project_id)
+        tasks = [self.shared_task(project_id, k) for k in range(self.tasks_per_project)]
+        done = sum(t['completed'] for t in tasks)
+        data = {
+            'id': project_id,
+            'community': (project_id - 1) // self.projects_per_community + 1,
+            'name': r.words(2).title(),
+            'description': r.words(8 + r.below(12)).capitalize(),
+            'created_by_name': self.user(self.choice_member(project_id, r))['display_name'],
+            'progress': round(100 * done / len(tasks)) if tasks else 0,
+            'shared_tasks': tasks,
+        }
+        if notes:
+            data['shared_notes'] = self.iter_project_notes(project_id)
+        return data
+
+    def iter_project_notes(self, project_id):
+        return (self.shared_note(i) for i in self.project_note_ids(project_id))
+
+    def community(self, community_id):
+        r = self._rand('community', community_id)
+        members = [self.user(i) for i in self.member_ids(community_id)]
+        first = (community_id - 1) * self.projects_per_community + 1
+        return {
+            'id': community_id,
+            'name': r.words(2).title(),
+            'description': r.words(10).capitalize(),
+            'owner': members[r.below(len(members))]['id'],
+            'member_count': len(members),
+            'members': members,
+            'projects': (self.project(p) for p in range(first, first + self.projects_per_community)),
+        }
+
+    def iter_communities(self):
+        return (self.community(c) for c in range(1, self.communities + 1))
+
+    # -- personal notes ----------------------------------------------------
+
+    def note(self, i):
+        r = self._rand('note', i)
+        created = self.now - r.below(self.days * 86400)
+        return {
+            'id': i + 1,
+            'title': r.words(2 + r.below(4)).capitalize(),
+            'content': self.html(r),
+            'note_type': r.choice(NOTE_TYPES),
+            'created_at': _iso(created),
+            'updated_at': _iso(min(self.now, created + r.below(30 * 86400))),
+        }
+
+    def iter_notes(self):
+        return (self.note(i) for i in range(self.notes))
+
+    # -- focus sessions ----------------------------------------------------
+
+    def session_fields(self, i):
+        """(start_ts, duration_minutes, project_id or 0, tag) for session i."""
+        r = self._rand('session', i)
+        start = self.now - self.days * 86400 + r.below(self.days * 86400)
+        # Pomodoro-ish: mostly 25 min, some short or abandoned, some long.
+        roll = r.below(10)
+        if roll < 6:
+            minutes = 25.0
+        elif roll < 8:
+            minutes = round(1 + r.uniform() * 24, 2)
+        else:
+            minutes = float(30 + r.below(91))
+        project = 1 + r.below(self.projects) if self.projects and r.below(2) else 0
+        return start, minutes, project, r.choice(TAGS)
+
+    def session(self, i):
+        start, minutes, project, tag = self.session_fields(i)
+        return {
+            'id': i + 1,
+            'tag': f"Project: {self.project(project, notes=False)['name']}" if project else tag,
+            'project': project or None,
+            'duration_minutes': minutes,
+            'is_completed': minutes >= 25,
+            'start_time': _iso(start),
+            'end_time': _iso(start + int(minutes * 60)),
+        }
+
+    def iter_session_fields(self):
+        return (self.session_fields(i) for i in range(self.sessions))
+
+    def reports(self):
+        """The /focus-sessions/reports/ payload, aggregated in one streaming pass."""
+        by_tag, by_project, daily = {}, {}, {}
+        names = {}
+        for start, minutes, project, tag in self.iter_session_fields():
+            if project:
+                if project not in names:
+                    names[project] = self.project(project, notes=False)['name']
+                tag = f'Project: {names[project]}'
+                by_project[names[project]] = by_project.get(names[project], 0.0) + minutes
+            by_tag[tag] = by_tag.get(tag, 0.0) + minutes
+            day = _iso(start)[:10]
+            daily[day] = daily.get(day, 0.0) + minutes
+        return {
+            'by_tag': [{'tag': k, 'total_minutes': round(v, 2)}
+                       for k, v in sorted(by_tag.items(), key=lambda kv: -kv[1])],
+            'by_project': [{'project__name': k, 'total_minutes': round(v, 2)}
+                           for k, v in sorted(by_project.items(), key=lambda kv: -kv[1])],
+            'daily_stats': [{'date': k, 'total_minutes': round(v, 2)} for k, v in sorted(daily.items())],
+        }
+
+    # -- notifications -----------------------------------------------------
+
+    def notification(self, i):
+        r = self._rand('notification', i)
+        community = 1 + r.below(self.communities)
+        kind = r.choice(NOTIFICATION_TYPES)
+        return {
+            'id': i + 1,
+            'notification_type': kind,
+            'message': f'{self.user(2 + r.below(20))["display_name"]} {r.words(4)}',
+            'community_name': self.community(community)['name'],
+            'status': 'pending' if kind == 'community_invite' else 'read' if r.below(3) else 'unread',
+            'created_at': _iso(self.now - r.below(7 * 86400)),
+        }
+
+    def iter_notifications(self):
+        return (self.notification(i) for i in range(self.notifications))
+
+
+class RawJSON(str):
+    """Already-encoded JSON that iter_json() passes through untouched."""
+
+
+def iter_json(value):
+    """Encode value as JSON text pieces, expanding generators lazily."""
+    if isinstance(value, RawJSON):
+        yield value
+    elif isinstance(value, dict):
+        yield '{'
+        first = True
+        for k, v in value.items():
+            if not first:
+                yield ', '
+            first = False
+            yield json.dumps(str(k)) + ': '
+            yield from iter_json(v)
+        yield '}'
+    elif isinstance(value, (list, tuple, range)) or hasattr(value, '__next__'):
+        yield '['
+        first = True
+        for item in value:
+            if not first:
+                yield ', '
+            first = False
+            yield from iter_json(item)
+        yield ']'
+    else:
+        yield json.dumps(value, ensure_ascii=False)
+
+
+def add_arguments(parser):
+    parser.add_argument('--notes', type=int, default=100)
+    parser.add_argument('--shared-notes', type=int, default=None)
+    parser.add_argument('--sessions', type=int, default=1000)
+    parser.add_argument('--communities', type=int, default=None)
+    parser.add_argument('--projects-per-community', type=int, default=4)
+    parser.add_argument('--content-bytes', type=int, default=1500)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def from_args(args):
+    return Dataset(notes=args.notes, shared_notes=args.shared_notes, sessions=args.sessions,
+                   communities=args.communities, projects_per_community=args.projects_per_community,
+                   content_bytes=args.content_bytes, days=args.days, seed=args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument('--dump', choices=('communities', 'notes', 'sessions', 'reports', 'config'),
+                        default='config')
+    args = parser.parse_args(argv)
+    ds = from_args(args)
+    source = {
+        'communities': ds.iter_communities,
+        'notes': ds.iter_notes,
+        'sessions': lambda: (ds.session(i) for i in range(ds.sessions)),
+        'reports': ds.reports,
+        'config': ds.config,
+    }[args.dump]()
+    out = sys.stdout
+    for piece in iter_json(source):
+        out.write(piece)
+    out.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
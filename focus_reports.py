@@ -0,0 +1,281 @@
+"""Vectorized focus-session rollups for /focus-sessions/reports/.
+
+Takes raw session columns (start timestamp, minutes, project, tag) as NumPy
+arrays and produces the daily, weekly, per-project and per-tag totals with
+bincount, bucketing days in the user's time zone: the zone's UTC-offset
+transitions over the data's range are found once, and every start time
+picks its offset with a single searchsorted.  heatmap_grid() lays the daily
+totals out the way Heatmap.jsx does (371 days back from today, Sunday-first
+weeks, last 53 weeks) so the UI can render it without rebuilding dates.
+
+    python focus_reports.py --sessions 100000 --tz America/Bogota --grid
+    python focus_reports.py --check --sessions 20000
+    python focus_reports.py --bench 10000000 --tz Europe/Madrid
+"""
+import argparse
+import datetime
+import json
+import sys
+import time
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+import dataset
+
+DAY = 86400
+UNIX_EPOCH = datetime.date(1970, 1, 1)
+# 1970-01-01 was a Thursday; shifting by 4 makes weeks start on Sunday.
+SUNDAY_SHIFT = 4
+HEATMAP_DAYS = 371
+HEATMAP_WEEKS = 53
+
+
+class Sessions:
+    """Column arrays: start (int64 epoch s), minutes (float64), project (int32, 0 = none), tag (int16)."""
+
+    def __init__(self, start, minutes, project, tag, tags=dataset.TAGS, project_names=None):
+        self.start = np.asarray(start, dtype=np.int64)
+        self.minutes = np.asarray(minutes, dtype=np.float64)
+        self.project = np.asarray(project, dtype=np.int32)
+        self.tag = np.asarray(tag, dtype=np.int16)
+        self.tags = tuple(tags)
+        self.project_names = project_names or {}
+
+    def __len__(self):
+        return len(self.start)
+
+
+def from_dataset(ds):
+    """Columns for every session of a dataset.Dataset (row by row; fine up to ~10^6)."""
+    n = ds.sessions
+    start = np.empty(n, np.int64)
+    minutes = np.empty(n, np.float64)
+    project = np.empty(n, np.int32)
+    tag = np.empty(n, np.int16)
+    codes = {t: i for i, t in enumerate(dataset.TAGS)}
+    for i, (s, m, p, t) in enumerate(ds.iter_session_fields()):
+        start[i], minutes[i], project[i], tag[i] = s, m, p, codes[t]
+    names = {int(p): ds.project(int(p), notes=False)['name'] for p in np.unique(project) if p}
+    return Sessions(start, minutes, project, tag, project_names=names)
+
+
+def synthetic(n, days=365, projects=40, seed=0, now=None):
+    """n sessions with dataset.py's distributions, generated in NumPy for big benchmarks."""
+    rng = np.random.default_rng(seed)
+    now = int(now if now is not None else dataset.EPOCH.timestamp() + days * DAY)
+    start = now - days * DAY + rng.integers(0, days * DAY, n, dtype=np.int64)
+    roll = rng.integers(0, 10, n)
+    minutes = np.where(roll < 6, 25.0,
+                       np.where(roll < 8, np.round(1 + rng.random(n) * 24, 2), 30.0 + rng.integers(0, 91, n)))
+    project = np.where(rng.integers(0, 2, n) == 1, rng.integers(1, projects + 1, n), 0).astype(np.int32)
+    tag = rng.integers(0, len(dataset.TAGS), n).astype(np.int16)
+    return Sessions(start, minutes, project, tag, project_names={p: f'Project {p}' for p in range(1, projects + 1)})
+
+
+def _offset(tz, ts):
+    return int(datetime.datetime.fromtimestamp(ts, tz).utcoffset().total_seconds())
+
+
+def utc_offsets(tz, lo, hi):
+    """(transition times, offsets) for tz over [lo, hi]: offsets[i] applies from times[i] on."""
+    times, offsets = [lo], [_offset(tz, lo)]
+    t = lo
+    while t < hi:
+        nxt = min(t + DAY, hi)
+        if _offset(tz, nxt) != offsets[-1]:
+            a, b = t, nxt       # offset changes in (a, b]
+            while b - a > 1:
+                mid = (a + b) // 2
+                if _offset(tz, mid) == offsets[-1]:
+                    a = mid
+                else:
+                    b = mid
+            times.append(b)
+            offsets.append(_offset(tz, b))
+        t = nxt
+    return np.array(times, np.int64), np.array(offsets, np.int64)
+
+
+def local_days(start, tz=None):
+    """Days since 1970-01-01 of each timestamp, in tz's local calendar."""
+    if tz is None or not len(start):
+        return start // DAY
+    times, offsets = utc_offsets(tz, int(start.min()), int(start.max()))
+    idx = np.searchsorted(times, start, side='right') - 1
+    return (start + offsets[idx]) // DAY
+
+
+def _date(day):
+    return (UNIX_EPOCH + datetime.timedelta(days=int(day))).isoformat()
+
+
+def rollups(s, tz=None):
+    """Daily, weekly (Sunday-first), per-project and per-tag minute totals in one pass."""
+    days = local_days(s.start, tz)
+    first = int(days.min()) if len(days) else 0
+    daily = np.bincount(days - first, weights=s.minutes) if len(days) else np.zeros(0)
+    week0 = (first + SUNDAY_SHIFT) // 7
+    weekly = np.bincount((days + SUNDAY_SHIFT) // 7 - week0, weights=s.minutes) if len(days) else np.zeros(0)
+    by_project = np.bincount(s.project, weights=s.minutes)
+    # Project sessions are reported under "Project: <name>", the rest by tag.
+    free = s.project == 0
+    by_tag = np.bincount(s.tag[free], weights=s.minutes[free], minlength=len(s.tags))
+    return {'first_day': first, 'daily': daily, 'first_week_day': week0 * 7 - SUNDAY_SHIFT,
+            'weekly': weekly, 'by_project': by_project, 'by_tag': by_tag}
+
+
+def reports(s, tz=None, r=None):
+    """The /focus-sessions/reports/ payload, same shape as dataset.Dataset.reports()."""
+    if r is None:
+        r = rollups(s, tz)
+    by_project = {}
+    for pid in np.flatnonzero(r['by_project']):
+        if pid:
+            name = s.project_names.get(int(pid), f'Project {pid}')
+            by_project[name] = by_project.get(name, 0.0) + float(r['by_project'][pid])
+    by_tag = {s.tags[i]: float(v) for i, v in enumerate(r['by_tag']) if v}
+    for name, v in by_project.items():
+        by_tag[f'Project: {name}'] = by_tag.get(f'Project: {name}', 0.0) + v
+    nonzero = np.flatnonzero(r['daily'])
+    return {
+        'by_tag': [{'tag': k, 'total_minutes': round(v, 2)} for k, v in sorted(by_tag.items(), key=lambda kv: -kv[1])],
+        'by_project': [{'project__name': k, 'total_minutes': round(v, 2)}
+                       for k, v in sorted(by_project.items(), key=lambda kv: -kv[1])],
+        'daily_stats': [{'date': _date(r['first_day'] + i), 'total_minutes': round(float(r['daily'][i]), 2)}
+                        for i in nonzero],
+    }
+
+
+def weekly_stats(r):
+    return [{'week_start': _date(r['first_week_day'] + 7 * i), 'total_minutes': round(float(v), 2)}
+            for i, v in enumerate(r['weekly'])]
+
+
+def intensity(minutes):
+    """Heatmap.jsx getIntensity(): 0 for nothing, then one level per started hour, capped at 6."""
+    hours = np.asarray(minutes) / 60
+    return np.where(hours <= 0, 0, np.minimum(np.floor(hours).astype(np.int64) + 1, 6))
+
+
+def heatmap_grid(r, today):
+    """Heatmap.jsx's weeks: days today-370..today from the first Sunday, Sunday-first, last 53 weeks."""
+    end = (today - UNIX_EPOCH).days
+    start = end - (HEATMAP_DAYS - 1)
+    start += (3 - start) % 7       # first Sunday (1970-01-04, day 3, was one)
+    days = np.arange(start, end + 1)
+    idx = days - r['first_day']
+    valid = (idx >= 0) & (idx < len(r['daily']))
+    minutes = np.zeros(len(days))
+    minutes[valid] = r['daily'][idx[valid]]
+    weeks = [slice(i, i + 7) for i in range(0, len(days), 7)][-HEATMAP_WEEKS:]
+    first = weeks[0].start
+    levels = intensity(minutes)
+    return {
+        'first_date': _date(days[first]), 'last_date': _date(end),
+        'minutes': [[round(float(m), 2) for m in minutes[w]] for w in weeks],
+        'levels': [[int(v) for v in levels[w]] for w in weeks],
+    }
+
+
+def naive_rollups(s, tz=None, limit=None):
+    """Per-row reference: the loop a straightforward backend view would run."""
+    tz = tz or datetime.timezone.utc
+    daily, weekly, by_project, by_tag = {}, {}, {}, {}
+    n = len(s) if limit is None else min(limit, len(s))
+    start, minutes, project, tag = (s.start[:n].tolist(), s.minutes[:n].tolist(),
+                                    s.project[:n].tolist(), s.tag[:n].tolist())
+    for ts, m, p, t in zip(start, minutes, project, tag):
+        day = datetime.datetime.fromtimestamp(ts, tz).date()
+        daily[day] = daily.get(day, 0.0) + m
+        week = day - datetime.timedelta(days=(day.weekday() + 1) % 7)
+        weekly[week] = weekly.get(week, 0.0) + m
+        if p:
+            by_project[p] = by_project.get(p, 0.0) + m
+        else:
+            by_tag[t] = by_tag.get(t, 0.0) + m
+    return daily, weekly, by_project, by_tag
+
+
+def _agrees(s, tz, naive, limit):
+    sub = Sessions(s.start[:limit], s.minutes[:limit], s.project[:limit], s.tag[:limit], s.tags, s.project_names)
+    r = rollups(sub, tz)
+    daily, weekly, by_project, by_tag = naive
+    checks = [
+        ({(UNIX_EPOCH + datetime.timedelta(days=r['first_day'] + int(i))): r['daily'][i]
+          for i in np.flatnonzero(r['daily'])}, daily),
+        ({(UNIX_EPOCH + datetime.timedelta(days=r['first_week_day'] + 7 * int(i))): r['weekly'][i]
+          for i in np.flatnonzero(r['weekly'])}, weekly),
+        ({int(i): r['by_project'][i] for i in np.flatnonzero(r['by_project']) if i}, by_project),
+        ({int(i): r['by_tag'][i] for i in np.flatnonzero(r['by_tag'])}, by_tag),
+    ]
+    return all(a.keys() == b.keys() and all(abs(a[k] - b[k]) < 1e-6 * max(1.0, abs(b[k])) for k in b)
+               for a, b in checks)
+
+
+def bench(args, tz):
+    started = time.perf_counter()
+    s = synthetic(args.bench, days=args.days, seed=args.seed)
+    print(f'generated {len(s):,} sessions in {time.perf_counter() - started:.2f} s')
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        r = rollups(s, tz)
+        reports(s, tz, r)
+        heatmap_grid(r, UNIX_EPOCH + datetime.timedelta(days=int(local_days(s.start.max(keepdims=True), tz)[0])))
+        timings.append(time.perf_counter() - started)
+    vec = min(timings)
+    print(f'vectorized: {vec:.3f} s ({len(s) / vec / 1e6:,.1f} M sessions/s, best of {args.repeat})')
+
+    limit = min(len(s), args.naive_limit) if args.naive_limit else len(s)
+    started = time.perf_counter()
+    naive = naive_rollups(s, tz, limit)
+    naive_s = time.perf_counter() - started
+    full = naive_s * len(s) / limit
+    note = '' if limit == len(s) else f' (extrapolated from {limit:,} rows)'
+    print(f'naive loop: {full:.2f} s{note} ({limit / naive_s / 1e6:,.2f} M sessions/s)')
+    print(f'speedup: {full / vec:,.0f}x; results agree: {_agrees(s, tz, naive, limit)}')
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    dataset.add_arguments(parser)
+    parser.add_argument('--tz', help='IANA time zone for day buckets (default UTC)')
+    parser.add_argument('--grid', action='store_true', help='print the 53-week heatmap grid')
+    parser.add_argument('--weekly', action='store_true', help='print weekly totals')
+    parser.add_argument('--check', action='store_true', help="compare with dataset.py's reports() (UTC)")
+    parser.add_argument('--bench', type=int, metavar='N', help='benchmark on N synthetic sessions')
+    parser.add_argument('--naive-limit', type=int, default=1_000_000,
+                        help='rows the naive loop runs on in --bench (0 = all)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+    tz = ZoneInfo(args.tz) if args.tz else None
+
+    if args.bench:
+        return bench(args, tz)
+
+    ds = dataset.from_args(args)
+    s = from_dataset(ds)
+    r = rollups(s, tz)
+    if args.check:
+        expected = ds.reports()
+        got = reports(s, None)
+        same = all({json.dumps(x, sort_keys=True) for x in got[k]} == {json.dumps(x, sort_keys=True) for x in expected[k]}
+                   for k in expected)
+        print('matches dataset.reports()' if same else 'MISMATCH with dataset.reports()')
+        return 0 if same else 1
+    if args.grid:
+        today = UNIX_EPOCH + datetime.timedelta(days=int(local_days(np.array([ds.now]), tz)[0]))
+        out = heatmap_grid(r, today)
+    elif args.weekly:
+        out = weekly_stats(r)
+    else:
+        out = reports(s, tz, r)
+    print(json.dumps(out, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
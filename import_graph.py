@@ -0,0 +1,475 @@
+"""Static import graph of src/ with per-route weight and lazy-load candidates.
+
+Walks ES imports (static, re-exports and `import()`) from src/main.jsx with
+jsx_index's tokenizer, resolving relative paths the way Vite does and bare
+specifiers through node_modules.  When node_modules is not installed the
+packages come from package-lock.json instead: each package is one node whose
+edges are its locked dependencies and peers, weighted from a sizes file that
+an earlier run with node_modules recorded (--record-sizes).  Unsized
+packages count as 0 bytes and are listed.
+
+Reports the first-load weight, the weight of every route imported by
+src/App.jsx, and ranks cut points: modules or packages that, imported
+lazily everywhere they are imported statically, take the most bytes out of
+first load.  --check compares against a stored baseline and fails on growth
+-- in bytes, or in the set of packages first load and each route pull in.
+Without sizes for every first-load package the byte figures understate the
+bundle, so cut points are ranked by packages moved first and --check fails
+unless --allow-unsized is given.
+
+    python import_graph.py
+    python import_graph.py --record-sizes import-sizes.json    # with node_modules installed
+    python import_graph.py --update-baseline
+    python import_graph.py --check --tolerance 0.02
+"""
+import argparse
+import json
+import os
+import sys
+
+import jsx_index
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+EXTENSIONS = ('', '.jsx', '.js', '.mjs', '.tsx', '.ts', '.json')
+SCRIPT_EXTENSIONS = ('.jsx', '.js', '.mjs', '.cjs', '.tsx', '.ts')
+CONDITIONS = ('browser', 'import', 'module', 'default')
+
+
+def find_imports(text):
+    """[(specifier, dynamic)] for the import statements, re-exports and import() calls in text."""
+    tokens, _ = jsx_index.tokenize(text)
+    out = []
+    n = len(tokens)
+
+    def string_at(i):
+        return tokens[i].value[1:-1] if i < n and tokens[i].kind == 'string' else None
+
+    for i, t in enumerate(tokens):
+        if t.kind != 'name' or t.value not in ('import', 'export'):
+            continue
+        nxt = tokens[i + 1] if i + 1 < n else None
+        if nxt is None:
+            break
+        if t.value == 'import' and nxt.value == '(':
+            spec = string_at(i + 2)
+            if spec is not None and i + 3 < n and tokens[i + 3].value == ')':
+                out.append((spec, True))
+            continue
+        if t.depth:
+            continue
+        if t.value == 'import' and nxt.kind == 'string':
+            out.append((nxt.value[1:-1], False))
+            continue
+        if t.value == 'export' and nxt.value not in ('*', '{'):
+            continue
+        if t.value == 'import' and nxt.value == '.':
+            continue        # import.meta
+        # Scan to `from '<spec>'`, stopping at the end of the statement.
+        for j in range(i + 1, min(n, i + 400)):
+            tok = tokens[j]
+            if tok.kind == 'name' and tok.value == 'from' and string_at(j + 1) is not None:
+                out.append((string_at(j + 1), False))
+                break
+            if tok.value == ';' or (tok.kind == 'name' and tok.value in ('import', 'export') and j > i + 1):
+                break
+    return out
+
+
+def package_name(spec):
+    parts = spec.split('/')
+    return '/'.join(parts[:2]) if spec.startswith('@') else parts[0]
+
+
+def package_of(node):
+    """'node_modules/@tiptap/pm/dist/state.js' -> '@tiptap/pm'; None for app code."""
+    if 'node_modules/' not in node:
+        return None
+    return package_name(node.rsplit('node_modules/', 1)[1])
+
+
+def package_dir(node):
+    """'node_modules/a/node_modules/b/lib.js' -> 'node_modules/a/node_modules/b' (its lock key)."""
+    head, tail = node.rsplit('node_modules/', 1)
+    return head + 'node_modules/' + package_name(tail)
+
+
+def _first_file(base):
+    for ext in EXTENSIONS:
+        if os.path.isfile(base + ext):
+            return base + ext
+    for ext in SCRIPT_EXTENSIONS:
+        candidate = os.path.join(base, 'index' + ext)
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def _export_target(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        for cond in CONDITIONS:
+            if cond in value:
+                found = _export_target(value[cond])
+                if found:
+                    return found
+    if isinstance(value, list):
+        for item in value:
+            found = _export_target(item)
+            if found:
+                return found
+    return None
+
+
+class ImportGraph:
+    def __init__(self, root=ROOT, sizes=None):
+        self.root = root
+        self.sizes = sizes or {}
+        self.weight = {}        # node -> bytes
+        self.edges = {}         # node -> [(target, dynamic)]
+        self.unresolved = {}    # specifier -> importers
+        self.unsized = set()
+        self.have_node_modules = os.path.isdir(os.path.join(root, 'node_modules'))
+        lock_path = os.path.join(root, 'package-lock.json')
+        self.lock = {}
+        if os.path.exists(lock_path):
+            with open(lock_path, encoding='utf-8') as f:
+                self.lock = json.load(f).get('packages', {})
+
+    # -- resolution --------------------------------------------------------
+
+    def rel(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, '/')
+
+    def resolve(self, spec, importer):
+        spec = spec.split('?', 1)[0]
+        if spec.startswith(('.', '/')):
+            base = os.path.join(self.root, spec.lstrip('/')) if spec.startswith('/') else \
+                os.path.join(os.path.dirname(os.path.join(self.root, importer)), spec)
+            found = _first_file(os.path.normpath(base))
+            return self.rel(found) if found else None
+        name = package_name(spec)
+        if self.have_node_modules:
+            return self._resolve_installed(name, spec[len(name):].lstrip('/'), importer)
+        return self._lock_key(name, importer)
+
+    def _lock_key(self, name, importer):
+        """Lock entry for `name` as seen from importer (nested node_modules first)."""
+        owner = package_dir(importer) if 'node_modules/' in importer else ''
+        while owner:
+            key = f'{owner}/node_modules/{name}'
+            if key in self.lock:
+                return key
+            owner = owner.rsplit('/node_modules/', 1)[0] if '/node_modules/' in owner else ''
+        key = f'node_modules/{name}'
+        return key if key in self.lock else None
+
+    def _resolve_installed(self, name, subpath, importer):
+        directory = os.path.dirname(os.path.join(self.root, importer))
+        pkg_dir = None
+        while True:
+            candidate = os.path.join(directory, 'node_modules', name)
+            if os.path.isdir(candidate):
+                pkg_dir = candidate
+                break
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                return None
+            directory = parent
+        meta = {}
+        if os.path.exists(os.path.join(pkg_dir, 'package.json')):
+            with open(os.path.join(pkg_dir, 'package.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        exports = meta.get('exports')
+        key = './' + subpath if subpath else '.'
+        target = None
+        if isinstance(exports, dict) and any(k.startswith('.') for k in exports):
+            target = _export_target(exports.get(key))
+        elif exports is not None and not subpath:
+            target = _export_target(exports)
+        if target is None and not subpath:
+            browser = meta.get('browser')
+            target = meta.get('module') or (browser if isinstance(browser, str) else None) or meta.get('main')
+        found = _first_file(os.path.normpath(os.path.join(pkg_dir, target or subpath or 'index')))
+        return self.rel(found) if found else None
+
+    # -- building ----------------------------------------------------------
+
+    def build(self, entry):
+        queue = [entry]
+        while queue:
+            node = queue.pop()
+            if node in self.edges:
+                continue
+            self.edges[node] = targets = []
+            if node in self.lock and not self.have_node_modules:
+                self._add_package(node, targets)
+            else:
+                path = os.path.join(self.root, node)
+                with open(path, 'rb') as f:
+                    data = f.read()
+                self.weight[node] = len(data)
+                if node.endswith(SCRIPT_EXTENSIONS):
+                    for spec, dynamic in find_imports(data.decode('utf-8', 'replace')):
+                        target = self.resolve(spec, node)
+                        if target is None:
+                            self.unresolved.setdefault(spec, []).append(node)
+                            continue
+                        targets.append((target, dynamic))
+            queue.extend(t for t, _ in targets if t not in self.edges)
+        return self
+
+    def _add_package(self, key, targets):
+        name = package_of(key)
+        meta = self.lock[key]
+        size = self.sizes.get(key, self.sizes.get(name))
+        if size is not None:
+            self.weight[key] = size
+        else:
+            self.weight[key] = 0
+            self.unsized.add(name)
+        deps = dict(meta.get('dependencies') or {})
+        optional_peers = {k for k, v in (meta.get('peerDependenciesMeta') or {}).items() if v.get('optional')}
+        deps.update({k: v for k, v in (meta.get('peerDependencies') or {}).items() if k not in optional_peers})
+        for dep in deps:
+            if dep.startswith('@types/'):
+                continue        # type declarations never reach the bundle
+            target = self._lock_key(dep, key + '/package.json')
+            if target is not None:
+                targets.append((target, False))
+
+    # -- queries -----------------------------------------------------------
+
+    def reach(self, start, dynamic=False, cut=frozenset()):
+        """Nodes reachable from start; static edges into `cut` are not followed."""
+        seen = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for target, is_dynamic in self.edges.get(node, ()):
+                if target in seen or (is_dynamic and not dynamic) or (target in cut and not is_dynamic):
+                    continue
+                seen.add(target)
+                stack.append(target)
+        return seen
+
+    def bytes(self, nodes):
+        return sum(self.weight.get(n, 0) for n in nodes)
+
+    def importers(self, node):
+        return sorted({src for src, targets in self.edges.items() for t, dyn in targets if t == node and not dyn})
+
+    def package_sizes(self, nodes):
+        out = {}
+        for node in nodes:
+            name = package_of(node)
+            if name:
+                out[name] = out.get(name, 0) + self.weight.get(node, 0)
+        return out
+
+
+def analyze(graph, entry, shell, top=10):
+    initial = graph.reach(entry)
+    initial_bytes = graph.bytes(initial)
+    app_bytes = graph.bytes(n for n in initial if package_of(n) is None)
+
+    routes = {}
+    for target, dynamic in graph.edges.get(shell, ()):
+        if package_of(target) is not None:
+            continue
+        total = graph.reach(target, dynamic=True)
+        remaining = graph.reach(entry, cut=frozenset([target]))
+        routes[target] = {'bytes': graph.bytes(total), 'saved_if_lazy': initial_bytes - graph.bytes(remaining),
+                          'lazy': dynamic, 'packages': sorted(graph.package_sizes(total))}
+
+    # A cut point: something imported statically from app code, made lazy everywhere.
+    candidates = {t for src in initial if package_of(src) is None
+                  for t, dyn in graph.edges.get(src, ()) if not dyn and t != shell
+                  and (package_of(t) is not None or t.endswith(SCRIPT_EXTENSIONS))}
+    cuts = []
+    for node in candidates:
+        remaining = graph.reach(entry, cut=frozenset([node]))
+        saved = initial_bytes - graph.bytes(remaining)
+        if saved > 0:
+            moved = initial - remaining
+            packages = sorted(graph.package_sizes(moved).items(), key=lambda kv: -kv[1])
+            cuts.append({'module': node, 'saved': saved, 'share': saved / initial_bytes if initial_bytes else 0.0,
+                         'importers': [i for i in graph.importers(node) if package_of(i) is None],
+                         'packages': [name for name, _ in packages],
+                         'unsized': sum(1 for name, _ in packages if name in graph.unsized)})
+    unsized = sorted(graph.unsized & {package_of(n) for n in initial})
+    # Zero-byte packages would sink the cuts that move them, so while sizes
+    # are missing the number of packages moved ranks first.
+    cuts.sort(key=(lambda c: (-len(c['packages']), -c['saved'])) if unsized else (lambda c: -c['saved']))
+
+    chunks = {}
+    for src in graph.reach(entry, dynamic=True):
+        for target, dynamic in graph.edges.get(src, ()):
+            if dynamic and target not in initial:
+                chunks[target] = graph.bytes(graph.reach(target) - initial)
+
+    declared = set()
+    root_meta = graph.lock.get('', {})
+    declared.update(root_meta.get('dependencies') or {})
+    reached = {package_of(n) for n in graph.reach(entry, dynamic=True)} - {None}
+    return {
+        'entry': entry, 'shell': shell,
+        'initial_bytes': initial_bytes, 'app_bytes': app_bytes, 'package_bytes': initial_bytes - app_bytes,
+        'modules': sum(1 for n in initial if package_of(n) is None),
+        'packages': sorted(graph.package_sizes(initial)),
+        'routes': routes, 'cut_points': cuts[:top] if top else cuts, 'lazy_chunks': chunks,
+        'unsized': unsized,
+        'unresolved': sorted(graph.unresolved),
+        'unused_dependencies': sorted(declared - reached),
+    }
+
+
+def kib(n):
+    return f'{n / 1024:,.1f} KiB'
+
+
+def format_report(r):
+    lines = [f"{r['entry']}: first load {kib(r['initial_bytes'])} "
+             f"({kib(r['app_bytes'])} app code in {r['modules']} modules, "
+             f"{kib(r['package_bytes'])} in {len(r['packages'])} packages)"]
+    if r['unsized']:
+        lines.append(f"  WARNING: {len(r['unsized'])} first-load package(s) have no recorded size and count as 0 bytes, "
+                     f"so package weight is missing from every figure below; run --record-sizes where node_modules "
+                     f"is installed.  Unsized: "
+                     + ', '.join(r['unsized'][:12]) + (' ...' if len(r['unsized']) > 12 else ''))
+    if r['unused_dependencies']:
+        lines.append('  dependencies never imported from the entry: ' + ', '.join(r['unused_dependencies']))
+    if r['unresolved']:
+        lines.append('  unresolved imports: ' + ', '.join(r['unresolved']))
+    lines.append('')
+    lines.append(f"routes imported by {r['shell']}:")
+    lines.append(f"  {'module':<40} {'total':>12} {'saved if lazy':>14}")
+    for name, route in sorted(r['routes'].items(), key=lambda kv: -kv[1]['saved_if_lazy']):
+        lines.append(f"  {name:<40} {kib(route['bytes']):>12} {kib(route['saved_if_lazy']):>14}"
+                     + ('  (already lazy)' if route['lazy'] else ''))
+    lines.append('')
+    lines.append('best lazy-load cut points' + (' (by packages moved, then bytes):' if r['unsized'] else ':'))
+    for i, cut in enumerate(r['cut_points'], 1):
+        via = ', '.join(cut['importers']) or '-'
+        pkgs = ', '.join(cut['packages'][:6]) + (' ...' if len(cut['packages']) > 6 else '')
+        unsized = f" + {cut['unsized']} unsized" if cut['unsized'] else ''
+        lines.append(f"  {i:>2}. {cut['module']:<40} -{kib(cut['saved']):>11}{unsized} ({cut['share']:.0%})  from {via}"
+                     + (f"\n      moves {len(cut['packages'])} packages: {pkgs}" if pkgs else ''))
+    if r['lazy_chunks']:
+        lines.append('')
+        lines.append('lazy chunks:')
+        for name, size in sorted(r['lazy_chunks'].items(), key=lambda kv: -kv[1]):
+            lines.append(f'  {name:<40} {kib(size):>12}')
+    return '\n'.join(lines)
+
+
+def baseline_of(report):
+    return {'initial_bytes': report['initial_bytes'],
+            'routes': {name: route['bytes'] for name, route in report['routes'].items()},
+            'packages': report['packages'],
+            'route_packages': {name: route['packages'] for name, route in report['routes'].items()},
+            'unsized': report['unsized']}
+
+
+def check(report, baseline, tolerance, allow_unsized=False):
+    """Lines describing growth beyond tolerance; empty when within budget."""
+    failures = []
+    current = baseline_of(report)
+    if report['unsized'] and not allow_unsized:
+        failures.append(f"{len(report['unsized'])} first-load package(s) are unsized, so byte growth in them "
+                        f"cannot be seen (record sizes or pass --allow-unsized)")
+
+    def added(label, now, before):
+        new = sorted(set(now) - set(before))
+        if new:
+            failures.append(f"{label} now pulls in {len(new)} more package(s): " + ', '.join(new[:8])
+                            + (' ...' if len(new) > 8 else ''))
+
+    if 'packages' in baseline:
+        added('first load', current['packages'], baseline['packages'])
+        for name, packages in current['route_packages'].items():
+            if name in baseline.get('route_packages', {}):
+                added(name, packages, baseline['route_packages'][name])
+
+    def grew(label, now, before):
+        if before and now > before * (1 + tolerance):
+            failures.append(f'{label}: {kib(before)} -> {kib(now)} (+{(now - before) / before:.1%})')
+
+    grew('first load', current['initial_bytes'], baseline.get('initial_bytes', 0))
+    for name, size in current['routes'].items():
+        grew(name, size, baseline.get('routes', {}).get(name, 0))
+    return failures
+
+
+def record_sizes(graph, entry):
+    if not graph.have_node_modules:
+        raise SystemExit('--record-sizes needs node_modules (run npm ci first)')
+    sizes = {}
+    for node in graph.reach(entry, dynamic=True):
+        if package_of(node):
+            key = package_dir(node)
+            sizes[key] = sizes.get(key, 0) + graph.weight.get(node, 0)
+    return dict(sorted(sizes.items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--root', default=ROOT)
+    parser.add_argument('--entry', default='src/main.jsx')
+    parser.add_argument('--shell', default='src/App.jsx', help='module whose imports are the routes')
+    parser.add_argument('--sizes', default='import-sizes.json', help='package sizes (bytes) for lock-only runs')
+    parser.add_argument('--record-sizes', metavar='FILE', help='measure package sizes from node_modules into FILE')
+    parser.add_argument('--baseline', default='import-baseline.json')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--check', action='store_true', help='exit 1 if weights grew beyond --tolerance')
+    parser.add_argument('--tolerance', type=float, default=0.02)
+    parser.add_argument('--allow-unsized', action='store_true',
+                        help='let --check pass although some first-load packages have no size')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--json', help='write the full report here')
+    args = parser.parse_args(argv)
+
+    def at_root(path):
+        return path if os.path.isabs(path) else os.path.join(args.root, path)
+
+    sizes = {}
+    if os.path.exists(at_root(args.sizes)):
+        with open(at_root(args.sizes), encoding='utf-8') as f:
+            sizes = json.load(f)
+    graph = ImportGraph(args.root, sizes).build(args.entry)
+
+    if args.record_sizes:
+        with open(at_root(args.record_sizes), 'w', encoding='utf-8') as f:
+            json.dump(record_sizes(graph, args.entry), f, indent=2)
+            f.write('\n')
+    report = analyze(graph, args.entry, args.shell, args.top)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(at_root(args.baseline), 'w', encoding='utf-8') as f:
+            json.dump(baseline_of(report), f, indent=2)
+            f.write('\n')
+        print(f'\nbaseline written to {args.baseline}')
+        if report['unsized']:
+            print(f"WARNING: {len(report['unsized'])} package(s) in it are unsized; only their presence is checked",
+                  file=sys.stderr)
+    elif args.check:
+        if not os.path.exists(at_root(args.baseline)):
+            print(f'\nno baseline at {args.baseline}; run with --update-baseline first', file=sys.stderr)
+            return 1
+        with open(at_root(args.baseline), encoding='utf-8') as f:
+            failures = check(report, json.load(f), args.tolerance, args.allow_unsized)
+        print()
+        if failures:
+            print(f'bundle check failed (tolerance {args.tolerance:.0%}):')
+            print('\n'.join('  ' + line for line in failures))
+            return 1
+        print(f'within {args.tolerance:.0%} of the baseline')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,373 @@
+"""Incremental JSON inspector: pull selected subtrees out of a response stream.
+
+The body is scanned chunk by chunk; only the subtrees matching the selector
+are materialized, everything else is skipped, so memory stays flat however
+large the payload is.  Once a selector with no wildcards has matched, the
+scan stops and the connection can be dropped.
+
+Selectors are a JSONPath subset: `$`, `.name`, `['name']`, `[3]`, `[*]`, `.*`.
+
+    python json_stream.py '$[0].projects[0]' --path /communities/
+    python json_stream.py '$[*].projects[*].name' --path /communities/ --lines
+    python json_stream.py '$[0].members' --file communities.json
+"""
+import argparse
+import asyncio
+import codecs
+import json
+import re
+import sys
+
+STEP_RE = re.compile(r"""\.(?P<name>\*|[A-Za-z_$][\w$-]*)|\[(?:(?P<index>\d+)|(?P<star>\*)|'(?P<sq>[^']*)'|"(?P<dq>[^"]*)")\]""")
+WS_RE = re.compile(r'[ \t\r\n]*')
+STRING_RUN_RE = re.compile(r'[^"\\]*')
+SCALAR_RE = re.compile(r'[^{}\[\],:"\s]*')
+ANY = object()
+
+
+class SelectorError(ValueError):
+    pass
+
+
+def parse_selector(selector):
+    """'$[0].projects[*]' -> [0, 'projects', ANY]"""
+    selector = selector.strip()
+    if not selector.startswith('$'):
+        raise SelectorError(f'selector must start with $: {selector!r}')
+    steps = []
+    pos = 1
+    while pos < len(selector):
+        m = STEP_RE.match(selector, pos)
+        if not m:
+            raise SelectorError(f'cannot parse selector at {selector[pos:]!r}')
+        if m.group('index') is not None:
+            steps.append(int(m.group('index')))
+        elif m.group('star') or m.group('name') == '*':
+            steps.append(ANY)
+        else:
+            steps.append(next(g for g in (m.group('name'), m.group('sq'), m.group('dq')) if g is not None))
+        pos = m.end()
+    return steps
+
+
+def format_path(components):
+    out = ['$']
+    for c in components:
+        if isinstance(c, int):
+            out.append(f'[{c}]')
+        elif re.fullmatch(r'[A-Za-z_$][\w$]*', c):
+            out.append(f'.{c}')
+        else:
+            out.append(f'[{json.dumps(c)}]')
+    return ''.join(out)
+
+
+class _Frame:
+    __slots__ = ('kind', 'index', 'key', 'matched', 'concrete', 'state')
+
+    def __init__(self, kind, matched, concrete):
+        self.kind = kind
+        self.index = 0
+        self.key = None
+        self.matched = matched
+        self.concrete = concrete
+        self.state = 'key' if kind == 'obj' else 'value'
+
+
+class StreamSelector:
+    """Push parser: feed() text or bytes, get back (path, value) matches."""
+
+    def __init__(self, selector):
+        self.steps = parse_selector(selector)
+        self.stack = []
+        self.root_seen = False
+        self.done = False
+        self.bytes_in = 0
+        self.matches = 0
+        self.max_capture = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        self._in_scalar = False
+        self._key_parts = None
+        self._capture = None        # list of text pieces
+        self._capture_from = 0      # start offset within the current chunk
+        self._capture_depth = 0
+        self._capture_path = None
+        self._capture_size = 0
+
+    # -- path bookkeeping ---------------------------------------------------
+
+    def _child_component(self):
+        top = self.stack[-1]
+        return top.index if top.kind == 'arr' else top.key
+
+    def _step_matches(self, depth, component):
+        step = self.steps[depth]
+        return step is ANY or step == component
+
+    def _value_start(self, pos):
+        """A value begins at pos; returns (matched, concrete) for it."""
+        if self._capture is not None:
+            return False, False
+        depth = len(self.stack)
+        if depth == 0:
+            matched, concrete = True, True
+        else:
+            parent = self.stack[-1]
+            component = self._child_component()
+            if not parent.matched or depth > len(self.steps):
+                return False, False
+            step = self.steps[depth - 1]
+            if parent.concrete and isinstance(step, int) and isinstance(component, int) and component > step:
+                # Past the only index that could match under a concrete path.
+                self.done = True
+                return False, False
+            matched = self._step_matches(depth - 1, component)
+            concrete = parent.concrete and step is not ANY
+        if matched and depth == len(self.steps):
+            self._capture = []
+            self._capture_from = pos
+            self._capture_depth = depth
+            self._capture_size = 0
+            self._capture_path = [self._component_at(d) for d in range(depth)]
+            self._capture_concrete = concrete
+        return matched, concrete
+
+    def _component_at(self, d):
+        f = self.stack[d]
+        return f.index if f.kind == 'arr' else f.key
+
+    def _value_done(self, text, pos, out):
+        if self._capture is not None and len(self.stack) == self._capture_depth:
+            self._capture.append(text[self._capture_from:pos])
+            raw = ''.join(self._capture)
+            self._capture_size += pos - self._capture_from
+            self.max_capture = max(self.max_capture, self._capture_size)
+            self._capture = None
+            self.matches += 1
+            out.append((format_path(self._capture_path), json.loads(raw)))
+            if self._capture_concrete:
+                self.done = True
+        if self.stack:
+            self.stack[-1].state = 'comma'
+        else:
+            self.root_seen = True
+
+    # -- scanning -----------------------------------------------------------
+
+    def feed(self, data):
+        """Consume the next chunk; returns the matches completed in it."""
+        out = []
+        if self.done:
+            return out
+        if isinstance(data, bytes):
+            self.bytes_in += len(data)
+            text = self._decoder.decode(data)
+        else:
+            self.bytes_in += len(data.encode('utf-8'))
+            text = data
+        self._scan(text, out)
+        if self._capture is not None:
+            piece = text[self._capture_from:]
+            self._capture.append(piece)
+            self._capture_size += len(piece)
+            self.max_capture = max(self.max_capture, self._capture_size)
+            self._capture_from = 0
+        return out
+
+    def close(self):
+        """Flush a trailing top-level scalar; returns any final matches."""
+        out = []
+        if self._in_scalar and not self.done:
+            self._in_scalar = False
+            self._value_done('', 0, out)
+        return out
+
+    def _scan(self, text, out):
+        n = len(text)
+        i = 0
+        stack = self.stack
+        while i < n and not self.done:
+            if self._in_string:
+                if self._escape:
+                    if self._key_parts is not None:
+                        self._key_parts.append(text[i])
+                    self._escape = False
+                    i += 1
+                    continue
+                j = STRING_RUN_RE.match(text, i).end()
+                if self._key_parts is not None:
+                    self._key_parts.append(text[i:j])
+                i = j
+                if i >= n:
+                    break
+                if text[i] == '\\':
+                    if self._key_parts is not None:
+                        self._key_parts.append('\\')
+                    self._escape = True
+                    i += 1
+                    continue
+                # closing quote
+                i += 1
+                self._in_string = False
+                if self._string_is_key:
+                    top = stack[-1]
+                    if self._key_parts is not None:
+                        top.key = json.loads('"' + ''.join(self._key_parts) + '"')
+                        self._key_parts = None
+                    else:
+                        top.key = None
+                    top.state = 'colon'
+                else:
+                    self._value_done(text, i, out)
+                continue
+
+            if self._in_scalar:
+                j = SCALAR_RE.match(text, i).end()
+                if j >= n:
+                    break
+                self._in_scalar = False
+                self._value_done(text, j, out)
+                i = j
+                continue
+
+            i = WS_RE.match(text, i).end()
+            if i >= n:
+                break
+            c = text[i]
+            if c == '{' or c == '[':
+                matched, concrete = self._value_start(i)
+                stack.append(_Frame('obj' if c == '{' else 'arr', matched, concrete))
+                i += 1
+            elif c == '}' or c == ']':
+                frame = stack.pop()
+                i += 1
+                if frame.concrete and frame.matched and self._capture is None:
+                    # Nothing below a concrete path can match once it closes.
+                    self.done = True
+                self._value_done(text, i, out)
+            elif c == ',':
+                top = stack[-1]
+                if top.kind == 'arr':
+                    top.index += 1
+                    top.state = 'value'
+                else:
+                    top.state = 'key'
+                i += 1
+            elif c == ':':
+                stack[-1].state = 'value'
+                i += 1
+            elif c == '"':
+                top = stack[-1] if stack else None
+                self._in_string = True
+                if top is not None and top.kind == 'obj' and top.state == 'key':
+                    self._string_is_key = True
+                    # Keys only matter while the path can still match.
+                    wanted = top.matched and len(stack) <= len(self.steps) and self._capture is None
+                    self._key_parts = [] if wanted else None
+                else:
+                    self._string_is_key = False
+                    self._key_parts = None
+                    self._value_start(i)
+                i += 1
+            else:
+                self._value_start(i)
+                j = SCALAR_RE.match(text, i).end()
+                if j >= n:
+                    self._in_scalar = True
+                    i = j
+                    break
+                self._value_done(text, j, out)
+                i = j
+
+
+def select(chunks, selector):
+    """Yield (path, value) for each match in an iterable of bytes/str chunks."""
+    parser = StreamSelector(selector)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+    yield from parser.close()
+
+
+async def aselect(chunks, selector, parser=None):
+    """Async version of select() over an async iterable of chunks."""
+    parser = parser or StreamSelector(selector)
+    async for chunk in chunks:
+        for match in parser.feed(chunk):
+            yield match
+        if parser.done:
+            return
+    for match in parser.close():
+        yield match
+
+
+async def inspect_url(args):
+    from api_client import Client
+
+    parser = StreamSelector(args.selector)
+    async with Client(args.base_url) as client:
+        if args.token:
+            client.token = args.token
+        else:
+            await client.login(args.username, args.password)
+        async with client.stream('GET', args.path) as resp:
+            if not resp.ok:
+                body = await resp.read()
+                print(f'{resp.status} {resp.reason}: {body[:200]!r}', file=sys.stderr)
+                return parser, 1
+            async for path, value in aselect(resp.iter_chunks(), args.selector, parser):
+                emit(path, value, args)
+    return parser, 0
+
+
+def emit(path, value, args):
+    if args.lines:
+        print(json.dumps({'path': path, 'value': value}, ensure_ascii=False))
+    else:
+        print(f'# {path}')
+        print(json.dumps(value, indent=2, ensure_ascii=False))
+    sys.stdout.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('selector', help="e.g. '$[0].projects[0]'")
+    parser.add_argument('--file', help='read from a file instead of the API (- for stdin)')
+    parser.add_argument('--path', default='/communities/', help='API path to GET')
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000/api')
+    parser.add_argument('--username', default='volcan')
+    parser.add_argument('--password', default='123')
+    parser.add_argument('--token', help='skip login and use this token')
+    parser.add_argument('--lines', action='store_true', help='one JSON object per match')
+    args = parser.parse_args(argv)
+
+    try:
+        parse_selector(args.selector)
+    except SelectorError as e:
+        parser.error(str(e))
+
+    if args.file:
+        sel = StreamSelector(args.selector)
+        f = sys.stdin.buffer if args.file == '-' else open(args.file, 'rb')
+        with f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                for path, value in sel.feed(chunk):
+                    emit(path, value, args)
+                if sel.done:
+                    break
+            for path, value in sel.close():
+                emit(path, value, args)
+        status = 0
+    else:
+        sel, status = asyncio.run(inspect_url(args))
+    print(f'{sel.matches} match(es), read {sel.bytes_in} bytes, largest match {sel.max_capture} chars'
+          + (', stopped early' if sel.done and not sel.root_seen else ''), file=sys.stderr)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,780 @@
+"""Structural index of a JSX/JS file for codemods.
+
+Instead of locating edit sites with full-text find()/split(), rules look them
+up here: component declarations, their props destructuring, useState hooks,
+JSX elements and comment anchors, all with character offsets.  Indexes are
+cached on disk by mtime/size/hash and updated incrementally after each edit
+by re-tokenizing only the top-level declarations the edit touched.
+
+    python jsx_index.py src/pages/CommunityView.jsx
+    python jsx_index.py src/pages/CommunityView.jsx --lift tab ProjectDetail CommunityView --dry-run
+"""
+import argparse
+import bisect
+import difflib
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(ROOT, '.jsx-index-cache')
+INDEX_VERSION = 2
+
+Token = namedtuple('Token', 'kind value start end depth')
+
+# Identifiers may use any Unicode letter, as the tokenizer's isalpha() test does.
+NAME_RE = re.compile(r'(?:[^\W\d]|\$)[\w$]*')
+NUMBER_RE = re.compile(r'(?:\d[\w.]*|\.\d\w*)')
+JSX_NAME_RE = re.compile(r'[A-Za-z_$][\w$.:-]*')
+JSX_CLOSE_RE = re.compile(r'</\s*([\w$.:-]*)\s*>')
+JSX_COMMENT_RE = re.compile(r'\{\s*/\*(.*?)\*/\s*\}', re.S)
+SPACE_RE = re.compile(r'\s+')
+PUNCTUATORS = sorted((
+    '>>>=', '...', '===', '!==', '**=', '<<=', '>>=', '>>>', '&&=', '||=', '??=',
+    '=>', '==', '!=', '<=', '>=', '&&', '||', '??', '?.', '++', '--', '+=', '-=',
+    '*=', '/=', '%=', '&=', '|=', '^=', '**', '<<', '>>',
+), key=len, reverse=True)
+# After these keywords an expression starts, so `/` is a regex and `<` is JSX.
+EXPRESSION_KEYWORDS = {
+    'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete',
+    'void', 'throw', 'yield', 'await', 'instanceof', 'default',
+}
+DECLARATION_KEYWORDS = {'const', 'let', 'var', 'function', 'export', 'import', 'class'}
+OPENERS = {'(': ')', '[': ']', '{': '}'}
+
+
+def _expression_allowed(prev):
+    if prev is None:
+        return True
+    if prev.kind == 'punct':
+        return prev.value not in (')', ']', '}')
+    return prev.kind == 'name' and prev.value in EXPRESSION_KEYWORDS
+
+
+def _scan_quoted(text, pos, end, escapes=True):
+    quote = text[pos]
+    pos += 1
+    while pos < end:
+        ch = text[pos]
+        if ch == '\\' and escapes:
+            pos += 2
+            continue
+        pos += 1
+        if ch == quote:
+            break
+    return pos
+
+
+def _scan_regex(text, pos, end):
+    pos += 1
+    in_class = False
+    while pos < end:
+        ch = text[pos]
+        if ch == '\\':
+            pos += 2
+            continue
+        pos += 1
+        if ch == '[':
+            in_class = True
+        elif ch == ']':
+            in_class = False
+        elif ch == '/' and not in_class:
+            break
+        elif ch == '\n':
+            break
+    m = NAME_RE.match(text, pos)
+    return m.end() if m else pos
+
+
+def tokenize(text, start=0, end=None):
+    """Tokenize text[start:end] into a flat token list.
+
+    `depth` is the bracket depth at the token, counting braces opened by JSX
+    expression containers, so top-level declarations have depth 0.  JSX shows
+    up as jsx_open / jsx_self / jsx_close tokens spanning whole tags, jsx_text
+    and jsx_comment (a `{/* ... */}` container).
+
+    The second value is True when the scan ends at depth 0 outside any JSX
+    or template.  Strings, comments and tags are scanned against the whole
+    text, so one running past `end` leaves the result unbalanced rather than
+    cut short.
+    """
+    stop_at = len(text) if end is None else end
+    end = len(text)
+    tokens = []
+    append = tokens.append
+    pos = start
+    depth = 0
+    # Frames: ['js', closer, braces] | ['tpl'] | ['tag', start, name] | ['children', name]
+    frames = [['js', None, 0]]
+    prev = None
+
+    while pos < stop_at:
+        frame = frames[-1]
+        mode = frame[0]
+
+        if mode == 'js':
+            ch = text[pos]
+            if ch.isspace():
+                pos = SPACE_RE.match(text, pos).end()
+                continue
+            if text.startswith('//', pos):
+                nl = text.find('\n', pos)
+                nl = end if nl == -1 or nl > end else nl
+                append(Token('comment', text[pos + 2:nl].strip(), pos, nl, depth))
+                pos = nl
+                continue
+            if text.startswith('/*', pos):
+                close = text.find('*/', pos + 2)
+                close = end if close == -1 else close + 2
+                append(Token('comment', text[pos + 2:close - 2].strip(), pos, close, depth))
+                pos = close
+                continue
+            if ch in '\'"':
+                stop = _scan_quoted(text, pos, end)
+                tok = Token('string', text[pos:stop], pos, stop, depth)
+            elif ch == '`':
+                frames.append(['tpl'])
+                tok = Token('template', '`', pos, pos + 1, depth)
+                stop = pos + 1
+            elif ch.isdigit() or (ch == '.' and text[pos + 1:pos + 2].isdigit()):
+                stop = NUMBER_RE.match(text, pos).end()
+                tok = Token('number', text[pos:stop], pos, stop, depth)
+            elif ch == '_' or ch == '$' or ch.isalpha():
+                stop = NAME_RE.match(text, pos).end()
+                tok = Token('name', text[pos:stop], pos, stop, depth)
+            elif ch in OPENERS:
+                if ch == '{':
+                    frame[2] += 1
+                tok = Token('punct', ch, pos, pos + 1, depth)
+                depth += 1
+                stop = pos + 1
+            elif ch in ')]}':
+                if ch == '}' and frame[2] == 0 and frame[1] is not None:
+                    frames.pop()
+                    if frame[1] == 'jsx':
+                        depth -= 1
+                        append(Token('punct', '}', pos, pos + 1, depth))
+                    pos += 1
+                    prev = None
+                    continue
+                if ch == '}':
+                    frame[2] -= 1
+                depth -= 1
+                tok = Token('punct', ch, pos, pos + 1, depth)
+                stop = pos + 1
+            elif ch == '/' and _expression_allowed(prev):
+                stop = _scan_regex(text, pos, end)
+                tok = Token('regex', text[pos:stop], pos, stop, depth)
+            elif ch == '<' and _expression_allowed(prev) and (
+                    text[pos + 1:pos + 2] == '>' or NAME_RE.match(text, pos + 1)):
+                frames.append(['tag', pos, None])
+                pos += 1
+                continue
+            else:
+                for p in PUNCTUATORS:
+                    if text.startswith(p, pos):
+                        break
+                else:
+                    p = ch
+                stop = pos + len(p)
+                tok = Token('punct', p, pos, stop, depth)
+            append(tok)
+            prev = tok
+            pos = stop
+
+        elif mode == 'tpl':
+            while pos < end:
+                ch = text[pos]
+                if ch == '\\':
+                    pos += 2
+                elif ch == '`':
+                    pos += 1
+                    frames.pop()
+                    prev = Token('punct', ')', pos - 1, pos, depth)
+                    break
+                elif text.startswith('${', pos):
+                    pos += 2
+                    frames.append(['js', 'tpl', 0])
+                    prev = None
+                    break
+                else:
+                    pos += 1
+
+        elif mode == 'tag':
+            ch = text[pos]
+            if ch.isspace():
+                pos = SPACE_RE.match(text, pos).end()
+            elif frame[2] is None:
+                m = JSX_NAME_RE.match(text, pos)
+                frame[2] = m.group() if m else ''
+                pos = m.end() if m else pos
+            elif ch == '{':
+                append(Token('punct', '{', pos, pos + 1, depth))
+                depth += 1
+                frames.append(['js', 'jsx', 0])
+                prev = None
+                pos += 1
+            elif ch in '\'"':
+                pos = _scan_quoted(text, pos, end, escapes=False)
+            elif text.startswith('/>', pos):
+                frames.pop()
+                append(Token('jsx_self', frame[2], frame[1], pos + 2, depth))
+                pos += 2
+                if frames[-1][0] == 'js':
+                    prev = Token('punct', ')', pos - 1, pos, depth)
+            elif ch == '>':
+                frames[-1] = ['children', frame[2]]
+                append(Token('jsx_open', frame[2], frame[1], pos + 1, depth))
+                pos += 1
+            elif text.startswith('/*', pos):
+                close = text.find('*/', pos + 2)
+                pos = end if close == -1 else close + 2
+            else:
+                m = JSX_NAME_RE.match(text, pos)
+                if m:
+                    append(Token('jsx_attr', m.group(), pos, m.end(), depth))
+                    pos = m.end()
+                else:
+                    pos += 1
+
+        else:  # children
+            ch = text[pos]
+            if ch == '{':
+                m = JSX_COMMENT_RE.match(text, pos)
+                if m:
+                    append(Token('jsx_comment', m.group(1).strip(), pos, m.end(), depth))
+                    pos = m.end()
+                    continue
+                append(Token('punct', '{', pos, pos + 1, depth))
+                depth += 1
+                frames.append(['js', 'jsx', 0])
+                prev = None
+                pos += 1
+            elif text.startswith('</', pos):
+                m = JSX_CLOSE_RE.match(text, pos)
+                stop = m.end() if m else text.find('>', pos) + 1 or end
+                frames.pop()
+                append(Token('jsx_close', frame[1], pos, stop, depth))
+                pos = stop
+                if frames[-1][0] == 'js':
+                    prev = Token('punct', ')', pos - 1, pos, depth)
+            elif ch == '<':
+                frames.append(['tag', pos, None])
+                pos += 1
+            else:
+                stop = pos
+                while stop < end and text[stop] not in '{<':
+                    stop += 1
+                if text[pos:stop].strip():
+                    append(Token('jsx_text', text[pos:stop].strip(), pos, stop, depth))
+                pos = stop
+
+    return tokens, depth == 0 and len(frames) == 1 and (pos == stop_at or stop_at == end)
+
+
+def _match_brackets(tokens):
+    pairs = {}
+    stack = []
+    for i, tok in enumerate(tokens):
+        if tok.kind != 'punct':
+            continue
+        if tok.value in OPENERS:
+            stack.append(i)
+        elif tok.value in (')', ']', '}') and stack:
+            pairs[stack.pop()] = i
+    return pairs
+
+
+def _rebalanced(tokens):
+    """True if every bracket opened in tokens is closed by the matching one."""
+    stack = []
+    for tok in tokens:
+        if tok.kind != 'punct':
+            continue
+        if tok.value in OPENERS:
+            stack.append(OPENERS[tok.value])
+        elif tok.value in (')', ']', '}') and (not stack or stack.pop() != tok.value):
+            return False
+    return not stack
+
+
+def _entry(kind, name, start, end, **extra):
+    entry = {'kind': kind, 'name': name, 'start': start, 'end': end}
+    entry.update(extra)
+    return entry
+
+
+def _extract(tokens, text):
+    """Build index entries from a token list."""
+    pairs = _match_brackets(tokens)
+    components, hooks, props, anchors, elements = [], [], [], [], []
+    n = len(tokens)
+
+    def tok(i):
+        return tokens[i] if i < n else None
+
+    def is_punct(i, value):
+        t = tok(i)
+        return t is not None and t.kind == 'punct' and t.value == value
+
+    def is_name(i, value=None):
+        t = tok(i)
+        return t is not None and t.kind == 'name' and (value is None or t.value == value)
+
+    def statement_end(i):
+        # Include a trailing semicolon in the statement range.
+        return tokens[i + 1].end if is_punct(i + 1, ';') else tokens[i].end
+
+    def body_end(i):
+        # End of an arrow body: a bracketed block, or (for `=> <div/>`) up to
+        # the next top-level declaration.
+        if i in pairs:
+            return statement_end(pairs[i])
+        j = i
+        while j + 1 < n and not (tokens[j + 1].depth == 0 and tokens[j + 1].kind == 'name'
+                                 and tokens[j + 1].value in DECLARATION_KEYWORDS):
+            j += 1
+        return statement_end(j) if not is_punct(j, ';') else tokens[j].end
+
+    def add_props(open_idx, component):
+        close = pairs.get(open_idx)
+        if close is None:
+            return
+        names = []
+        inner = tokens[open_idx].depth + 1
+        for k in range(open_idx + 1, close):
+            t = tokens[k]
+            if t.kind == 'name' and t.depth == inner and tokens[k - 1].kind == 'punct' \
+                    and tokens[k - 1].value in ('{', ',', '...'):
+                names.append(t.value)
+        props.append(_entry('props', component, tokens[open_idx].start, tokens[close].end, names=names))
+
+    i = 0
+    while i < n:
+        t = tokens[i]
+        if t.depth == 0 and t.kind == 'name' and t.value in ('const', 'let', 'var', 'function', 'export'):
+            start = t.start
+            j = i
+            exported = default = False
+            if is_name(j, 'export'):
+                exported = True
+                j += 1
+                if is_name(j, 'default'):
+                    default = True
+                    j += 1
+            if is_name(j, 'function') and is_name(j + 1) and is_punct(j + 2, '('):
+                name = tokens[j + 1].value
+                params = j + 2
+                close = pairs.get(params)
+                if close is not None and is_punct(close + 1, '{') and name[:1].isupper():
+                    end = statement_end(pairs.get(close + 1, close))
+                    components.append(_entry('component', name, start, end, exported=exported,
+                                             default=default, body=tokens[close + 1].start))
+                    if is_punct(params + 1, '{'):
+                        add_props(params + 1, name)
+                    i = close + 1
+                    continue
+            elif is_name(j) and tokens[j].value in ('const', 'let', 'var') and is_name(j + 1) \
+                    and is_punct(j + 2, '=') and tokens[j + 1].value[:1].isupper():
+                name = tokens[j + 1].value
+                k = j + 3
+                if is_name(k, 'function'):
+                    k += 2 if is_name(k + 1) else 1
+                    close = pairs.get(k) if is_punct(k, '(') else None
+                    body = close + 1 if close is not None and is_punct(close + 1, '{') else None
+                elif is_punct(k, '('):
+                    close = pairs.get(k)
+                    body = close + 2 if close is not None and is_punct(close + 1, '=>') else None
+                elif is_name(k) and is_punct(k + 1, '=>'):
+                    close, body = None, k + 2
+                else:
+                    close = body = None
+                if body is not None and body < n:
+                    end = body_end(body)
+                    components.append(_entry('component', name, start, end, exported=exported,
+                                             default=default, body=tokens[body].start))
+                    if close is not None and is_punct(k + 1, '{'):
+                        add_props(k + 1, name)
+                    i = body
+                    continue
+        if t.kind == 'name' and t.value in ('const', 'let', 'var') and is_punct(i + 1, '['):
+            close = pairs.get(i + 1)
+            if close is not None and is_punct(close + 1, '='):
+                k = close + 2
+                if is_name(k, 'React') and is_punct(k + 1, '.'):
+                    k += 2
+                if is_name(k) and tokens[k].value in ('useState', 'useReducer') and is_punct(k + 1, '('):
+                    call_close = pairs.get(k + 1)
+                    names = [x.value for x in tokens[i + 2:close] if x.kind == 'name']
+                    if call_close is not None and names:
+                        hooks.append(_entry('hook', names[0], t.start, statement_end(call_close),
+                                            setter=names[1] if len(names) > 1 else None,
+                                            hook=tokens[k].value,
+                                            initial=text[tokens[k + 1].end:tokens[call_close].start]))
+        elif t.kind == 'jsx_comment':
+            anchors.append(_entry('anchor', t.value, t.start, t.end, jsx=True))
+        elif t.kind == 'comment':
+            anchors.append(_entry('anchor', t.value, t.start, t.end, jsx=False))
+        elif t.kind in ('jsx_open', 'jsx_self') and t.value:
+            elements.append(_entry('element', t.value, t.start, t.end, self_closing=t.kind == 'jsx_self'))
+        i += 1
+    return {'components': components, 'hooks': hooks, 'props': props,
+            'anchors': anchors, 'elements': elements}
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class JsxIndex:
+    KINDS = ('components', 'hooks', 'props', 'anchors', 'elements')
+
+    def __init__(self, text, path=None, entries=None):
+        self.path = path
+        self.text = text
+        self.hash = content_hash(text)
+        self.rebuilds = 0
+        if entries is None:
+            entries, self.balanced = self._build(text, 0, len(text))
+        else:
+            self.balanced = entries['balanced']
+        self._set(entries)
+
+    def _build(self, text, start, end):
+        tokens, balanced = tokenize(text, start, end)
+        self.rebuilds += 1
+        return _extract(tokens, text), balanced and _rebalanced(tokens)
+
+    def _set(self, entries):
+        for kind in self.KINDS:
+            items = sorted(entries.get(kind, []), key=lambda e: e['start'])
+            setattr(self, kind, items)
+        self._reindex()
+
+    def _reindex(self):
+        self._starts = {kind: [e['start'] for e in getattr(self, kind)] for kind in self.KINDS}
+        self._by_name = {}
+        for kind in self.KINDS:
+            for e in getattr(self, kind):
+                self._by_name.setdefault((kind, e['name']), []).append(e)
+
+    # -- lookups -----------------------------------------------------------
+
+    def component(self, name):
+        found = self._by_name.get(('components', name))
+        return found[0] if found else None
+
+    def component_at(self, offset):
+        starts = self._starts['components']
+        i = bisect.bisect_right(starts, offset) - 1
+        if i >= 0 and self.components[i]['end'] > offset:
+            return self.components[i]
+        return None
+
+    def within(self, kind, start, end):
+        """Entries of `kind` whose start lies in [start, end)."""
+        starts = self._starts[kind]
+        items = getattr(self, kind)
+        return items[bisect.bisect_left(starts, start):bisect.bisect_left(starts, end)]
+
+    def props_of(self, component):
+        comp = self.component(component)
+        if comp is None:
+            return None
+        for e in self.within('props', comp['start'], comp['body']):
+            return e
+        return None
+
+    def hooks_in(self, component):
+        comp = self.component(component)
+        return self.within('hooks', comp['start'], comp['end']) if comp else []
+
+    def hook(self, name, component=None):
+        for e in self._by_name.get(('hooks', name), []):
+            if component is None or (self.component_at(e['start']) or {}).get('name') == component:
+                return e
+        return None
+
+    def anchor(self, text, start=0):
+        """First anchor at or after `start` whose comment text equals `text`."""
+        for e in self._by_name.get(('anchors', text), []):
+            if e['start'] >= start:
+                return e
+        return None
+
+    def elements_named(self, name, within=None):
+        items = self._by_name.get(('elements', name), [])
+        if within is None:
+            return list(items)
+        comp = self.component(within)
+        return [e for e in items if comp and comp['start'] <= e['start'] < comp['end']]
+
+    # -- incremental update ------------------------------------------------
+
+    def update(self, text, start, old_end, new_end):
+        """Account for text[start:new_end] having replaced old[start:old_end].
+
+        Only the top-level declarations overlapping the edit are re-tokenized;
+        everything after it is shifted.  Falls back to a full rebuild when the
+        re-tokenized region does not close every bracket it opens, and while
+        the file as a whole is unbalanced, since declaration ends are then no
+        longer top-level boundaries.
+        """
+        delta = new_end - old_end
+        comps = self.components
+        before = [c for c in comps if c['end'] < start]
+        after = [c for c in comps if c['start'] > old_end]
+        touched = comps[len(before):len(comps) - len(after)]
+        # Re-scan from one top-level boundary to the next: the edited
+        # declarations, or the gap between declarations the edit fell into.
+        lo = before[-1]['end'] if before else 0
+        if touched and touched[0]['start'] <= start:
+            lo = touched[0]['start']
+        old_hi = after[0]['start'] if after else len(self.text)
+        if touched and touched[-1]['end'] >= old_end:
+            old_hi = touched[-1]['end']
+        entries, balanced = self._build(text, lo, old_hi + delta) if self.balanced else (None, False)
+        if not balanced:
+            self.text = text
+            self.hash = content_hash(text)
+            entries, self.balanced = self._build(text, 0, len(text))
+            self._set(entries)
+            return self
+        merged = {}
+        for kind in self.KINDS:
+            keep = []
+            for e in getattr(self, kind):
+                if e['end'] <= lo:
+                    keep.append(e)
+                elif e['start'] >= old_hi:
+                    shifted = dict(e)
+                    shifted['start'] += delta
+                    shifted['end'] += delta
+                    if 'body' in shifted:
+                        shifted['body'] += delta
+                    keep.append(shifted)
+            keep.extend(entries[kind])
+            merged[kind] = keep
+        self.text = text
+        self.hash = content_hash(text)
+        self._set(merged)
+        return self
+
+    # -- persistence -------------------------------------------------------
+
+    def to_json(self):
+        data = {kind: getattr(self, kind) for kind in self.KINDS}
+        data.update(version=INDEX_VERSION, hash=self.hash, balanced=self.balanced)
+        return data
+
+
+def _cache_file(path, cache_dir):
+    key = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, key + '.json')
+
+
+def load_index(path, cache_dir=CACHE_DIR):
+    """Index for `path`, reusing the on-disk cache when the file is unchanged."""
+    st = os.stat(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    cache_file = _cache_file(path, cache_dir)
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        cached = None
+    if cached and cached.get('version') == INDEX_VERSION and (
+            (cached.get('mtime_ns'), cached.get('size')) == (st.st_mtime_ns, st.st_size)
+            or cached.get('hash') == content_hash(text)):
+        return JsxIndex(text, path, entries=cached)
+    index = JsxIndex(text, path)
+    save_index(index, cache_dir)
+    return index
+
+
+def save_index(index, cache_dir=CACHE_DIR):
+    if index.path is None:
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    st = os.stat(index.path)
+    data = index.to_json()
+    data.update(path=os.path.abspath(index.path), mtime_ns=st.st_mtime_ns, size=st.st_size)
+    cache_file = _cache_file(index.path, cache_dir)
+    with open(cache_file + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(cache_file + '.tmp', cache_file)
+
+
+def apply_edits(index, edits):
+    """Apply (start, end, replacement) edits to index.text, keeping the index current."""
+    text = index.text
+    for start, end, repl in sorted(edits, key=lambda e: (e[0], e[1]), reverse=True):
+        text = text[:start] + repl + text[end:]
+        index.update(text, start, end, start + len(repl))
+    return text
+
+
+def _line_span(text, start, end):
+    # Widen [start, end) to whole lines when nothing else shares them.
+    line_start = text.rfind('\n', 0, start) + 1
+    line_end = text.find('\n', end)
+    line_end = len(text) if line_end == -1 else line_end + 1
+    if text[line_start:start].strip() or text[end:line_end].strip():
+        return start, end
+    return line_start, line_end
+
+
+def _render_path(index, source, target):
+    """Components rendered under `target` that in turn render `source`.
+
+    Returns {component: names of the components on the path it renders},
+    with target included and source left out.
+    """
+    renders = {}
+    for c in index.components:
+        children = {e['name'] for e in index.within('elements', c['start'], c['end'])}
+        renders[c['name']] = {n for n in children if n != c['name'] and index.component(n)}
+    reaches = {source}
+    grew = True
+    while grew:
+        grew = False
+        for name, children in renders.items():
+            if name not in reaches and children & reaches:
+                reaches.add(name)
+                grew = True
+    below = set()
+    stack = [target]
+    while stack:
+        name = stack.pop()
+        if name in below or name == source or name not in reaches:
+            continue
+        below.add(name)
+        stack.extend(renders.get(name, ()))
+    return {name: renders[name] & (below | {source}) for name in below}
+
+
+def _add_props(text, props, names):
+    inner = text[props['start'] + 1:props['end'] - 1]
+    close = props['start'] + 1 + len(inner.rstrip())
+    sep = ', ' if inner.strip() else ' '
+    return close, close, sep + ', '.join(names)
+
+
+def lift_state(index, name, source, target):
+    """Edits that move a useState hook from `source` up to `target`.
+
+    The hook is removed from `source`, added to its props destructuring, and
+    declared in `target`.  Every component between the two on the render
+    path takes the state as props too, and each one passes it on to the
+    next component down.
+    """
+    text = index.text
+    hook = index.hook(name, component=source)
+    if hook is None:
+        raise ValueError(f'no useState hook {name!r} in {source}')
+    props = index.props_of(source)
+    if props is None:
+        raise ValueError(f'{source} does not destructure its props')
+    if index.component(target) is None:
+        raise ValueError(f'no component {target!r}')
+    path = _render_path(index, source, target)
+    if not path:
+        raise ValueError(f'{target} does not render {source}')
+    setter = hook['setter']
+    passed = [name] + ([setter] if setter else [])
+    edits = []
+
+    start, end = _line_span(text, hook['start'], hook['end'])
+    edits.append((start, end, ''))
+    edits.append(_add_props(text, props, passed))
+
+    for between in path:
+        if between == target:
+            continue
+        between_props = index.props_of(between)
+        if between_props is None:
+            raise ValueError(f'{between} renders {source} but does not destructure its props')
+        missing = [p for p in passed if p not in between_props['names']]
+        if missing:
+            edits.append(_add_props(text, between_props, missing))
+
+    statement = text[hook['start']:hook['end']]
+    existing = index.hooks_in(target)
+    if existing:
+        last = existing[-1]
+        line_start = text.rfind('\n', 0, last['start']) + 1
+        indent = text[line_start:last['start']]
+        edits.append((last['end'], last['end'], '\n' + indent + statement))
+    else:
+        body = index.component(target)['body']
+        edits.append((body + 1, body + 1, '\n    ' + statement))
+
+    attrs = ' '.join(f'{p}={{{p}}}' for p in passed)
+    for parent, children in path.items():
+        for child in children:
+            for el in index.elements_named(child, within=parent):
+                tag_end = el['end'] - (2 if el['self_closing'] else 1)
+                stop = len(text[el['start']:tag_end].rstrip()) + el['start']
+                edits.append((stop, stop, ' ' + attrs))
+    return edits
+
+
+def summary(index):
+    lines = []
+    for c in index.components:
+        line = index.text.count('\n', 0, c['start']) + 1
+        props = index.props_of(c['name'])
+        hooks = index.hooks_in(c['name'])
+        lines.append(f"{c['name']} (line {line}, {c['end'] - c['start']} chars, "
+                     f"{len(props['names']) if props else 0} props, {len(hooks)} hooks)")
+        for h in hooks:
+            lines.append(f"    useState {h['name']}" + (f" / {h['setter']}" if h['setter'] else ''))
+    jsx_anchors = [a for a in index.anchors if a['jsx']]
+    lines.append(f'{len(jsx_anchors)} JSX comment anchors, {len(index.elements)} JSX elements')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path')
+    parser.add_argument('--lift', nargs=3, metavar=('STATE', 'FROM', 'TO'),
+                        help='lift a useState hook from one component to another')
+    parser.add_argument('--dry-run', action='store_true')
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.no_cache:
+        with open(args.path, 'r', encoding='utf-8') as f:
+            index = JsxIndex(f.read(), args.path)
+    else:
+        index = load_index(args.path)
+    if not args.lift:
+        print(summary(index))
+        return 0
+
+    before = index.text
+    try:
+        edits = lift_state(index, *args.lift)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    after = apply_edits(index, edits)
+    if args.dry_run:
+        sys.stdout.writelines(difflib.unified_diff(
+            before.splitlines(keepends=True), after.splitlines(keepends=True),
+            fromfile='a/' + args.path, tofile='b/' + args.path))
+        return 0
+    with open(args.path, 'w', encoding='utf-8') as f:
+        f.write(after)
+    if not args.no_cache:
+        save_index(index)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
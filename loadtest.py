@@ -0,0 +1,260 @@
+"""Concurrent load test replaying the community journey from the frontend.
+
+Each virtual user logs in once (tokens are cached per user), then loops:
+
+    GET /communities/ -> GET /shared-projects/{id}/ -> PATCH /shared-notes/{id}/
+
+with randomized think time, over one pooled keep-alive client.  Reports
+throughput and p50/p95/p99 latency per endpoint, and writes a JSON report
+that can be compared against a previous run.
+
+    python loadtest.py --users 50 --duration 60 --json run.json
+    python loadtest.py --users 50 --duration 60 --compare run.json
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import math
+import random
+import sys
+import time
+
+from api_client import DEFAULT_BASE_URL, Client
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open.
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    # Nearest rank: the smallest value with at least q% of samples at or below it.
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class LatencyRecorder:
+    """Per-endpoint latencies, status codes and errors."""
+
+    def __init__(self):
+        self.samples = {}
+        self.statuses = {}
+        self.errors = {}
+        self.started = time.perf_counter()
+        self.stopped = None
+
+    def record(self, endpoint, seconds, status=None, error=None):
+        self.samples.setdefault(endpoint, []).append(seconds)
+        if status is not None:
+            codes = self.statuses.setdefault(endpoint, {})
+            codes[status] = codes.get(status, 0) + 1
+        if error is not None:
+            errs = self.errors.setdefault(endpoint, {})
+            errs[error] = errs.get(error, 0) + 1
+
+    def stop(self):
+        self.stopped = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return (self.stopped or time.perf_counter()) - self.started
+
+    def summary(self):
+        elapsed = self.elapsed
+        endpoints = {}
+        for endpoint, values in sorted(self.samples.items()):
+            ms = sorted(v * 1000 for v in values)
+            counts = [0] * (len(BUCKETS_MS) + 1)
+            for v in ms:
+                counts[bisect.bisect_left(BUCKETS_MS, v)] += 1
+            endpoints[endpoint] = {
+                'requests': len(ms),
+                'rps': len(ms) / elapsed if elapsed else 0.0,
+                'p50_ms': percentile(ms, 50),
+                'p95_ms': percentile(ms, 95),
+                'p99_ms': percentile(ms, 99),
+                'max_ms': ms[-1] if ms else 0.0,
+                'statuses': {str(k): v for k, v in sorted(self.statuses.get(endpoint, {}).items())},
+                'errors': self.errors.get(endpoint, {}),
+                'histogram_ms': dict(zip([f'<={b}' for b in BUCKETS_MS] + [f'>{BUCKETS_MS[-1]}'], counts)),
+            }
+        total = sum(e['requests'] for e in endpoints.values())
+        return {'elapsed_s': elapsed, 'requests': total,
+                'rps': total / elapsed if elapsed else 0.0, 'endpoints': endpoints}
+
+
+def format_summary(summary, title=None):
+    lines = []
+    if title:
+        lines.append(title)
+    lines.append(f"{summary['requests']} requests in {summary['elapsed_s']:.1f} s ({summary['rps']:.1f} req/s)")
+    lines.append(f"{'endpoint':<34} {'reqs':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+    for name, e in summary['endpoints'].items():
+        failed = sum(v for k, v in e['statuses'].items() if not k.startswith('2')) + sum(e['errors'].values())
+        lines.append(f"{name:<34} {e['requests']:>7} {e['rps']:>8.1f} {e['p50_ms']:>6.1f}ms "
+                     f"{e['p95_ms']:>6.1f}ms {e['p99_ms']:>6.1f}ms {failed:>7}")
+    return '\n'.join(lines)
+
+
+def compare(current, baseline):
+    lines = [f"{'endpoint':<34} {'p50':>16} {'p95':>16} {'p99':>16} {'req/s':>16}"]
+    for name, e in current['endpoints'].items():
+        b = baseline.get('endpoints', {}).get(name)
+        if b is None:
+            lines.append(f'{name:<34} (new)')
+            continue
+        cells = []
+        for key in ('p50_ms', 'p95_ms', 'p99_ms', 'rps'):
+            delta = (e[key] - b[key]) / b[key] * 100 if b[key] else 0.0
+            cells.append(f'{e[key]:>7.1f} ({delta:+5.0f}%)')
+        lines.append(f'{name:<34} ' + ' '.join(cells))
+    return '\n'.join(lines)
+
+
+class TokenCache:
+    """One login per username, shared by every virtual user with that account."""
+
+    def __init__(self, client, recorder):
+        self.client = client
+        self.recorder = recorder
+        self.tokens = {}
+        self.locks = {}
+
+    async def get(self, username, password):
+        if username in self.tokens:
+            return self.tokens[username]
+        lock = self.locks.setdefault(username, asyncio.Lock())
+        async with lock:
+            if username not in self.tokens:
+                resp = await self.client.post('/login/', json={'username': username, 'password': password})
+                self.recorder.record('POST /login/', resp.elapsed, resp.status)
+                resp.raise_for_status()
+                self.tokens[username] = resp.json()['token']
+        return self.tokens[username]
+
+    def invalidate(self, username, token):
+        """Forget a rejected token, unless another user has already replaced it."""
+        if self.tokens.get(username) == token:
+            del self.tokens[username]
+
+
+async def call(client, recorder, endpoint, method, path, tokens, account, json=None):
+    for attempt in range(2):
+        try:
+            token = await tokens.get(*account)
+        except Exception as e:
+            recorder.record('POST /login/', 0.0, error=type(e).__name__)
+            return None
+        started = time.perf_counter()
+        try:
+            resp = await client.request(method, path, json=json, headers={'Authorization': f'Token {token}'})
+        except Exception as e:
+            recorder.record(endpoint, time.perf_counter() - started, error=type(e).__name__)
+            return None
+        recorder.record(endpoint, resp.elapsed, resp.status)
+        if resp.status == 401 and not attempt:
+            # The token expired or the server restarted: log in again, once.
+            tokens.invalidate(account[0], token)
+            continue
+        return resp if resp.ok else None
+
+
+async def journey(client, recorder, tokens, account, rng, think):
+    """One pass of the community flow; returns False when nothing could be fetched."""
+    resp = await call(client, recorder, 'GET /communities/', 'GET', '/communities/', tokens, account)
+    if resp is None:
+        return False
+    projects = [p for c in resp.json() or [] for p in c.get('projects') or []]
+    if not projects:
+        return True
+    await asyncio.sleep(rng.expovariate(1 / think) if think else 0)
+
+    project = rng.choice(projects)
+    resp = await call(client, recorder, 'GET /shared-projects/{id}/', 'GET',
+                      f"/shared-projects/{project['id']}/", tokens, account)
+    if resp is None:
+        return True
+    notes = (resp.json() or {}).get('shared_notes') or project.get('shared_notes') or []
+    if not notes:
+        return True
+    await asyncio.sleep(rng.expovariate(1 / think) if think else 0)
+
+    # Same payload as the editor's autosave: the whole title and content.
+    note = rng.choice(notes)
+    await call(client, recorder, 'PATCH /shared-notes/{id}/', 'PATCH', f"/shared-notes/{note['id']}/", tokens, account,
+               json={'title': note.get('title', ''), 'content': note.get('content', '')})
+    return True
+
+
+async def virtual_user(n, args, client, tokens, recorder, deadline):
+    rng = random.Random(args.seed + n)
+    await asyncio.sleep(args.ramp * n / max(1, args.users))
+    account = args.credentials[n % len(args.credentials)]
+    try:
+        await tokens.get(*account)
+    except Exception as e:
+        recorder.record('POST /login/', 0.0, error=type(e).__name__)
+        return
+    iterations = 0
+    while time.perf_counter() < deadline and (not args.iterations or iterations < args.iterations):
+        if not await journey(client, recorder, tokens, account, rng, args.think):
+            await asyncio.sleep(1)
+        iterations += 1
+        await asyncio.sleep(rng.expovariate(1 / args.think) if args.think else 0)
+
+
+async def run(args):
+    recorder = LatencyRecorder()
+    async with Client(args.base_url, limit=args.connections) as client:
+        tokens = TokenCache(client, recorder)
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(*(virtual_user(n, args, client, tokens, recorder, deadline)
+                               for n in range(args.users)))
+        recorder.stop()
+        summary = recorder.summary()
+        summary['config'] = {'users': args.users, 'duration_s': args.duration, 'think_s': args.think,
+                             'connections': args.connections, 'base_url': args.base_url,
+                             'connections_opened': client.connections_opened}
+    return summary
+
+
+def parse_credentials(values):
+    creds = []
+    for value in values:
+        username, _, password = value.partition(':')
+        creds.append((username, password))
+    return creds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    parser.add_argument('--users', type=int, default=10, help='concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds to run')
+    parser.add_argument('--iterations', type=int, default=0, help='journeys per user (0 = until --duration)')
+    parser.add_argument('--ramp', type=float, default=5.0, help='seconds over which users start')
+    parser.add_argument('--think', type=float, default=0.5, help='mean think time between steps')
+    parser.add_argument('--connections', type=int, default=100, help='keep-alive pool size')
+    parser.add_argument('--user', action='append', default=[], metavar='USER:PASSWORD',
+                        help='account to log in with (repeatable; users are assigned round-robin)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='write the report here')
+    parser.add_argument('--compare', help='previous JSON report to diff against')
+    args = parser.parse_args(argv)
+    args.credentials = parse_credentials(args.user or ['volcan:123'])
+
+    summary = asyncio.run(run(args))
+    print(format_summary(summary))
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            print()
+            print(compare(summary, json.load(f)))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,9 @@
+import os
 import re
 import codecs
 
-with codecs.open('/home/volcan/Documentos/dev/volcan/frontend/src/pages/CommunityView.jsx', 'r', 'utf-8') as f:
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'pages', 'CommunityView.jsx')
+with codecs.open(path, 'r', 'utf-8') as f:
     text = f.read()
 
 # We want to change the sidebar in CommunityView.
@@ -0,0 +1,184 @@
+"""Delta encoding for note content: send what changed instead of the whole HTML.
+
+A delta is computed against the content the server last acknowledged (its
+"base") and applied by the server to the content it has:
+
+    {"base": "<hash of old>", "ops": [1200, "new words", -4, 35], "hash": "<hash of new>"}
+
+Ops are walked left to right over the base: a positive int keeps that many
+characters, a negative int drops that many, a string is inserted.  Whatever
+is left of the base after the last op is kept, so a trailing keep is omitted.
+Offsets count Unicode code points (iterate with `for...of`/`Array.from` in
+JS, not UTF-16 units).  Hashes are the first 16 hex digits of SHA-256 over
+the UTF-8 text.
+
+If the base hash does not match the server's content, apply() raises a
+conflict and the client falls back to sending the full content.
+
+    python note_delta.py old.html new.html
+"""
+import difflib
+import hashlib
+import json
+import re
+import sys
+
+# Tokens the diff works in: tags, entities, words, runs of space, anything else.
+TOKEN_RE = re.compile(r'<[^>]*>|&#?\w+;|\w+|\s+|.', re.S)
+# Blocks end after the closing tag of a paragraph-level element.
+BLOCK_RE = re.compile(r'.*?(?:</(?:p|h[1-6]|li|ul|ol|pre|blockquote)>|\Z)', re.S)
+
+
+class DeltaError(ValueError):
+    def __init__(self, message, conflict=False):
+        super().__init__(message)
+        self.conflict = conflict
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _common_prefix(a, b):
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a, b, limit):
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:len(a) - lo] == b[len(b) - mid:len(b) - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class _Ops(list):
+    def keep(self, n):
+        if n:
+            if self and isinstance(self[-1], int) and self[-1] > 0:
+                self[-1] += n
+            else:
+                self.append(n)
+
+    def drop(self, n):
+        if n:
+            if self and isinstance(self[-1], int) and self[-1] < 0:
+                self[-1] -= n
+            else:
+                self.append(-n)
+
+    def insert(self, text):
+        if text:
+            if self and isinstance(self[-1], str):
+                self[-1] += text
+            else:
+                self.append(text)
+
+
+def _diff_tokens(a, b, ops):
+    ta, tb = TOKEN_RE.findall(a), TOKEN_RE.findall(b)
+    pos_a = [0]
+    for t in ta:
+        pos_a.append(pos_a[-1] + len(t))
+    matcher = difflib.SequenceMatcher(None, ta, tb, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.keep(pos_a[i2] - pos_a[i1])
+        else:
+            ops.drop(pos_a[i2] - pos_a[i1])
+            ops.insert(''.join(tb[j1:j2]))
+
+
+def diff(old, new):
+    """Ops turning old into new."""
+    ops = _Ops()
+    prefix = _common_prefix(old, new)
+    suffix = _common_suffix(old, new, min(len(old), len(new)) - prefix)
+    a, b = old[prefix:len(old) - suffix], new[prefix:len(new) - suffix]
+    ops.keep(prefix)
+    if a and b:
+        # Match whole blocks (paragraphs, headings, list items) first and
+        # diff tokens only inside the blocks that changed, so edits far apart
+        # in a long document stay cheap.
+        ba, bb = [x for x in BLOCK_RE.findall(a) if x], [x for x in BLOCK_RE.findall(b) if x]
+        matcher = difflib.SequenceMatcher(None, ba, bb, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            old_part, new_part = ''.join(ba[i1:i2]), ''.join(bb[j1:j2])
+            if tag == 'equal':
+                ops.keep(len(old_part))
+            elif tag == 'replace':
+                _diff_tokens(old_part, new_part, ops)
+            else:
+                ops.drop(len(old_part))
+                ops.insert(new_part)
+    else:
+        ops.drop(len(a))
+        ops.insert(b)
+    # The common suffix, and any keep before it, is implied.
+    while ops and isinstance(ops[-1], int) and ops[-1] > 0:
+        ops.pop()
+    return list(ops)
+
+
+def encode(old, new):
+    return {'base': content_hash(old), 'ops': diff(old, new), 'hash': content_hash(new)}
+
+
+def apply_ops(text, ops):
+    out = []
+    pos = 0
+    for op in ops:
+        if isinstance(op, str):
+            out.append(op)
+        elif isinstance(op, int) and not isinstance(op, bool):
+            if pos + abs(op) > len(text):
+                raise DeltaError('delta runs past the end of the base')
+            if op > 0:
+                out.append(text[pos:pos + op])
+            pos += abs(op)
+        else:
+            raise DeltaError(f'bad op {op!r}')
+    out.append(text[pos:])
+    return ''.join(out)
+
+
+def apply(text, delta):
+    """The new content, or DeltaError (with .conflict set if the base is stale)."""
+    if not isinstance(delta, dict) or not isinstance(delta.get('ops'), list):
+        raise DeltaError('delta must be an object with an ops list')
+    if delta.get('base') != content_hash(text):
+        raise DeltaError('delta base does not match the current content', conflict=True)
+    new = apply_ops(text, delta['ops'])
+    if 'hash' in delta and delta['hash'] != content_hash(new):
+        raise DeltaError('content hash mismatch after applying the delta')
+    return new
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 2:
+        print(__doc__.strip().splitlines()[-1].strip(), file=sys.stderr)
+        return 2
+    with open(args[0], encoding='utf-8') as f:
+        old = f.read()
+    with open(args[1], encoding='utf-8') as f:
+        new = f.read()
+    delta = encode(old, new)
+    print(json.dumps(delta, ensure_ascii=False))
+    size = len(json.dumps(delta, ensure_ascii=False).encode('utf-8'))
+    print(f'{size} bytes vs {len(json.dumps(new, ensure_ascii=False).encode("utf-8"))} for the full content',
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
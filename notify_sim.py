@@ -0,0 +1,359 @@
+"""Fan-out simulator for the notification badge: polling vs long-poll vs SSE.
+
+Navbar.jsx polls /notifications/unread_count/ every 30 s in every open tab,
+and the panel fetches /notifications/ when the user opens it.  This models N
+signed-in clients with a realistic number of tabs each (background tabs are
+throttled to --hidden-interval, like Chrome does), random tab start times and
+timer jitter, while new notifications arrive at --events-per-min.
+
+Per transport it reports the request rate the server sees, request latency,
+how many responses carried no change, and how long it took for each tab's
+badge to show a new notification.  `--mode compare` runs all three one after
+another with the same seed and prints them side by side.  Long-poll and SSE
+use the stand-in endpoints of stub_server.py; new notifications are injected
+through its POST /__notify__ hook (against a real API only polling is
+meaningful and no events are injected).
+
+    python stub_server.py --port 8000 &
+    python notify_sim.py --clients 200 --duration 120
+    python notify_sim.py --clients 200 --duration 120 --mode compare --json fanout.json
+    python notify_sim.py --clients 50 --interval 3 --hidden-interval 6 --wait 5 --mode compare
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+
+from api_client import DEFAULT_BASE_URL, ApiError, Client
+from loadtest import LatencyRecorder, parse_credentials, percentile
+
+MODES = ('poll', 'longpoll', 'sse')
+COUNT_PATH = '/notifications/unread_count/'
+
+
+class SimUser:
+    def __init__(self, n, token, tabs):
+        self.n = n
+        self.token = token
+        self.headers = {'Authorization': f'Token {token}'}
+        self.tabs = [SimTab(self, i) for i in range(tabs)]
+        self.baseline = 0
+        self.event_times = []
+
+
+class SimTab:
+    def __init__(self, user, index):
+        self.user = user
+        self.index = index
+        self.last_count = None
+        self.delivered = 0
+        self.opened = None
+
+    @property
+    def foreground(self):
+        return self.index == 0
+
+
+class Metrics:
+    def __init__(self, mode):
+        self.mode = mode
+        self.recorder = LatencyRecorder()
+        self.requests = 0
+        self.no_change = 0
+        self.messages = 0
+        self.heartbeats = 0
+        self.bytes = 0
+        self.delays = []
+        self.panel_fetches = 0
+        self.events = 0
+
+    def response_bytes(self, resp, body=b''):
+        # Status line and headers count too; for a 30-byte body they dominate.
+        self.bytes += 17 + sum(len(k) + len(v) + 4 for k, v in resp.headers.items()) + len(body)
+
+
+def tab_count(rng, mean, cap):
+    """Geometric number of open tabs with the given mean (at least one)."""
+    p = 1 / max(1.0, mean)
+    n = 1
+    while n < cap and rng.random() > p:
+        n += 1
+    return n
+
+
+def observe(sim, tab, count):
+    """A tab learned the current unread count; returns True if it changed."""
+    user = tab.user
+    now = time.perf_counter()
+    changed = tab.last_count is not None and count != tab.last_count
+    sim.metrics.messages += 1
+    if tab.last_count == count:
+        sim.metrics.no_change += 1
+    targets = user.tabs if sim.args.leader else [tab]
+    seen = min(count - user.baseline, len(user.event_times))
+    for t in targets:
+        for i in range(t.delivered, seen):
+            # A notification that arrived before the tab was opened shows up on mount.
+            sim.metrics.delays.append(now - max(user.event_times[i], t.opened))
+        t.delivered = max(t.delivered, seen)
+        t.last_count = count
+    return changed
+
+
+async def maybe_open_panel(sim, tab, changed):
+    # Only the tab the user is looking at can open the panel.
+    if not (changed and tab.foreground and sim.rng.random() < sim.args.open_rate):
+        return
+    started = time.perf_counter()
+    try:
+        resp = await sim.client.get('/notifications/', headers=tab.user.headers)
+    except Exception as e:
+        sim.metrics.recorder.record('GET /notifications/', time.perf_counter() - started, error=type(e).__name__)
+        return
+    sim.metrics.requests += 1
+    sim.metrics.panel_fetches += 1
+    sim.metrics.response_bytes(resp, resp.body)
+    sim.metrics.recorder.record('GET /notifications/', resp.elapsed, resp.status)
+
+
+async def fetch_count(sim, tab, path, endpoint):
+    started = time.perf_counter()
+    try:
+        resp = await sim.client.get(path, headers=tab.user.headers)
+    except Exception as e:
+        sim.metrics.recorder.record(endpoint, time.perf_counter() - started, error=type(e).__name__)
+        return None
+    sim.metrics.requests += 1
+    sim.metrics.response_bytes(resp, resp.body)
+    sim.metrics.recorder.record(endpoint, resp.elapsed, resp.status)
+    return resp.json() if resp.ok else None
+
+
+async def open_tab(sim, tab, within):
+    """Tabs are opened at random times over the first `within` seconds."""
+    await asyncio.sleep(sim.rng.uniform(0, within))
+    now = time.perf_counter()
+    for t in tab.user.tabs if sim.args.leader else [tab]:
+        t.opened = now
+
+
+def jittered(sim, seconds):
+    return max(0.0, seconds + sim.rng.uniform(-sim.args.jitter, sim.args.jitter))
+
+
+async def poll_tab(sim, tab):
+    args = sim.args
+    interval = args.interval if tab.foreground else max(args.interval, args.hidden_interval)
+    await open_tab(sim, tab, interval)
+    while True:
+        data = await fetch_count(sim, tab, COUNT_PATH, f'GET {COUNT_PATH}')
+        if data is not None:
+            await maybe_open_panel(sim, tab, observe(sim, tab, data.get('count') or 0))
+        await asyncio.sleep(jittered(sim, interval))
+
+
+async def longpoll_tab(sim, tab):
+    args = sim.args
+    await open_tab(sim, tab, args.interval)
+    version = None
+    while True:
+        path = COUNT_PATH if version is None else f'{COUNT_PATH}?since={version}&wait={args.wait:g}'
+        data = await fetch_count(sim, tab, path, f'GET {COUNT_PATH} (long-poll)')
+        if data is None:
+            await asyncio.sleep(jittered(sim, 1.0))
+            continue
+        version = data.get('version')
+        await maybe_open_panel(sim, tab, observe(sim, tab, data.get('count') or 0))
+
+
+async def sse_tab(sim, tab):
+    args = sim.args
+    await open_tab(sim, tab, args.interval)
+    endpoint = 'GET /notifications/stream/ (connect)'
+    while True:
+        started = time.perf_counter()
+        try:
+            async with sim.client.stream('GET', f'/notifications/stream/?heartbeat={args.heartbeat:g}',
+                                         headers=tab.user.headers) as resp:
+                sim.metrics.requests += 1
+                sim.metrics.response_bytes(resp)
+                sim.metrics.recorder.record(endpoint, time.perf_counter() - started, resp.status)
+                if not resp.ok:
+                    raise ApiError(resp.status, resp.reason)
+                buf = ''
+                async for chunk in resp.iter_chunks():
+                    sim.metrics.bytes += len(chunk)
+                    buf += chunk.decode('utf-8')
+                    *events, buf = buf.split('\n\n')
+                    for event in events:
+                        data = [line[5:].strip() for line in event.split('\n') if line.startswith('data:')]
+                        if not data:
+                            sim.metrics.heartbeats += 1
+                            continue
+                        count = json.loads(''.join(data)).get('count') or 0
+                        await maybe_open_panel(sim, tab, observe(sim, tab, count))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            sim.metrics.recorder.record(endpoint, time.perf_counter() - started, error=type(e).__name__)
+        # EventSource reconnects after the server's retry: delay.
+        await asyncio.sleep(jittered(sim, 3.0))
+
+
+async def emit_events(sim, users, origin):
+    """Poisson arrivals of new notifications, each for one random user."""
+    rate = sim.args.events_per_min / 60
+    if not rate:
+        return
+    # Own generator, so every mode sees the same arrivals.
+    rng = random.Random(sim.args.seed + 1)
+    async with Client(origin) as hook:
+        while True:
+            await asyncio.sleep(rng.expovariate(rate))
+            user = rng.choice(users)
+            user.event_times.append(time.perf_counter())
+            resp = await hook.post('/__notify__', json={'token': user.token})
+            if resp.status == 404:
+                user.event_times.pop()
+                print('no /__notify__ hook on this server; running without new notifications', file=sys.stderr)
+                return
+            sim.metrics.events += 1
+
+
+class Simulation:
+    def __init__(self, args, mode, client, seed):
+        self.args = args
+        self.mode = mode
+        self.client = client
+        self.rng = random.Random(seed)
+        self.metrics = Metrics(mode)
+
+
+async def setup_users(args, client, rng):
+    users = []
+    for n in range(args.clients):
+        username, password = args.credentials[n % len(args.credentials)]
+        resp = await client.post('/login/', json={'username': username, 'password': password})
+        resp.raise_for_status()
+        user = SimUser(n, resp.json()['token'], tab_count(rng, args.tabs_mean, args.max_tabs))
+        # Baseline before any events, so every later increase is attributable.
+        resp = await client.get(COUNT_PATH, headers=user.headers)
+        resp.raise_for_status()
+        user.baseline = resp.json().get('count') or 0
+        users.append(user)
+    return users
+
+
+async def run_mode(args, mode):
+    rng = random.Random(args.seed)
+    parts = urlsplit(args.base_url)
+    origin = f'{parts.scheme}://{parts.netloc}'
+    async with Client(args.base_url, limit=args.clients * args.max_tabs + 16, timeout=args.wait + 30) as client:
+        users = await setup_users(args, client, rng)
+        sim = Simulation(args, mode, client, args.seed)
+        runner = {'poll': poll_tab, 'longpoll': longpoll_tab, 'sse': sse_tab}[mode]
+        # With --leader one tab per user holds the connection and relays to the others.
+        tabs = [u.tabs[0] for u in users] if args.leader else [t for u in users for t in u.tabs]
+        tasks = [asyncio.ensure_future(runner(sim, t)) for t in tabs]
+        tasks.append(asyncio.ensure_future(emit_events(sim, users, origin)))
+        await asyncio.sleep(args.duration)
+        sim.metrics.recorder.stop()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        summary = summarize(sim.metrics, users, sum(len(u.tabs) for u in users))
+        summary['connections_opened'] = client.connections_opened
+    return summary
+
+
+def summarize(m, users, tabs):
+    elapsed = m.recorder.elapsed
+    requests = m.recorder.summary()['endpoints']
+    count_ms = sorted(v * 1000 for name, values in m.recorder.samples.items()
+                      if name != 'GET /notifications/' for v in values)
+    delays = sorted(m.delays)
+    expected = sum(len(u.event_times) * len(u.tabs) for u in users)
+    return {
+        'mode': m.mode, 'clients': len(users), 'tabs': tabs, 'elapsed_s': elapsed,
+        'requests': m.requests, 'rps': m.requests / elapsed if elapsed else 0.0,
+        'messages': m.messages, 'no_change': m.no_change,
+        'no_change_share': m.no_change / m.messages if m.messages else 0.0,
+        'heartbeats': m.heartbeats, 'bytes': m.bytes, 'panel_fetches': m.panel_fetches,
+        'request_ms': {f'p{q}': percentile(count_ms, q) for q in (50, 95, 99)},
+        'events': m.events, 'deliveries': len(delays), 'undelivered': max(0, expected - len(delays)),
+        'delivery_s': {**{f'p{q}': percentile(delays, q) for q in (50, 95, 99)},
+                       'max': delays[-1] if delays else 0.0},
+        'endpoints': requests,
+    }
+
+
+def format_table(summaries):
+    rows = [
+        ('clients / tabs', lambda s: f"{s['clients']} / {s['tabs']}"),
+        ('requests', lambda s: f"{s['requests']}"),
+        ('requests/s', lambda s: f"{s['rps']:.2f}"),
+        ('no-change responses', lambda s: f"{s['no_change']} ({s['no_change_share']:.0%})"),
+        ('SSE heartbeats', lambda s: f"{s['heartbeats']}"),
+        ('panel fetches', lambda s: f"{s['panel_fetches']}"),
+        ('KiB received', lambda s: f"{s['bytes'] / 1024:,.1f}"),
+        ('request p50/p95/p99 ms', lambda s: '/'.join(f"{s['request_ms'][k]:.0f}" for k in ('p50', 'p95', 'p99'))),
+        ('events', lambda s: f"{s['events']}"),
+        ('badge updates (missed)', lambda s: f"{s['deliveries']} ({s['undelivered']})"),
+        ('delivery p50/p95/p99 s', lambda s: '/'.join(f"{s['delivery_s'][k]:.2f}" for k in ('p50', 'p95', 'p99'))),
+        ('connections opened', lambda s: f"{s['connections_opened']}"),
+    ]
+    width = max(24, *(len(s['mode']) + 2 for s in summaries))
+    lines = [f"{'':<24}" + ''.join(f"{s['mode']:>{width}}" for s in summaries)]
+    for label, cell in rows:
+        lines.append(f'{label:<24}' + ''.join(f'{cell(s):>{width}}' for s in summaries))
+    return '\n'.join(lines)
+
+
+async def run(args):
+    modes = MODES if args.mode == 'compare' else (args.mode,)
+    summaries = []
+    for mode in modes:
+        print(f'running {mode} for {args.duration:g} s ...', file=sys.stderr)
+        summaries.append(await run_mode(args, mode))
+    return summaries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    parser.add_argument('--mode', choices=MODES + ('compare',), default='poll')
+    parser.add_argument('--clients', type=int, default=100, help='signed-in users')
+    parser.add_argument('--tabs-mean', type=float, default=1.7, help='mean open tabs per user')
+    parser.add_argument('--max-tabs', type=int, default=8)
+    parser.add_argument('--leader', action='store_true',
+                        help='one tab per user talks to the server and shares the count with the others')
+    parser.add_argument('--interval', type=float, default=30.0, help='poll interval of the visible tab')
+    parser.add_argument('--hidden-interval', type=float, default=60.0,
+                        help='effective poll interval of background tabs (timer throttling)')
+    parser.add_argument('--jitter', type=float, default=1.0, help='+/- seconds of timer jitter')
+    parser.add_argument('--wait', type=float, default=25.0, help='long-poll hold time')
+    parser.add_argument('--heartbeat', type=float, default=15.0, help='SSE heartbeat interval')
+    parser.add_argument('--events-per-min', type=float, default=30.0, help='new notifications across all users')
+    parser.add_argument('--open-rate', type=float, default=0.3,
+                        help='chance the user opens the panel when the badge changes')
+    parser.add_argument('--duration', type=float, default=120.0, help='seconds per mode')
+    parser.add_argument('--user', action='append', default=[], metavar='USER:PASSWORD',
+                        help='account to log in with (repeatable; assigned round-robin)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='write the summaries here')
+    args = parser.parse_args(argv)
+    args.credentials = parse_credentials(args.user or ['volcan:123'])
+
+    summaries = asyncio.run(run(args))
+    print(format_table(summaries))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
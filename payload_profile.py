@@ -0,0 +1,294 @@
+"""Break API responses down by JSON path to see where the bytes go.
+
+Every value is attributed to a normalized path (array indices collapsed to
+`[]`), so the report shows e.g. how much of /communities/ is
+`[].projects[].shared_notes[].content`.  Paths are ranked twice: by total
+bytes, which the enclosing containers always top, and by self bytes -- what
+a path costs beyond its children (keys, punctuation, scalar values).  With
+--depth, deeper paths are folded into their ancestor's self bytes.
+
+Per endpoint it also reports gzip (and brotli, when the `brotli` package is
+installed) ratios, and counts subtrees that were already sent earlier -- in
+the same response or in a previous call -- which is what a refetch after
+every mutation costs.
+
+    python payload_profile.py --path /communities/ --calls 3
+    python payload_profile.py --path /communities/ --path /notes/ --save recorded/
+    python payload_profile.py recorded/*.json --depth 4 --top 15
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from api_client import DEFAULT_BASE_URL, Client
+
+# Strings shorter than this are too cheap to be worth reporting as repeats.
+MIN_DUP_BYTES = 64
+# Per-path compression is estimated on at most this much serialized data.
+SAMPLE_BYTES = 8 * 1024 * 1024
+
+
+def encode(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def format_path(components):
+    out = ''
+    for c in components:
+        out += '[]' if c is None else ('.' + c if out else c)
+    return out or '$'
+
+
+def ratios(data):
+    out = {'gzip': len(gzip.compress(data, 6)) / len(data) if data else 1.0}
+    if brotli is not None:
+        out['br'] = len(brotli.compress(data, quality=5)) / len(data) if data else 1.0
+    return out
+
+
+class PathStats:
+    __slots__ = ('count', 'bytes', 'self_bytes', 'dup_count', 'dup_bytes')
+
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+        self.self_bytes = 0
+        self.dup_count = 0
+        self.dup_bytes = 0
+
+
+class Profile:
+    """Accumulates path sizes and repeated subtrees over many responses."""
+
+    def __init__(self, depth=None):
+        self.depth = depth
+        self.endpoints = {}
+        self.seen = set()
+
+    def add(self, endpoint, doc, raw_bytes=None):
+        ep = self.endpoints.get(endpoint)
+        if ep is None:
+            ep = self.endpoints[endpoint] = {'calls': 0, 'bytes': 0, 'raw_bytes': 0, 'redundant_bytes': 0,
+                                             'paths': {}, 'sample': doc, 'sample_bytes': None}
+        data = encode(doc)
+        ep['calls'] += 1
+        ep['bytes'] += len(data)
+        ep['raw_bytes'] += len(data) if raw_bytes is None else raw_bytes
+        if ep['sample_bytes'] is None:
+            ep['sample_bytes'] = data
+        size, _, dup, pending = self._walk(doc, (), ep['paths'])
+        ep['redundant_bytes'] += size if dup else sum(pending)
+
+    def _walk(self, value, path, paths):
+        """Returns (size, digest, is_repeat, sizes of the outermost repeats below)."""
+        pending = []
+        if isinstance(value, dict):
+            h = hashlib.blake2b(b'{', digest_size=16)
+            size = 1 + max(0, len(value) - 1)
+            children = 0
+            for key, child in value.items():
+                kb = encode(key)
+                csize, cdigest, cdup, cpending = self._walk(child, path + (key,), paths)
+                size += len(kb) + 1 + csize
+                children += csize
+                h.update(kb)
+                h.update(cdigest)
+                pending.extend([csize] if cdup else cpending)
+            size += 1
+            digest = h.digest()
+        elif isinstance(value, list):
+            h = hashlib.blake2b(b'[', digest_size=16)
+            size = 1 + max(0, len(value) - 1)
+            children = 0
+            for child in value:
+                csize, cdigest, cdup, cpending = self._walk(child, path + (None,), paths)
+                size += csize
+                children += csize
+                h.update(cdigest)
+                pending.extend([csize] if cdup else cpending)
+            size += 1
+            digest = h.digest()
+        else:
+            data = encode(value)
+            size = len(data)
+            children = 0
+            # Fixed-width digests keep siblings apart in the parent's hash:
+            # [12, 3] must not hash like [1, 23].
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+
+        dup = False
+        if size >= MIN_DUP_BYTES:
+            if digest in self.seen:
+                dup = True
+            else:
+                self.seen.add(digest)
+
+        if self.depth is None or len(path) <= self.depth:
+            stats = paths.get(path)
+            if stats is None:
+                stats = paths[path] = PathStats()
+            stats.count += 1
+            stats.bytes += size
+            # At the depth limit everything below counts as this path's own.
+            stats.self_bytes += size if len(path) == self.depth else size - children
+            if dup:
+                stats.dup_count += 1
+                stats.dup_bytes += size
+        return size, digest, dup, pending
+
+    def report(self, top=25, compress=True):
+        out = {}
+        for name, ep in self.endpoints.items():
+            rows = {}
+
+            def ranked(attr):
+                items = sorted(ep['paths'].items(), key=lambda kv: -getattr(kv[1], attr))
+                return [row(path, s) for path, s in (items[:top] if top else items)]
+
+            def row(path, s):
+                if path not in rows:
+                    rows[path] = {'path': format_path(path), 'count': s.count, 'bytes': s.bytes,
+                                  'share': s.bytes / ep['bytes'] if ep['bytes'] else 0.0,
+                                  'self_bytes': s.self_bytes,
+                                  'self_share': s.self_bytes / ep['bytes'] if ep['bytes'] else 0.0,
+                                  'avg_bytes': s.bytes / s.count if s.count else 0.0,
+                                  'dup_count': s.dup_count, 'dup_bytes': s.dup_bytes}
+                    if compress and path:
+                        rows[path]['ratios'] = ratios(_sample(ep['sample'], path))
+                return rows[path]
+
+            out[name] = {'calls': ep['calls'], 'bytes': ep['bytes'], 'raw_bytes': ep['raw_bytes'],
+                         'redundant_bytes': ep['redundant_bytes'],
+                         'ratios': ratios(ep['sample_bytes']) if compress else {},
+                         'paths': ranked('bytes'), 'self_paths': ranked('self_bytes')}
+        return out
+
+
+def _values_at(value, path):
+    if not path:
+        yield value
+        return
+    head, rest = path[0], path[1:]
+    if head is None and isinstance(value, list):
+        for child in value:
+            yield from _values_at(child, rest)
+    elif isinstance(value, dict) and head in value:
+        yield from _values_at(value[head], rest)
+
+
+def _sample(doc, path):
+    parts = []
+    total = 0
+    for value in _values_at(doc, path):
+        data = encode(value)
+        parts.append(data)
+        total += len(data)
+        if total >= SAMPLE_BYTES:
+            break
+    return b'\n'.join(parts)
+
+
+def format_report(report):
+    lines = []
+    for name, ep in report.items():
+        comp = '  '.join(f'{k} {v:.1%}' for k, v in ep['ratios'].items())
+        per_call = ep['bytes'] / ep['calls'] if ep['calls'] else 0
+        lines.append(f"{name}: {ep['calls']} call(s), {per_call / 1024:,.1f} KiB per call"
+                     + (f'  ({comp})' if comp else ''))
+        if ep['bytes']:
+            lines.append(f"  already sent earlier: {ep['redundant_bytes'] / 1024:,.1f} KiB "
+                         f"({ep['redundant_bytes'] / ep['bytes']:.1%} of all bytes)")
+        codecs = list(ep['ratios'])
+        for title, rows in (('by total bytes', ep['paths']), ('by self bytes', ep['self_paths'])):
+            lines.append(f"  {title}")
+            lines.append(f"  {'path':<44} {'count':>8} {'KiB':>10} {'share':>7} {'self KiB':>10} {'self':>7} "
+                         f"{'avg B':>8} {'repeat':>7}" + ''.join(f' {c:>6}' for c in codecs))
+            for row in rows:
+                repeat = row['dup_bytes'] / row['bytes'] if row['bytes'] else 0.0
+                r = row.get('ratios', {})
+                cells = ''.join(f' {r[c]:>6.1%}' if c in r else f" {'':>6}" for c in codecs)
+                lines.append(f"  {row['path']:<44} {row['count']:>8} {row['bytes'] / 1024:>10,.1f} {row['share']:>7.1%} "
+                             f"{row['self_bytes'] / 1024:>10,.1f} {row['self_share']:>7.1%} "
+                             f"{row['avg_bytes']:>8.0f} {repeat:>7.1%}" + cells)
+            lines.append('')
+    return '\n'.join(lines).rstrip()
+
+
+def slug(path):
+    return re.sub(r'[^A-Za-z0-9]+', '-', path).strip('-') or 'root'
+
+
+def endpoint_of(filename):
+    """recorded/communities.0002.json -> communities"""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    return re.sub(r'\.\d+$', '', stem)
+
+
+async def fetch(args, profile):
+    async with Client(args.base_url) as client:
+        if args.token:
+            client.token = args.token
+        else:
+            await client.login(args.username, args.password)
+        for call in range(args.calls):
+            for path in args.path:
+                resp = await client.get(path)
+                resp.raise_for_status()
+                profile.add(path, resp.json(), raw_bytes=len(resp.body))
+                if args.save:
+                    os.makedirs(args.save, exist_ok=True)
+                    with open(os.path.join(args.save, f'{slug(path)}.{call + 1:04d}.json'), 'wb') as f:
+                        f.write(resp.body)
+            if args.interval and call + 1 < args.calls:
+                await asyncio.sleep(args.interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('files', nargs='*', help='recorded JSON responses (NAME.NNNN.json groups calls by NAME)')
+    parser.add_argument('--path', action='append', default=[], help='API path to fetch live (repeatable)')
+    parser.add_argument('--calls', type=int, default=2, help='times each live path is fetched')
+    parser.add_argument('--interval', type=float, default=0.0, help='seconds between live calls')
+    parser.add_argument('--save', help='directory to record live responses into')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    parser.add_argument('--username', default='volcan')
+    parser.add_argument('--password', default='123')
+    parser.add_argument('--token', help='skip login and use this token')
+    parser.add_argument('--depth', type=int, help="fold deeper paths into their ancestor's self bytes")
+    parser.add_argument('--top', type=int, default=25, help='paths shown per endpoint (0 = all)')
+    parser.add_argument('--no-compress', action='store_true', help='skip the compression estimates')
+    parser.add_argument('--json', help='write the report here')
+    args = parser.parse_args(argv)
+    if not args.files and not args.path:
+        parser.error('give recorded files or at least one --path')
+
+    profile = Profile(depth=args.depth)
+    for name in sorted(args.files):
+        with open(name, 'rb') as f:
+            raw = f.read()
+        profile.add(endpoint_of(name), json.loads(raw), raw_bytes=len(raw))
+    if args.path:
+        asyncio.run(fetch(args, profile))
+
+    report = profile.report(top=args.top, compress=not args.no_compress)
+    print(format_report(report))
+    if brotli is None and not args.no_compress:
+        print('\n(brotli ratios skipped: pip install brotli)', file=sys.stderr)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
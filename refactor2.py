@@ -1,137 +1,22 @@
+import os
 import re
+import sys
 import codecs
 
-path = '/home/volcan/Documentos/dev/volcan/frontend/src/pages/CommunityView.jsx'
-with codecs.open(path, 'r', 'utf-8') as f:
-    text = f.read()
-
-# 1. Modify CommunityView states:
-# Find: const [selectedProject, setSelectedProject] = useState(null);
-# Replace with selectedNote, isCreatingNote too
-text = text.replace(
-    "const [selectedProject, setSelectedProject] = useState(null);",
-    "const [selectedProject, setSelectedProject] = useState(null);\n    const [selectedNote, setSelectedNote] = useState(null);\n    const [isCreatingNote, setIsCreatingNote] = useState(false);\n"
-)
-
-# In CommunityView render block, pass them to CommunityPanel:
-text = text.replace(
-    'selectedProject={selectedProject} setSelectedProject={setSelectedProject} />',
-    'selectedProject={selectedProject} setSelectedProject={setSelectedProject} selectedNote={selectedNote} setSelectedNote={setSelectedNote} isCreatingNote={isCreatingNote} setIsCreatingNote={setIsCreatingNote} />'
-)
-
-# And clear them when changing community:
-text = text.replace(
-    'onClick={() => { setSelected(c); setSelectedProject(null); }}',
-    'onClick={() => { setSelected(c); setSelectedProject(null); setSelectedNote(null); setIsCreatingNote(false); }}'
-)
-
-# 2. In CommunityPanel props:
-text = text.replace(
-    'onClose, selectedProject, setSelectedProject }) => {',
-    'onClose, selectedProject, setSelectedProject, selectedNote, setSelectedNote, isCreatingNote, setIsCreatingNote }) => {'
-)
-
-# Pass them to ProjectDetail:
-text = text.replace(
-    "onClose={() => { setSelectedProject(null); setProjectData(null); }} />;",
-    "onClose={() => { setSelectedProject(null); setProjectData(null); }} selectedNote={selectedNote} setSelectedNote={setSelectedNote} isCreatingNote={isCreatingNote} setIsCreatingNote={setIsCreatingNote} />;"
-)
-
-# 3. In ProjectDetail props:
-text = text.replace(
-    'const ProjectDetail = ({ project, theme, onUpdate, onClose }) => {',
-    'const ProjectDetail = ({ project, theme, onUpdate, onClose, selectedNote, setSelectedNote, isCreatingNote, setIsCreatingNote }) => {'
-)
-
-# Remove local states from ProjectDetail:
-text = text.replace('const [selectedNote, setSelectedNote] = useState(null);\n', '')
-text = text.replace('const [isCreatingNote, setIsCreatingNote] = useState(false);\n', '')
-
-# Also we should clear note states when project is closed (meaning we go back):
-# Wait, changing project or going back should clear note.
-text = text.replace(
-    'onClose={() => { setSelectedProject(null); setProjectData(null); }}',
-    'onClose={() => { setSelectedProject(null); setProjectData(null); setSelectedNote(null); setIsCreatingNote(false); }}'
-)
-
-# 4. Hide the red box in ProjectDetail!
-# In ProjectDetail:
-# The header starts at: {/* Breadcrumb / header */}
-# And the tabs: {/* Tabs */}
-# They are both before ` {/* Tab content */}`
-# I can just wrap them:
-start_wrapper = "{!(selectedNote || isCreatingNote) && (\n            <>\n"
-end_wrapper = "            </>\n            )}\n"
-
-red_box_pattern = r"(<div className={`flex items-center justify-between px-4 md:px-8 py-4 border-b \$\{s\.divider\}`}.*?){\/\* Tab content \*\/}"
-# Wait, parsing this with regex is tricky. Let's do exact replace. We can just use string replace for key areas.
-breadcrumbs_old = "{/* Breadcrumb / header */}"
-breadcrumbs_new = "{/* Breadcrumb / header */}\n            {!(selectedNote || isCreatingNote) && (\n            <>"
-tabs_end = "                    </button>\n                ))}\n            </div>"
-tabs_end_new = "                    </button>\n                ))}\n            </div>\n            </>)}"
-
-text = text.replace(breadcrumbs_old, breadcrumbs_new)
-text = text.replace(tabs_end, tabs_end_new)
-
-
-# 5. Hide the Notes sidebar entirely in ProjectDetail.
-# There is: ` {/* Notes sidebar */}` ... up to `{/* Note editor/viewer */}`
-notes_sidebar_start = text.find("{/* Notes sidebar */}")
-note_editor_start = text.find("{/* Note editor/viewer */}", notes_sidebar_start)
-if notes_sidebar_start != -1 and note_editor_start != -1:
-    text = text[:notes_sidebar_start] + text[note_editor_start:]
-
-# Also, since the Notes sidebar is gone, the wrapper `<div className="flex-1 flex overflow-hidden">` might not need changes, it will just contain the note editor.
-# WAIT! The original note editor had a condition:
-# `className={`flex-1 flex flex-col overflow-hidden ${s.mainBg} ${!(selectedNote || isCreatingNote) ? 'hidden md:flex' : ''}`}`
-# We can just leave that condition as is, it's just classes.
-
-
-# 6. Global sidebar: inject notes into the Project button!
-# Inside CommunityView:
-# We have `{c.projects.map(p => (` and inside the button we do `onClick={() => setSelectedProject(p)}`
-# And then we need to add the notes list right under it.
-
-project_btn_replace = """
-                                                            className={`w-full text-left flex items-center gap-2 px-2 py-1 rounded text-xs transition-colors hover:text-white ${selectedProject?.id === p.id ? 'text-white font-medium bg-white/5' : s.muted}` }>
-                                                            <FolderOpen size={12} className={selectedProject?.id === p.id ? 'text-cyber-primary' : 'opacity-70'} />
-                                                            <span className="truncate">{p.name}</span>
-                                                        </button>
-"""
+from codemod import Engine, Rule
 
-new_project_inner = """
-                                                            className={`w-full text-left flex items-center gap-2 px-2 py-1.5 rounded text-xs transition-colors hover:text-white ${selectedProject?.id === p.id ? 'text-white font-medium bg-white/5' : s.muted}` }>
-                                                            <FolderOpen size={13} className={selectedProject?.id === p.id ? 'text-cyber-primary' : 'opacity-70'} />
-                                                            <span className="truncate">{p.name}</span>
-                                                        </button>
-                                                        {selectedProject?.id === p.id && (
-                                                            <div className="mt-1 flex flex-col gap-0.5 relative before:absolute before:left-[7px] before:top-0 before:bottom-3 before:w-px before:bg-white/10">
-                                                                {(p.shared_notes || []).map(note => (
-                                                                    <button key={note.id} onClick={(e) => { e.stopPropagation(); setSelectedNote(note); setIsCreatingNote(false); setTimeout(() => document.querySelector('.tiptap-wrapper')?.scrollIntoView({behavior: 'smooth'}), 50); }}
-                                                                        className={`w-full text-left flex items-center gap-2 pl-[22px] pr-2 py-1.5 rounded-md text-[11px] font-medium transition-all group ${selectedNote?.id === note.id ? s.noteItemActive : s.noteItemDefault}`}>
-                                                                        <FileText size={11} className={`flex-shrink-0 ${selectedNote?.id === note.id ? 'opacity-100' : 'opacity-50'}`} />
-                                                                        <span className="truncate">{note.title}</span>
-                                                                    </button>
-                                                                ))}
-                                                                <button onClick={(e) => { e.stopPropagation(); setSelectedNote(null); setIsCreatingNote(true); }}
-                                                                    className={`w-full text-left flex items-center gap-2 pl-[22px] pr-2 py-1.5 rounded-md text-[11px] font-medium transition-all group ${s.noteItemDefault}`}>
-                                                                    <Plus size={11} className="flex-shrink-0 opacity-50 group-hover:opacity-100" />
-                                                                    <span className="truncate opacity-75 group-hover:opacity-100">Nueva página</span>
-                                                                </button>
-                                                                
-                                                                <button onClick={() => { setTab('tasks'); setSelectedNote(null); setIsCreatingNote(false); }}
-                                                                    className={`w-full text-left flex items-center gap-2 pl-[22px] pr-2 py-1.5 rounded-md text-[11px] pt-3 font-medium transition-all group ${s.noteItemDefault}`}>
-                                                                    <CheckSquare size={11} className="flex-shrink-0 opacity-50 group-hover:opacity-100" />
-                                                                    <span className="truncate opacity-75 group-hover:opacity-100">Tareas del proyecto</span>
-                                                                </button>
-                                                            </div>
-                                                        )}
-"""
-# Note: we also add a button to go back to TASKS! We probably need to lift `tab` and `setTab` OR we just use a small hack. Wait, `setTab` is inside `ProjectDetail`. The user might be trapped inside the Note if the tabs are hidden!
-# If the tabs are hidden, clicking the Project button again or a "Tareas" button inside the sidebar would be amazing!
-# But `setTab` is strictly inside `ProjectDetail`. If we click the Project title, does it reset the note?
-# `onClick={() => setSelectedProject(p)}` from the global sidebar DOES NOT clear `selectedNote` currently. Let's make it clear `selectedNote`:
-# Wait, changing `selectedProject` should clear `selectedNote`.
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'pages', 'CommunityView.jsx')
+
+FILES = ['src/pages/CommunityView.jsx']
+
+# Lift selectedNote / isCreatingNote from ProjectDetail up to CommunityView and
+# move the project's pages into the global sidebar.  Every rule is applied in a
+# single pass over the original text, so rules that used to build on each
+# other's output are written out in their final form here.
+
+# Global sidebar: inject notes into the Project button!
+# Changing `selectedProject` should clear `selectedNote`, and since the tabs are
+# hidden while a note is open, the sidebar also gets a way back to the tasks.
 
 new_projects_tree = """
                                                         <button 
@@ -166,22 +51,66 @@ new_projects_tree = """
                                                         )}
 """
 
-# Let's cleanly replace the mapping in CommunityView
-start_map = "{c.projects.map(p => ("
-end_map = "                                            </div>\n                                        )}\n                                    </div>"
-
-if start_map in text:
-    top_split = text.split(start_map)[0]
-    btm_split = text.split(end_map)[1]
-    
-    new_map = """{c.projects.map(p => (
+new_map = """{c.projects.map(p => (
                                                     <div key={p.id} className="pl-4 border-l border-white/10 ml-5 py-0.5">
 """ + new_projects_tree + """                                                    </div>
                                                 ))}
 """
-    text = top_split + new_map + btm_split
 
-with codecs.open(path, 'w', 'utf-8') as f:
-    f.write(text)
+start_map = "{c.projects.map(p => ("
+end_map = "                                            </div>\n                                        )}\n                                    </div>"
 
-print("Saved!")
+RULES = [
+    # 1. CommunityView owns the note selection state.
+    Rule("const [selectedProject, setSelectedProject] = useState(null);",
+         "const [selectedProject, setSelectedProject] = useState(null);\n    const [selectedNote, setSelectedNote] = useState(null);\n    const [isCreatingNote, setIsCreatingNote] = useState(false);\n"),
+    # ... passes it to CommunityPanel ...
+    Rule('selectedProject={selectedProject} setSelectedProject={setSelectedProject} />',
+         'selectedProject={selectedProject} setSelectedProject={setSelectedProject} selectedNote={selectedNote} setSelectedNote={setSelectedNote} isCreatingNote={isCreatingNote} setIsCreatingNote={setIsCreatingNote} />'),
+    # ... and clears it when changing community.
+    Rule('onClick={() => { setSelected(c); setSelectedProject(null); }}',
+         'onClick={() => { setSelected(c); setSelectedProject(null); setSelectedNote(null); setIsCreatingNote(false); }}'),
+
+    # 2. CommunityPanel forwards it to ProjectDetail, clearing the note when the project is closed.
+    Rule('onClose, selectedProject, setSelectedProject }) => {',
+         'onClose, selectedProject, setSelectedProject, selectedNote, setSelectedNote, isCreatingNote, setIsCreatingNote }) => {'),
+    Rule("onClose={() => { setSelectedProject(null); setProjectData(null); }} />;",
+         "onClose={() => { setSelectedProject(null); setProjectData(null); setSelectedNote(null); setIsCreatingNote(false); }} selectedNote={selectedNote} setSelectedNote={setSelectedNote} isCreatingNote={isCreatingNote} setIsCreatingNote={setIsCreatingNote} />;"),
+    Rule('onClose={() => { setSelectedProject(null); setProjectData(null); }}',
+         'onClose={() => { setSelectedProject(null); setProjectData(null); setSelectedNote(null); setIsCreatingNote(false); }}', expect=0),
+
+    # 3. ProjectDetail receives the state as props and drops its local copies.
+    Rule('const ProjectDetail = ({ project, theme, onUpdate, onClose }) => {',
+         'const ProjectDetail = ({ project, theme, onUpdate, onClose, selectedNote, setSelectedNote, isCreatingNote, setIsCreatingNote }) => {'),
+    Rule('const [selectedNote, setSelectedNote] = useState(null);\n', ''),
+    Rule('const [isCreatingNote, setIsCreatingNote] = useState(false);\n', ''),
+
+    # 4. Hide the breadcrumb header and the tabs while a note is open.
+    Rule("{/* Breadcrumb / header */}",
+         "{/* Breadcrumb / header */}\n            {!(selectedNote || isCreatingNote) && (\n            <>"),
+    Rule("                    </button>\n                ))}\n            </div>",
+         "                    </button>\n                ))}\n            </div>\n            </>)}"),
+
+    # 5. Drop ProjectDetail's own Notes sidebar; the note editor keeps its classes.
+    Rule(r"\{/\* Notes sidebar \*/\}.*?(?=\{/\* Note editor/viewer \*/\})", '',
+         regex=True, flags=re.S, count=1, name='Notes sidebar'),
+
+    # 6. Replace the project list in the global sidebar.
+    Rule(re.escape(start_map) + '.*?' + re.escape(end_map), lambda m: new_map,
+         regex=True, flags=re.S, count=1, name='sidebar projects map'),
+]
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+
+    with codecs.open(path, 'r', 'utf-8') as f:
+        text = f.read()
+
+    result = Engine(RULES).apply(text)
+    print(result.report())
+
+    with codecs.open(path, 'w', 'utf-8') as f:
+        f.write(result.text)
+
+    print("Saved!")
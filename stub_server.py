@@ -0,0 +1,602 @@
+"""Local stand-in for the backend API, serving a synthetic dataset.
+
+Implements the endpoints the frontend calls (see src/services/api.js) with
+the same response shapes, over a small asyncio HTTP/1.1 server with
+keep-alive.  Large listings are generated while they are written out as a
+chunked response, so /communities/ with a million shared notes streams in
+constant memory.
+
+Besides the real routes there are two stand-ins for transports the backend
+does not have yet: long-polling `/notifications/unread_count/?since=V&wait=S`
+and server-sent events on `/notifications/stream/`.  POST /__notify__ pushes
+new notifications to a session (see notify_sim.py).  Note PATCHes also accept
+`content_delta` (see note_delta.py) instead of the full content.
+
+Read-only listings carry an ETag and Last-Modified that change with every
+write, and answer If-None-Match / If-Modified-Since for an existing resource
+with 304 without building the body (see cassette.py).
+
+    python stub_server.py --port 8000 --notes 100000 --sessions 1000000
+
+Log in as `volcan` (any password) like the other scripts do.
+"""
+import argparse
+import asyncio
+import hashlib
+import inspect
+import json
+import re
+import sys
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+
+import dataset
+import note_delta
+
+CHUNK_BYTES = 64 * 1024
+REASONS = {200: 'OK', 201: 'Created', 204: 'No Content', 304: 'Not Modified', 400: 'Bad Request',
+           401: 'Unauthorized', 404: 'Not Found', 405: 'Method Not Allowed', 409: 'Conflict', 500: 'Internal Server Error'}
+
+
+class HttpError(Exception):
+    def __init__(self, status, detail=None):
+        super().__init__(detail or REASONS.get(status, ''))
+        self.status = status
+        self.detail = detail or REASONS.get(status, '')
+
+
+class Request:
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.user = None
+        self.token = None
+
+    def json(self):
+        try:
+            return json.loads(self.body) if self.body else {}
+        except ValueError:
+            raise HttpError(400, 'Invalid JSON')
+
+
+def _parse_query(qs):
+    out = {}
+    for part in qs.split('&'):
+        if part:
+            k, _, v = part.partition('=')
+            out[k] = v
+    return out
+
+
+class Inbox:
+    """Unread count of one session, with a way to wait for it to change."""
+
+    def __init__(self, count):
+        self.count = count
+        self.version = 0
+        self._changed = asyncio.Event()
+
+    def set(self, count):
+        if count == self.count:
+            return
+        self.count = count
+        self.version += 1
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait(self, version, timeout):
+        """Return once the version differs from `version`, or after timeout seconds."""
+        if self.version != version:
+            return
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def event(self):
+        return f"event: unread\ndata: {json.dumps({'count': self.count, 'version': self.version})}\n\n"
+
+
+def route(method, pattern, cached=False, mutating=None):
+    """Mark a handler; `cached` GETs get validators and conditional 304s.
+
+    `mutating` handlers change served data and so invalidate validators; by
+    default every method but GET does.
+    """
+    def decorate(fn):
+        fn.route = (method, re.compile(pattern + '$'))
+        fn.cached = cached
+        fn.mutating = method != 'GET' if mutating is None else mutating
+        return fn
+    return decorate
+
+
+# Serialized records kept in the LRU.  Each costs about its JSON size plus
+# ~0.4 KB of overhead: ~2.2 KB at the default --content-bytes 1500, so
+# 5,000 records add ~11 MB of RSS (50,000 would add ~110 MB).
+CACHE_RECORDS = 5000
+
+
+class StubServer:
+    def __init__(self, data, prefix='/api', delay=0.0, cache_records=CACHE_RECORDS):
+        self.data = data
+        self.prefix = prefix
+        self.delay = delay
+        self.tokens = {}
+        self.overrides = {}
+        self.created = {}
+        self.deleted = set()
+        self.unread = data.notifications // 3
+        self.inboxes = {}
+        self.requests = {}
+        self.started = time.time()
+        # Bumped by every data change (not logins); the validators of cached GETs derive from it.
+        self.revision = 0
+        self.modified = self.started
+        self._etag_base = hashlib.sha1(f'{json.dumps(data.config(), sort_keys=True)}:{self.started}'
+                                       .encode()).hexdigest()[:12]
+        self._reports = None
+        self._server = None
+        # Serialized records, so hot listings are not regenerated per request.
+        self._encoded = OrderedDict()
+        self.cache_records = cache_records
+        self.routes = [getattr(self, name).route + (getattr(self, name),)
+                       for name in dir(self) if hasattr(getattr(self, name), 'route')]
+
+    # -- plumbing ----------------------------------------------------------
+
+    async def start(self, host='127.0.0.1', port=8000):
+        self._server = await asyncio.start_server(self._handle, host, port, limit=2 ** 20)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, target, version = line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b'\r\n', b'\n', b''):
+                        break
+                    k, _, v = h.decode('latin-1').partition(':')
+                    headers[k.strip().lower()] = v.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0) or 0))
+                path, _, qs = target.partition('?')
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                req = Request(method, path, _parse_query(qs), headers, body)
+                await self._respond(writer, req, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, req, keep_alive):
+        try:
+            status, payload, extra = await self.dispatch(req)
+        except HttpError as e:
+            status, payload, extra = e.status, {'detail': e.detail}, {}
+        except Exception as e:  # keep serving; surface the error to the client
+            status, payload, extra = 500, {'detail': f'{type(e).__name__}: {e}'}, {}
+        events = inspect.isasyncgen(payload)
+        head = [f'HTTP/1.1 {status} {REASONS.get(status, "")}',
+                f'Date: {formatdate(usegmt=True)}',
+                f'Content-Type: {"text/event-stream" if events else "application/json"}',
+                f'Connection: {"keep-alive" if keep_alive else "close"}']
+        head.extend(f'{k}: {v}' for k, v in extra.items())
+        if events:
+            # Server-sent events: one chunk per event, flushed immediately,
+            # until the client goes away.
+            writer.write(('\r\n'.join(head + ['Cache-Control: no-cache', 'Transfer-Encoding: chunked'])
+                          + '\r\n\r\n').encode('latin-1'))
+            try:
+                async for piece in payload:
+                    piece = piece.encode('utf-8')
+                    writer.write(b'%x\r\n%s\r\n' % (len(piece), piece))
+                    await writer.drain()
+            finally:
+                await payload.aclose()
+        elif payload is None:
+            writer.write(('\r\n'.join(head + ['Content-Length: 0']) + '\r\n\r\n').encode('latin-1'))
+        elif isinstance(payload, bytes) or not _is_lazy(payload):
+            body = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            writer.write(('\r\n'.join(head + [f'Content-Length: {len(body)}']) + '\r\n\r\n').encode('latin-1') + body)
+        else:
+            writer.write(('\r\n'.join(head + ['Transfer-Encoding: chunked']) + '\r\n\r\n').encode('latin-1'))
+            buf, size = [], 0
+            for piece in dataset.iter_json(payload):
+                piece = piece.encode('utf-8')
+                buf.append(piece)
+                size += len(piece)
+                if size >= CHUNK_BYTES:
+                    writer.write(b'%x\r\n%s\r\n' % (size, b''.join(buf)))
+                    buf, size = [], 0
+                    await writer.drain()
+            if size:
+                writer.write(b'%x\r\n%s\r\n' % (size, b''.join(buf)))
+            writer.write(b'0\r\n\r\n')
+        await writer.drain()
+
+    async def dispatch(self, req):
+        if req.path == '/__stats__':
+            return 200, self.stats(), {}
+        if req.path == '/__notify__' and req.method == 'POST':
+            return 200, self.notify(req), {}
+        if not req.path.startswith(self.prefix):
+            raise HttpError(404)
+        path = req.path[len(self.prefix):]
+        for method, pattern, handler in self.routes:
+            m = pattern.match(path)
+            if m and method == req.method:
+                key = f'{method} {pattern.pattern[:-1]}'
+                self.requests[key] = self.requests.get(key, 0) + 1
+                if handler.__name__ not in ('login', 'token', 'register'):
+                    self.authenticate(req)
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                validators = self.validators() if handler.cached else {}
+                # The handler runs first so a missing resource is still a 404;
+                # cached handlers return lazy payloads, so this is cheap.
+                result = handler(req, *m.groups())
+                if inspect.iscoroutine(result):
+                    result = await result
+                if validators and self.not_modified(req, validators):
+                    return 304, None, validators
+                if handler.mutating:
+                    self.revision += 1
+                    self.modified = time.time()
+                if not isinstance(result, tuple):
+                    result = (200, result)
+                status, payload, extra = result if len(result) == 3 else result + ({},)
+                return status, payload, {**validators, **extra}
+        if any(pattern.match(path) for _, pattern, _ in self.routes):
+            raise HttpError(405)
+        raise HttpError(404)
+
+    def authenticate(self, req):
+        auth = req.headers.get('authorization', '')
+        scheme, _, token = auth.partition(' ')
+        user = self.tokens.get(token) if scheme in ('Token', 'Bearer') else None
+        if user is None:
+            raise HttpError(401, 'Authentication credentials were not provided.')
+        req.user = user
+        req.token = token
+
+    def validators(self):
+        return {'ETag': f'W/"{self._etag_base}-{self.revision}"',
+                'Last-Modified': formatdate(self.modified, usegmt=True)}
+
+    def not_modified(self, req, validators):
+        if 'if-none-match' in req.headers:
+            tags = [t.strip() for t in req.headers['if-none-match'].split(',')]
+            return '*' in tags or validators['ETag'] in tags
+        since = req.headers.get('if-modified-since')
+        if since:
+            try:
+                return int(self.modified) <= parsedate_to_datetime(since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def stats(self):
+        return {'uptime_s': time.time() - self.started, 'requests': dict(sorted(self.requests.items())),
+                'dataset': self.data.config()}
+
+    def notify(self, req):
+        """Test hook: deliver `count` new notifications to one session (by token) or to all."""
+        body = req.json()
+        count = int(body.get('count', 1))
+        token = body.get('token')
+        targets = [self.inbox(token)] if token in self.tokens else [] if token else list(self.inboxes.values())
+        for inbox in targets:
+            inbox.set(inbox.count + count)
+        return {'delivered': len(targets)}
+
+    def inbox(self, token):
+        inbox = self.inboxes.get(token)
+        if inbox is None:
+            inbox = self.inboxes[token] = Inbox(self.unread)
+        return inbox
+
+    # -- records with local edits -------------------------------------------
+
+    def _record(self, kind, pk, build):
+        if (kind, pk) in self.deleted:
+            raise HttpError(404)
+        if (kind, pk) in self.created:
+            return self.created[(kind, pk)]
+        item = build()
+        item.update(self.overrides.get((kind, pk), {}))
+        return item
+
+    def shared_note(self, pk):
+        if not (0 < pk <= self.data.shared_notes) and ('shared_note', pk) not in self.created:
+            raise HttpError(404)
+        return self._record('shared_note', pk, lambda: self.data.shared_note(pk - 1))
+
+    def note(self, pk):
+        if not (0 < pk <= self.data.notes) and ('note', pk) not in self.created:
+            raise HttpError(404)
+        return self._record('note', pk, lambda: self.data.note(pk - 1))
+
+    def _encoded_record(self, kind, pk, build):
+        key = (kind, pk)
+        raw = self._encoded.get(key)
+        if raw is None:
+            raw = dataset.RawJSON(json.dumps(self._record(kind, pk, build), ensure_ascii=False))
+            if self.cache_records:
+                self._encoded[key] = raw
+                if len(self._encoded) > self.cache_records:
+                    self._encoded.popitem(last=False)
+        else:
+            self._encoded.move_to_end(key)
+        return raw
+
+    def _patch(self, kind, pk, req, fields):
+        body = req.json()
+        changes = {k: v for k, v in body.items() if k in fields}
+        if 'content_delta' in body and 'content' in fields:
+            # See note_delta.py: the edit is applied to the stored content.
+            try:
+                stored = self.created.get((kind, pk)) or self.overrides.get((kind, pk)) or {}
+                current = stored['content'] if 'content' in stored else getattr(self, kind)(pk)['content']
+                changes['content'] = note_delta.apply(current, body['content_delta'])
+            except note_delta.DeltaError as e:
+                raise HttpError(409 if e.conflict else 400, str(e))
+        changes['updated_at'] = dataset._iso(time.time())
+        self._encoded.pop((kind, pk), None)
+        if (kind, pk) in self.created:
+            self.created[(kind, pk)].update(changes)
+        else:
+            self.overrides.setdefault((kind, pk), {}).update(changes)
+
+    def _patched(self, req, item):
+        # `Prefer: return=minimal` skips echoing the whole note back; the
+        # hash is the base for the next content_delta.
+        if 'return=minimal' in req.headers.get('prefer', ''):
+            return {'id': item['id'], 'updated_at': item['updated_at'],
+                    'content_hash': note_delta.content_hash(item.get('content') or '')}
+        return item
+
+    def _create(self, kind, base, req, fields):
+        pk = base + sum(1 for k in self.created if k[0] == kind) + 1
+        item = {k: v for k, v in req.json().items() if k in fields}
+        item.update(id=pk, created_at=dataset._iso(time.time()), updated_at=dataset._iso(time.time()))
+        self.created[(kind, pk)] = item
+        return pk, item
+
+    def _listing(self, kind, ids, build, project=None):
+        """Generated records, then created ones (only those of `project`, if given)."""
+        for pk in ids:
+            if (kind, pk) not in self.deleted:
+                yield self._encoded_record(kind, pk, lambda: build(pk))
+        for (k, pk), item in list(self.created.items()):
+            if k == kind and (kind, pk) not in self.deleted and (project is None or _pk(item.get('project')) == project):
+                yield item
+
+    # -- auth --------------------------------------------------------------
+
+    @route('POST', r'/login/', mutating=False)
+    def login(self, req):
+        username = req.json().get('username')
+        if username != self.data.username:
+            raise HttpError(400, 'Unable to log in with provided credentials.')
+        return self._issue_token(self.data.user(1))
+
+    @route('POST', r'/token/', mutating=False)
+    def token(self, req):
+        # The backend's JWT pair endpoint; the access token goes out as Bearer.
+        token = self.login(req)['token']
+        return {'access': token, 'refresh': token}
+
+    @route('POST', r'/register/', mutating=False)
+    def register(self, req):
+        username = req.json().get('username') or ''
+        if not username:
+            raise HttpError(400, 'username is required')
+        return 201, self._issue_token({'id': 10 ** 6 + len(self.tokens), 'username': username,
+                                       'display_name': username})
+
+    def _issue_token(self, user):
+        token = hashlib.sha1(f"{user['username']}:{len(self.tokens)}".encode()).hexdigest()
+        self.tokens[token] = user
+        return {'token': token, 'user_id': user['id'], 'username': user['username']}
+
+    @route('GET', r'/me/')
+    def me(self, req):
+        return {'id': req.user['id'], 'username': req.user['username'],
+                'profile': {'display_name': req.user['display_name']}}
+
+    # -- communities -------------------------------------------------------
+
+    @route('GET', r'/communities/', cached=True)
+    def communities(self, req):
+        return (self._community(c) for c in range(1, self.data.communities + 1))
+
+    def _community(self, community_id):
+        data = self.data.community(community_id)
+        data['projects'] = (self._project(p['id']) for p in data['projects'])
+        return data
+
+    def _project(self, project_id):
+        data = self.data.project(project_id, notes=False)
+        data['shared_notes'] = self._listing('shared_note', [i + 1 for i in self.data.project_note_ids(project_id)],
+                                             lambda pk: self.data.shared_note(pk - 1), project=project_id)
+        return data
+
+    @route('GET', r'/shared-projects/(\d+)/', cached=True)
+    def shared_project(self, req, pk):
+        pk = int(pk)
+        if not 0 < pk <= self.data.projects:
+            raise HttpError(404)
+        return self._project(pk)
+
+    @route('POST', r'/shared-notes/')
+    def create_shared_note(self, req):
+        pk, item = self._create('shared_note', self.data.shared_notes, req, ('project', 'title', 'content'))
+        item['created_by_name'] = req.user['display_name']
+        return 201, item
+
+    @route('PATCH', r'/shared-notes/(\d+)/')
+    def patch_shared_note(self, req, pk):
+        pk = int(pk)
+        self.shared_note(pk)
+        self._patch('shared_note', pk, req, ('title', 'content'))
+        return self._patched(req, self.shared_note(pk))
+
+    @route('DELETE', r'/shared-notes/(\d+)/')
+    def delete_shared_note(self, req, pk):
+        self.shared_note(int(pk))
+        self.deleted.add(('shared_note', int(pk)))
+        return 204, None
+
+    # -- personal notes ----------------------------------------------------
+
+    @route('GET', r'/notes/', cached=True)
+    def notes(self, req):
+        return self._listing('note', range(1, self.data.notes + 1), lambda pk: self.data.note(pk - 1))
+
+    @route('POST', r'/notes/')
+    def create_note(self, req):
+        return 201, self._create('note', self.data.notes, req, ('title', 'content', 'note_type'))[1]
+
+    @route('PATCH', r'/notes/(\d+)/')
+    def patch_note(self, req, pk):
+        pk = int(pk)
+        self.note(pk)
+        self._patch('note', pk, req, ('title', 'content', 'note_type'))
+        return self._patched(req, self.note(pk))
+
+    @route('DELETE', r'/notes/(\d+)/')
+    def delete_note(self, req, pk):
+        self.note(int(pk))
+        self.deleted.add(('note', int(pk)))
+        return 204, None
+
+    # -- focus sessions ----------------------------------------------------
+
+    @route('GET', r'/focus-sessions/reports/', cached=True)
+    def reports(self, req):
+        if self._reports is None:
+            self._reports = self.data.reports()
+        return self._reports
+
+    @route('POST', r'/focus-sessions/')
+    def create_session(self, req):
+        self._reports = None
+        return 201, self._create('session', self.data.sessions, req,
+                                 ('tag', 'project', 'duration_minutes', 'is_completed', 'end_time'))[1]
+
+    @route('GET', r'/projects/', cached=True)
+    def projects(self, req):
+        return [self.data.project(p, notes=False) for p in range(1, min(self.data.projects, 20) + 1)]
+
+    # -- notifications -----------------------------------------------------
+
+    @route('GET', r'/notifications/unread_count/')
+    async def unread_count(self, req):
+        # Long-poll stand-in: with ?since=<version>&wait=<s> the response is
+        # held until the count changes or the wait runs out.
+        inbox = self.inbox(req.token)
+        if 'since' in req.query:
+            try:
+                since, wait = int(req.query['since']), float(req.query.get('wait', 25))
+            except ValueError:
+                raise HttpError(400, 'since and wait must be numbers')
+            await inbox.wait(since, min(wait, 120.0))
+        return {'count': inbox.count, 'version': inbox.version}
+
+    @route('GET', r'/notifications/stream/')
+    def notification_stream(self, req):
+        return self._events(self.inbox(req.token),
+                            float(req.query.get('heartbeat', 15)))
+
+    async def _events(self, inbox, heartbeat):
+        """SSE stand-in: the current count, then one event per change, with comment heartbeats."""
+        version = inbox.version
+        yield 'retry: 3000\n\n' + inbox.event()
+        while True:
+            await inbox.wait(version, heartbeat)
+            if inbox.version == version:
+                yield ': ping\n\n'
+            else:
+                version = inbox.version
+                yield inbox.event()
+
+    @route('GET', r'/notifications/', cached=True)
+    def notifications(self, req):
+        return list(self.data.iter_notifications())
+
+    @route('POST', r'/notifications/mark_all_read/')
+    def mark_all_read(self, req):
+        self.inbox(req.token).set(0)
+        return {'status': 'ok'}
+
+    @route('POST', r'/notifications/(\d+)/(accept|reject|mark_read)/')
+    def notification_action(self, req, pk, action):
+        inbox = self.inbox(req.token)
+        inbox.set(max(0, inbox.count - 1))
+        return {'status': action}
+
+
+def _pk(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_lazy(payload):
+    if hasattr(payload, '__next__'):
+        return True
+    if isinstance(payload, dict):
+        return any(_is_lazy(v) for v in payload.values())
+    if isinstance(payload, (list, tuple)):
+        return any(_is_lazy(v) for v in payload)
+    return False
+
+
+async def serve(args):
+    server = StubServer(dataset.from_args(args), delay=args.delay_ms / 1000, cache_records=args.cache_records)
+    port = await server.start(args.host, args.port)
+    print(f'Serving {server.data.config()} on http://{args.host}:{port}{server.prefix}', flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--delay-ms', type=float, default=0.0, help='artificial per-request latency')
+    parser.add_argument('--cache-records', type=int, default=CACHE_RECORDS,
+                        help='serialized records kept in memory (~2.2 KB each at the default content size)')
+    dataset.add_arguments(parser)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,38 @@
-import requests
+import asyncio
 import json
-try:
-    # First login to get a token:
-    login_resp = requests.post('http://127.0.0.1:8000/api/token/', json={'username': 'volcan', 'password': '123'})
-    token = login_resp.json().get('access')
-    headers = {'Authorization': f'Bearer {token}'}
-
-    resp = requests.get('http://127.0.0.1:8000/api/communities/', headers=headers)
-    data = resp.json()
-    print(json.dumps(data[0]['projects'][0], indent=2))
-except Exception as e:
-    print(e)
+import sys
+
+from api_client import DEFAULT_BASE_URL, ApiError
+from cassette import Cassette, CassetteClient
+from json_stream import aselect
+
+# Responses are recorded in .api-cassette: later runs revalidate them with
+# the server (a 304 when nothing changed).  Pass --replay to run offline from
+# the recording.
+MODE = 'replay' if '--replay' in sys.argv[1:] else 'live'
+
+
+async def main():
+    with Cassette('.api-cassette') as cassette:
+        async with CassetteClient(DEFAULT_BASE_URL, cassette, mode=MODE) as client:
+            # First login to get a token:
+            resp = await client.post('/token/', json={'username': 'volcan', 'password': '123'})
+            if not resp.ok:
+                raise ApiError(resp.status, resp.reason, resp.body)
+            headers = {'Authorization': f"Bearer {resp.json().get('access')}"}
+
+            # Stream the body and stop at the first project instead of parsing
+            # every community, project and note just to print one of them.
+            async with client.stream('GET', '/communities/', headers=headers) as resp:
+                if not resp.ok:
+                    raise ApiError(resp.status, resp.reason, await resp.read())
+                async for path, project in aselect(resp.iter_chunks(), '$[0].projects[0]'):
+                    print(json.dumps(project, indent=2))
+        print(client.stats_line(), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except Exception as e:
+        print(e)
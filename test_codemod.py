@@ -0,0 +1,81 @@
+import random
+
+from codemod import Engine, Rule, already_applied
+
+
+def test_literals_leftmost_longest_then_first_declared():
+    engine = Engine([Rule('ab', 'X'), Rule('abc', 'Y'), Rule('abc', 'Z'), Rule('bcd', 'W')])
+    assert engine.matches('abcd') == [(0, 3, 1)]
+    assert engine.apply('abcd abcd').text == 'Yd Yd'
+
+
+def test_regex_tie_goes_to_the_longer_later_rule():
+    engine = Engine([Rule(r'ab', 'X', regex=True), Rule(r'abc', 'Y', regex=True)])
+    assert engine.combined is not None
+    assert engine.apply('zabcz').text == 'zYz'
+
+
+def test_regex_equal_length_tie_goes_to_first_declared():
+    engine = Engine([Rule(r'a\w', 'X', regex=True), Rule(r'\wb', 'Y', regex=True)])
+    assert engine.apply('ab').text == 'X'
+
+
+def test_regex_tie_without_combined_pattern():
+    # Numeric backreferences keep the rules out of the shared alternation.
+    engine = Engine([Rule(r'(a)\1', 'D', regex=True), Rule(r'(a)\1a', 'T', regex=True)])
+    assert engine.combined is None
+    assert engine.apply('aaa aa').text == 'T D'
+
+
+def test_regex_match_overlapping_a_literal_does_not_hide_the_next():
+    engine = Engine([Rule('xa', 'L'), Rule(r'a+b', 'R', regex=True)])
+    assert engine.apply('xaab').text == 'LR'
+
+
+def test_regex_replacement_uses_the_rules_own_groups():
+    engine = Engine([Rule(r'(\w+)\.map', r'map(\1)', regex=True), Rule(r'(?P<x>\d+)px', r'\g<x>rem', regex=True)])
+    assert engine.apply('items.map 4px').text == 'map(items) 4rem'
+
+
+def test_count_limits_edits():
+    result = Engine([Rule('a', 'b', count=2)]).apply('aaaa')
+    assert result.text == 'bbaa'
+    assert result.stats[0].skipped == 2
+
+
+def test_touching_matches_agree_with_a_full_resolution():
+    rng = random.Random(0)
+    for trial in range(500):
+        rules = [Rule(''.join(rng.choice('abx') for _ in range(rng.randint(1, 4))), '_')
+                 for _ in range(rng.randint(1, 4))]
+        if trial % 2:
+            rules.append(Rule(rng.choice(['a+b', 'x[ab]*', '(ab|b)x']), 'R', regex=True))
+        engine = Engine(rules)
+        text = ''.join(rng.choice('abx') for _ in range(rng.randint(0, 60)))
+        lo = rng.randint(0, len(text))
+        hi = rng.randint(lo, len(text))
+        expected = [h for h in engine.matches(text) if h[0] <= hi and h[1] >= lo]
+        assert engine.matches(text, touching=(lo, hi)) == expected, (rules, text, lo, hi)
+
+
+def test_already_applied():
+    text = 'useMemo(() => compute(a))'
+    start = text.index('compute(a)')
+    end = start + len('compute(a)')
+    assert already_applied(text, start, end, 'useMemo(() => compute(a))')
+    assert not already_applied(text, start, end, 'useCallback(() => compute(a))')
+    assert not already_applied('compute(a)', 0, 10, 'useMemo(() => compute(a))')
+
+
+def test_guard_keeps_wrapping_rules_idempotent():
+    engine = Engine([Rule('compute(a)', 'useMemo(() => compute(a))')])
+
+    def guard(text, s, e, idx, repl):
+        return not already_applied(text, s, e, repl)
+
+    once = engine.apply('x = compute(a);', guard=guard)
+    assert once.text == 'x = useMemo(() => compute(a));'
+    twice = engine.apply(once.text, guard=guard)
+    assert not twice.changed
+    assert twice.stats[0].guarded == 1
+    assert not twice.missed
@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import pytest
+
+from json_stream import SelectorError, StreamSelector, aselect, parse_selector, select
+
+DOC = [
+    {'name': 'Comunidad "uno" \\ é', 'projects': [{'id': 1, 'tags': ['a', 'b']}, {'id': 2, 'tags': []}],
+     'score': -1.5e3, 'open': True, 'owner': None},
+    {'name': '🚀 dos', 'projects': [{'id': 3, 'tags': ['{', ']', ',']}], 'score': 0, 'open': False, 'owner': {}},
+]
+RAW = json.dumps(DOC, indent=1, ensure_ascii=False).encode('utf-8')
+ASCII = json.dumps(DOC).encode('utf-8')
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def expected(selector):
+    """Matches computed from the parsed document."""
+    out = []
+
+    def walk(value, steps, path):
+        if not steps:
+            out.append((path, value))
+            return
+        step, rest = steps[0], steps[1:]
+        if isinstance(value, list):
+            for i, child in enumerate(value):
+                if step is None or step == i:
+                    walk(child, rest, f'{path}[{i}]')
+        elif isinstance(value, dict):
+            for key, child in value.items():
+                if step is None or step == key:
+                    walk(child, rest, f'{path}.{key}')
+
+    walk(DOC, [None if s == '*' else s for s in SELECTORS[selector]], '$')
+    return out
+
+
+SELECTORS = {
+    '$[*].name': ['*', 'name'],
+    '$[*].projects[*].tags': ['*', 'projects', '*', 'tags'],
+    '$[1].projects[0]': [1, 'projects', 0],
+    '$[*].score': ['*', 'score'],
+    '$[*].*': ['*', '*'],
+}
+
+
+@pytest.mark.parametrize('selector', sorted(SELECTORS))
+@pytest.mark.parametrize('data', [RAW, ASCII], ids=['utf8', 'escaped'])
+def test_every_chunk_size(selector, data):
+    want = expected(selector)
+    for size in (1, 2, 3, 5, 7, 64, len(data)):
+        assert list(select(chunked(data, size), selector)) == want, size
+
+
+def test_multibyte_character_split_across_chunks():
+    data = json.dumps({'a': 'é🚀'}, ensure_ascii=False).encode('utf-8')
+    split = data.index('🚀'.encode('utf-8')) + 2
+    assert list(select([data[:split], data[split:]], '$.a')) == [('$.a', 'é🚀')]
+
+
+def test_str_chunks():
+    text = RAW.decode('utf-8')
+    assert list(select(chunked(text, 4), '$[*].name')) == expected('$[*].name')
+
+
+def test_top_level_scalar_split_across_chunks():
+    assert list(select([b'12', b'34'], '$')) == [('$', 1234)]
+    assert list(select([b' tr', b'ue '], '$')) == [('$', True)]
+
+
+def test_concrete_selector_stops_early():
+    parser = StreamSelector('$[0].name')
+    matches = []
+    for chunk in chunked(RAW, 8):
+        matches += parser.feed(chunk)
+        if parser.done:
+            break
+    assert matches == [('$[0].name', DOC[0]['name'])]
+    assert parser.bytes_in < len(RAW)
+
+
+def test_aselect():
+    async def chunks():
+        for chunk in chunked(RAW, 3):
+            yield chunk
+
+    async def collect():
+        return [m async for m in aselect(chunks(), '$[*].projects[*].tags')]
+
+    assert asyncio.run(collect()) == expected('$[*].projects[*].tags')
+
+
+def test_bad_selector():
+    with pytest.raises(SelectorError):
+        parse_selector('$[x]')
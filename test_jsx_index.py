@@ -0,0 +1,54 @@
+import pytest
+
+from jsx_index import JsxIndex, apply_edits, lift_state
+
+SOURCE = '''\
+const Leaf = ({ label }) => {
+    const [open, setOpen] = useState(false);
+    return <button onClick={() => setOpen(!open)}>{label}</button>;
+};
+
+const Middle = ({ title }) => {
+    return (
+        <div>
+            <h2>{title}</h2>
+            <Leaf label="a" />
+            <Leaf label="b"></Leaf>
+        </div>
+    );
+};
+
+const Sibling = () => <p>unrelated</p>;
+
+export default function Page() {
+    const [count, setCount] = useState(0);
+    return <section><Middle title="x" /><Sibling /></section>;
+}
+'''
+
+
+def test_lift_to_direct_parent():
+    index = JsxIndex(SOURCE)
+    text = apply_edits(index, lift_state(index, 'open', 'Leaf', 'Middle'))
+    assert 'const Leaf = ({ label, open, setOpen }) => {' in text
+    assert '<Leaf label="a" open={open} setOpen={setOpen} />' in text
+    assert '<Leaf label="b" open={open} setOpen={setOpen}>' in text
+    assert index.hook('open', component='Middle') is not None
+    assert index.hook('open', component='Leaf') is None
+
+
+def test_lift_through_an_intermediate_component():
+    index = JsxIndex(SOURCE)
+    text = apply_edits(index, lift_state(index, 'open', 'Leaf', 'Page'))
+    assert 'const Middle = ({ title, open, setOpen }) => {' in text
+    assert '<Middle title="x" open={open} setOpen={setOpen} />' in text
+    assert '<Leaf label="a" open={open} setOpen={setOpen} />' in text
+    assert '<Sibling />' in text
+    assert index.hook('open', component='Page') is not None
+    assert index.props_of('Sibling') is None
+
+
+def test_lift_to_a_component_that_does_not_render_the_source():
+    index = JsxIndex(SOURCE)
+    with pytest.raises(ValueError, match='does not render'):
+        lift_state(index, 'open', 'Leaf', 'Sibling')
@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+import note_delta
+
+DOC = ''.join(f'<p>Paragraph {i} with some <strong>bold</strong> words &amp; more.</p>' for i in range(40))
+
+
+def roundtrip(old, new):
+    delta = note_delta.encode(old, new)
+    assert note_delta.apply(old, delta) == new
+    return delta
+
+
+@pytest.mark.parametrize('old, new', [
+    ('', ''),
+    ('', '<p>new</p>'),
+    ('<p>old</p>', ''),
+    (DOC, DOC),
+    (DOC, DOC + '<p>appended</p>'),
+    (DOC, '<h1>Title</h1>' + DOC),
+    (DOC, DOC.replace('Paragraph 17', 'Párrafo 17 ✓')),
+    (DOC, DOC.replace('<p>Paragraph 3 with', '<p>Changed 3 with').replace('Paragraph 30', 'x')),
+    ('<p>héllo 👋</p>', '<p>hello 👋👋</p>'),
+])
+def test_roundtrip(old, new):
+    roundtrip(old, new)
+
+
+def test_roundtrip_random_edits():
+    rng = random.Random(0)
+    text = DOC
+    for _ in range(200):
+        s = rng.randrange(len(text) + 1)
+        e = min(len(text), s + rng.choice([0, 1, 5, 50]))
+        new = text[:s] + rng.choice(['', 'x', ' word', '<em>é</em>', '</p><p>']) + text[e:]
+        roundtrip(text, new)
+        text = new
+
+
+def test_small_edit_gives_a_small_delta():
+    delta = roundtrip(DOC, DOC.replace('Paragraph 20', 'Paragraph twenty'))
+    assert len(str(delta['ops'])) < 40
+    assert isinstance(delta['ops'][0], int)
+
+
+def test_stale_base_is_a_conflict():
+    delta = note_delta.encode('<p>a</p>', '<p>b</p>')
+    with pytest.raises(note_delta.DeltaError) as exc:
+        note_delta.apply('<p>c</p>', delta)
+    assert exc.value.conflict
+
+
+def test_ops_past_the_end_are_rejected():
+    with pytest.raises(note_delta.DeltaError) as exc:
+        note_delta.apply_ops('abc', [2, -5])
+    assert not exc.value.conflict
+
+
+def test_hash_mismatch_is_rejected():
+    delta = note_delta.encode('<p>a</p>', '<p>b</p>')
+    delta['hash'] = note_delta.content_hash('<p>something else</p>')
+    with pytest.raises(note_delta.DeltaError):
+        note_delta.apply('<p>a</p>', delta)